@@ -0,0 +1,386 @@
+"""
+Бенчмарк основных эндпоинтов API на синтетических данных: пропускная
+способность, задержка p50/p95/p99 и число SQL-запросов на запрос.
+
+Запросы выполняются тестовым клиентом Django в процессе, без сети, в
+отдельной тестовой базе, которая заполняется командой generate_benchmark_data.
+Результаты в JSON (--output) можно сравнить с прошлым прогоном (--compare).
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_api [--clinics 1000] [--users 200] [--requests 200]
+        [--concurrency 1] [--only clinics_list,pets_list] [--keepdb]
+        [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import StringIO
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vetproject.settings')
+
+import django  # noqa: E402
+
+# Эндпоинты и параметры запросов. Функция получает генератор случайных чисел
+# и контекст с данными и возвращает (метод, путь, параметры, авторизация)
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def random_point(rng, context):
+    lat, lon = rng.choice(context['centers'])
+    return round(rng.gauss(lat, 0.1), 6), round(rng.gauss(lon, 0.15), 6)
+
+
+@scenario('clinics_list')
+def clinics_list(rng, context):
+    return 'get', '/api/clinics/', {'page': rng.randint(1, context['clinic_pages'])}, True
+
+
+@scenario('clinics_list_anonymous')
+def clinics_list_anonymous(rng, context):
+    # Анонимные ответы каталога кэшируются: показывает эффект кэша
+    return 'get', '/api/clinics/', {'page': rng.randint(1, 5)}, False
+
+
+@scenario('clinics_search')
+def clinics_search(rng, context):
+    return 'get', '/api/clinics/', {'search': rng.choice(context['search_terms'])}, True
+
+
+@scenario('clinics_filter')
+def clinics_filter(rng, context):
+    params = {'service': rng.choice(context['service_ids'])}
+    if rng.random() < 0.5:
+        params['is_open'] = 'true'
+    return 'get', '/api/clinics/', params, True
+
+
+@scenario('clinics_facets')
+def clinics_facets(rng, context):
+    params = {
+        'service': ','.join(map(str, rng.sample(context['service_ids'], 2))),
+        'service_match': rng.choice(('any', 'all')),
+        'price_max': rng.choice((1000, 3000, 8000)),
+        'is_available': 'true',
+        'facets': 'true',
+    }
+    return 'get', '/api/clinics/', params, True
+
+
+@scenario('clinics_distance')
+def clinics_distance(rng, context):
+    lat, lon = random_point(rng, context)
+    return 'get', '/api/clinics/', {'lat': lat, 'lon': lon, 'radius': 10, 'ordering': 'distance'}, True
+
+
+@scenario('clinics_nearest')
+def clinics_nearest(rng, context):
+    lat, lon = random_point(rng, context)
+    return 'get', '/api/clinics/nearest/', {'lat': lat, 'lon': lon, 'limit': 10}, True
+
+
+@scenario('favorites_list')
+def favorites_list(rng, context):
+    return 'get', '/api/favorites/', {}, True
+
+
+@scenario('favorites_toggle')
+def favorites_toggle(rng, context):
+    action = rng.choice(('add_to_favorites', 'remove_from_favorites'))
+    return 'post', f'/api/clinics/{rng.choice(context["clinic_ids"])}/{action}/', {}, True
+
+
+@scenario('pets_list')
+def pets_list(rng, context):
+    return 'get', '/api/pets/', {}, True
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(latencies, queries, errors, wall_time):
+    """Сводка по выборке задержек (секунды) и числу запросов к БД"""
+    latencies_ms = sorted(value * 1000 for value in latencies)
+    if len(latencies_ms) > 1:
+        percentiles = statistics.quantiles(latencies_ms, n=100, method='inclusive')
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencies_ms[0]
+    return {
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'throughput_rps': round(len(latencies_ms) / wall_time, 1),
+        'mean_ms': round(statistics.fmean(latencies_ms), 2),
+        'p50_ms': round(p50, 2),
+        'p95_ms': round(p95, 2),
+        'p99_ms': round(p99, 2),
+        'max_ms': round(latencies_ms[-1], 2),
+        'queries_median': statistics.median(queries),
+        'queries_max': max(queries),
+    }
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(name, context, requests, warmup, concurrency, seed):
+    from django.db import connection
+    from django.test import Client
+
+    func = SCENARIOS[name]
+    counter = iter(range(requests))
+    lock = threading.Lock()
+    samples = []
+    ready = threading.Barrier(concurrency + 1)
+
+    def request(client, rng):
+        method, path, params, auth = func(rng, context)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {context["token"]}'} if auth else {}
+        query_counter = QueryCounter()
+        with connection.execute_wrapper(query_counter):
+            started = time.perf_counter()
+            response = getattr(client, method)(path, params, **headers)
+            elapsed = time.perf_counter() - started
+        return elapsed, query_counter.count, response.status_code >= 400
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = Client()
+        try:
+            # Прогрев кэшей и соединения с базой не входит в замер
+            for _ in range(warmup):
+                request(client, rng)
+            ready.wait()
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+                sample = request(client, rng)
+                with lock:
+                    samples.append(sample)
+        except BaseException:
+            ready.abort()
+            raise
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(worker, index) for index in range(concurrency)]
+        try:
+            ready.wait()
+        except threading.BrokenBarrierError:
+            pass  # ошибка потока будет поднята future.result()
+        started = time.perf_counter()
+        for future in futures:
+            future.result()
+        wall_time = time.perf_counter() - started
+
+    latencies, queries, failed = zip(*samples)
+    return summarize(latencies, queries, sum(failed), wall_time)
+
+
+def write_import_csv(path, rows, seed):
+    from core.management.commands.generate_benchmark_data import CITIES, WORKING_HOURS, SERVICE_WORDS
+
+    rng = random.Random(seed)
+    fields = ['name', 'address', 'city', 'postal_code', 'phone', 'email', 'website',
+              'working_hours', 'services', 'latitude', 'longitude']
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        writer.writeheader()
+        for i in range(rows):
+            city, lat, lon, lat_spread, lon_spread = rng.choice(CITIES)
+            writer.writerow({
+                'name': f'bench import {i}',
+                'address': f'ул. Импортная, {i}',
+                'city': city,
+                'postal_code': str(rng.randint(100000, 699999)),
+                'phone': f'+7 (495) {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}',
+                'email': f'import{i}@example.com',
+                'website': f'https://import{i}.example.com',
+                'working_hours': rng.choice(WORKING_HOURS),
+                'services': ', '.join(rng.sample(SERVICE_WORDS, rng.randint(1, 5))),
+                'latitude': f'{rng.gauss(lat, lat_spread / 2):.6f}',
+                'longitude': f'{rng.gauss(lon, lon_spread / 2):.6f}',
+            })
+
+
+def run_import(rows, repeat, chunk_size, seed):
+    """
+    Массовый импорт CSV: первый прогон создаёт клиники, следующие обновляют
+    их, как при повторной загрузке той же выгрузки
+    """
+    from django.db import connection
+    from clinics.services.import_service import ClinicImportService
+
+    latencies, queries = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'clinics.csv')
+        write_import_csv(path, rows, seed)
+        service = ClinicImportService()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            query_counter = QueryCounter()
+            with connection.execute_wrapper(query_counter):
+                run_started = time.perf_counter()
+                results = service.import_clinics_bulk(path, chunk_size=chunk_size)
+                latencies.append(time.perf_counter() - run_started)
+            queries.append(query_counter.count)
+        wall_time = time.perf_counter() - started
+
+    summary = summarize(latencies, queries, results['errors'], wall_time)
+    summary['rows'] = rows
+    summary['rows_per_second'] = round(rows * repeat / wall_time, 1)
+    return summary
+
+
+def build_context():
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from clinics.models import VetClinic, Service
+    from pets.models import Pet
+    from core.management.commands.generate_benchmark_data import CITIES, CLINIC_WORDS
+
+    # Пользователь с наибольшим числом питомцев - самый тяжёлый список
+    owner_id = (
+        Pet.objects.values('owner').annotate(count=Count('id')).order_by('-count')
+        .values_list('owner', flat=True).first()
+    )
+    user = get_user_model().objects.get(pk=owner_id)
+    clinic_count = VetClinic.objects.count()
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 10
+    return {
+        'token': str(RefreshToken.for_user(user).access_token),
+        'clinic_ids': list(VetClinic.objects.values_list('pk', flat=True)),
+        'clinic_pages': max(1, min(20, clinic_count // page_size)),
+        'service_ids': list(Service.objects.values_list('pk', flat=True)),
+        'search_terms': list(CLINIC_WORDS) + [city for city, *_ in CITIES],
+        'centers': [(lat, lon) for _, lat, lon, *_ in CITIES],
+    }
+
+
+def print_table(results, baseline=None):
+    header = f'{"scenario":<24}{"rps":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"queries":>9}{"errors":>8}'
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        line = (f'{name:<24}{result["throughput_rps"]:>9.1f}{result["p50_ms"]:>10.2f}'
+                f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                f'{result["queries_median"]:>9g}{result["errors"]:>8}')
+        previous = (baseline or {}).get(name)
+        if previous:
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            queries = result['queries_median'] - previous['queries_median']
+            line += f'   p95 {change:+.1f}%, queries {queries:+g}'
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clinics', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=200, help='измеряемых запросов на сценарий')
+    parser.add_argument('--warmup', type=int, default=5, help='запросов прогрева на поток')
+    parser.add_argument('--concurrency', type=int, default=1, help='число потоков клиента')
+    parser.add_argument('--import-rows', type=int, default=2000)
+    parser.add_argument('--import-repeat', type=int, default=3)
+    parser.add_argument('--only', help='сценарии через запятую')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keepdb', action='store_true', help='не пересоздавать тестовую базу и данные')
+    parser.add_argument('--output', help='файл для результатов в JSON')
+    parser.add_argument('--compare', help='JSON прошлого прогона для сравнения')
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) + ['csv_import']
+    if args.only:
+        names = [name.strip() for name in args.only.split(',')]
+        unknown = set(names) - set(SCENARIOS) - {'csv_import'}
+        if unknown:
+            parser.error(f'неизвестные сценарии: {", ".join(sorted(unknown))}')
+
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from clinics.models import VetClinic
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, keepdb=args.keepdb)
+    try:
+        if not (args.keepdb and VetClinic.objects.filter(name__startswith='bench ').exists()):
+            call_command(
+                'generate_benchmark_data', clinics=args.clinics, users=args.users,
+                seed=args.seed, clear=True, stdout=StringIO(),
+            )
+        context = build_context()
+
+        results = {}
+        for name in names:
+            if name == 'csv_import':
+                results[name] = run_import(args.import_rows, args.import_repeat, 1000, args.seed)
+            else:
+                results[name] = run_scenario(
+                    name, context, args.requests, args.warmup, args.concurrency, args.seed
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'clinics': args.clinics,
+            'users': args.users,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Бенчмарк создания миниатюр фото питомцев: полное декодирование с
+поворотом по EXIF (прежняя реализация) против декодирования JPEG в режиме
+draft с ограничением числа пикселей. Каждый вариант запускается в
+отдельном процессе, чтобы пиковый RSS не смешивался.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_thumbnails [--corpus DIR] [--images 8] [--repeat 3]
+
+Без --corpus генерируется набор JPEG 12 и 20 Мп с EXIF-ориентацией.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vetproject.settings')
+
+from PIL import Image, ImageOps  # noqa: E402
+
+SIZES = (64, 200, 800)
+FORMATS = ('webp', 'jpeg')
+RESOLUTIONS = ((4000, 3000), (5472, 3648))
+
+
+def legacy_renditions(path):
+    """Прежняя реализация create_renditions: полный кадр в памяти"""
+    from core.utils.image import _encode
+    renditions = {}
+    with Image.open(path) as img:
+        current = ImageOps.exif_transpose(img)
+        if current.mode != 'RGB':
+            current = current.convert('RGB')
+        for size in sorted(SIZES, reverse=True):
+            current = current.copy()
+            current.thumbnail((size, size), Image.Resampling.LANCZOS)
+            renditions[size] = {fmt: _encode(current, fmt) for fmt in FORMATS}
+    return renditions
+
+
+def draft_renditions(path):
+    from core.utils.image import create_renditions
+    return create_renditions(path, sizes=SIZES, formats=FORMATS)
+
+
+VARIANTS = {'legacy': legacy_renditions, 'draft': draft_renditions}
+
+
+def make_corpus(directory, count):
+    """JPEG с шумом (близко к фото по сжимаемости) и поворотом в EXIF"""
+    paths = []
+    for index in range(count):
+        width, height = RESOLUTIONS[index % len(RESOLUTIONS)]
+        noise = Image.effect_noise((width // 8, height // 8), 64).convert('RGB')
+        img = noise.resize((width, height), Image.Resampling.BILINEAR)
+        exif = Image.Exif()
+        exif[0x0112] = (6, 8, 3, 1)[index % 4]  # Orientation
+        path = os.path.join(directory, f'photo_{index}.jpg')
+        img.save(path, 'JPEG', quality=90, exif=exif.tobytes())
+        paths.append(path)
+    return paths
+
+
+def measure(variant, paths, repeat, queue):
+    import django
+    django.setup()
+    func = VARIANTS[variant]
+    func(paths[0])  # прогрев импорта и кодеков
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path in paths:
+            func(path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    # ru_maxrss в Linux - в килобайтах
+    queue.put((best / len(paths), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def run_variant(variant, paths, repeat):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(variant, paths, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--corpus', help='каталог с JPEG-файлами')
+    parser.add_argument('--images', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = sorted(
+                os.path.join(args.corpus, name) for name in os.listdir(args.corpus)
+                if name.lower().endswith(('.jpg', '.jpeg'))
+            )
+        else:
+            paths = make_corpus(tmp, args.images)
+
+        results = {}
+        for variant in VARIANTS:
+            per_image, max_rss = run_variant(variant, paths, args.repeat)
+            results[variant] = per_image
+            print(f'{variant:>8}: {per_image * 1000:8.1f} ms/image, peak RSS {max_rss / 1024:7.1f} MB')
+
+    print(f' speedup: {results["legacy"] / results["draft"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Микробенчмарк валидаторов импорта клиник: прежняя реализация
+(строковые шаблоны в re.match/re.sub) против предкомпилированных шаблонов
+и кэшированного разбора часов работы.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_validators [--rows 100000] [--distinct 300]
+"""
+import argparse
+import random
+import re
+import timeit
+from django.core.exceptions import ValidationError
+from clinics import validators
+
+
+def legacy_validate_phone(value):
+    phone = re.sub(r'\D', '', value)
+    if len(phone) < 10 or len(phone) > 15:
+        raise ValidationError('Номер телефона должен содержать от 10 до 15 цифр')
+
+
+def legacy_validate_working_hours(value):
+    pattern = r'^([A-Za-z]{2}-[A-Za-z]{2}\s\d{1,2}-\d{1,2}(,\s[A-Za-z]{2}-[A-Za-z]{2}\s\d{1,2}-\d{1,2})*)$'
+    if not re.match(pattern, value):
+        raise ValidationError('Неверный формат часов работы. Используйте формат: Mo-Fr 9-18, Sa 10-14')
+
+
+def legacy_validate_postal_code(value):
+    if not re.match(r'^\d{5,10}$', value):
+        raise ValidationError('Почтовый индекс должен содержать от 5 до 10 цифр')
+
+
+def make_rows(count, distinct_schedules, seed=42):
+    """Строки с повторяющимися расписаниями, как в региональных выгрузках"""
+    rng = random.Random(seed)
+    days = ['Mo', 'Tu', 'We', 'Th', 'Fr', 'Sa', 'Su']
+    schedules = []
+    for _ in range(distinct_schedules):
+        groups = []
+        for _ in range(rng.randint(1, 3)):
+            first = rng.randrange(6)
+            last = rng.randrange(first + 1, 7)
+            opens = rng.randint(0, 11)
+            groups.append(f'{days[first]}-{days[last]} {opens}-{rng.randint(opens + 1, 24)}')
+        schedules.append(', '.join(groups))
+
+    return [
+        {
+            'phone': f'+7 (495) {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}',
+            'working_hours': rng.choice(schedules),
+            'postal_code': str(rng.randint(100000, 999999)),
+        }
+        for _ in range(count)
+    ]
+
+
+def run(rows, phone, working_hours, postal_code):
+    for row in rows:
+        for validator, value in ((phone, row['phone']),
+                                 (working_hours, row['working_hours']),
+                                 (postal_code, row['postal_code'])):
+            try:
+                validator(value)
+            except ValidationError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.distinct)
+    variants = {
+        'legacy': (legacy_validate_phone, legacy_validate_working_hours,
+                   legacy_validate_postal_code),
+        'compiled': (validators.validate_phone, validators.validate_working_hours,
+                     validators.validate_postal_code),
+    }
+
+    timings = {}
+    for name, funcs in variants.items():
+        best = min(timeit.repeat(lambda: run(rows, *funcs), number=1, repeat=args.repeat))
+        timings[name] = best
+        print(f'{name:>10}: {best * 1000:8.1f} ms, {args.rows / best:12,.0f} rows/s')
+
+    print(f'   speedup: {timings["legacy"] / timings["compiled"]:.2f}x')
+    print(f'cache info: {validators._parse_working_hours.cache_info()}')
+
+
+if __name__ == '__main__':
+    main()
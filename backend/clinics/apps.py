@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ClinicsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'clinics'
+    verbose_name = 'Ветеринарные клиники'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,113 @@
+import hashlib
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+from core.cache import TieredCache
+
+# Ответы каталога клиник и услуг; поколение меняется при изменении
+# VetClinic, ClinicService и Service (см. signals.py)
+catalogue_cache = TieredCache(
+    'catalogue',
+    timeout=settings.CATALOGUE_CACHE_TIMEOUT,
+    local_size=settings.CATALOGUE_CACHE_LOCAL_SIZE,
+    generation_ttl=settings.CATALOGUE_CACHE_GENERATION_TTL,
+)
+
+# Поколение счетчиков клиник (избранное, записи и рейтинг). Они меняются
+# от действий пользователей, поэтому не сбрасывают кэш каталога целиком:
+# номер входит в ключи и ETag списка клиник, а процессы сверяют его
+# не чаще раза в CATALOGUE_STATS_GENERATION_TTL секунд
+catalogue_stats_state = TieredCache(
+    'catalogue_stats',
+    generation_ttl=settings.CATALOGUE_STATS_GENERATION_TTL,
+)
+
+# Заголовки, сохраняемые вместе с закэшированным ответом
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Vary')
+
+
+def invalidate_catalogue():
+    """
+    Делает кэш каталога недействительным сразу и ещё раз после фиксации
+    транзакции, чтобы не закэшировать данные, прочитанные до коммита
+    """
+    catalogue_cache.bump()
+    transaction.on_commit(catalogue_cache.bump)
+
+
+def touch_catalogue_stats():
+    """
+    Отмечает изменение счетчиков клиник после фиксации транзакции
+    """
+    transaction.on_commit(catalogue_stats_state.bump)
+
+
+def _normalize_param(name, value):
+    value = value.strip()
+    if name == 'search':
+        value = ' '.join(value.lower().split())
+    elif name == 'page' and value == '1':
+        value = ''
+    return value
+
+
+class CatalogueCacheMixin:
+    """
+    Кэширует ответы list/retrieve для анонимных пользователей.
+
+    Ключ строится по действию, pk и нормализованным параметрам из
+    cache_query_params; остальные параметры на ответ не влияют и в ключ не входят.
+    """
+    cache_actions = ('list', 'retrieve')
+    cache_query_params = ('page',)
+
+    def get_cache_key(self, request):
+        params = []
+        for name in sorted(self.cache_query_params):
+            value = ','.join(
+                _normalize_param(name, value) for value in request.query_params.getlist(name)
+            )
+            if value:
+                params.append(f'{name}={value}')
+        raw = '&'.join([request.get_host(), self.kwargs.get(self.lookup_field, '')] + params)
+        digest = hashlib.sha1(raw.encode()).hexdigest()
+        return f'{self.basename}:{self.action}:{digest}'
+
+    def should_cache(self, request):
+        return (self.action in self.cache_actions and
+                request.method == 'GET' and
+                not request.user.is_authenticated)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.should_cache(request):
+            return handler(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        cached = catalogue_cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            etag = headers.get('ETag')
+            last_modified = headers.get('Last-Modified')
+            not_modified = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=parse_http_date_safe(last_modified) if last_modified else None,
+            )
+            if not_modified is not None:
+                return Response(status=not_modified.status_code, headers=headers)
+            return Response(data, headers={**headers, 'X-Cache': 'HIT'})
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {h: response[h] for h in CACHED_HEADERS if response.has_header(h)}
+            catalogue_cache.set(key, (response.data, headers))
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
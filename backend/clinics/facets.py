@@ -0,0 +1,112 @@
+"""
+Фасетный поиск клиник по услугам: фильтры по набору услуг (любая или
+все сразу), диапазону цен и доступности, а также счетчики клиник
+по услугам и ценовым диапазонам для панели фильтров.
+"""
+from django.conf import settings
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Value, When
+from .models import ClinicService
+
+# Клиника подходит, если у нее есть хотя бы одна из услуг
+MATCH_ANY = 'any'
+# Клиника подходит, если у нее есть все услуги
+MATCH_ALL = 'all'
+MATCH_CHOICES = (MATCH_ANY, MATCH_ALL)
+
+_SERVICE_FACET = 0
+_PRICE_FACET = 1
+
+
+def offer_conditions(service_ids=(), price_min=None, price_max=None, is_available=None):
+    """
+    Условие на услуги клиник (ClinicService), подходящие под фильтры
+    """
+    conditions = Q()
+    if service_ids:
+        conditions &= Q(service_id__in=service_ids)
+    if price_min is not None:
+        conditions &= Q(price__gte=price_min)
+    if price_max is not None:
+        conditions &= Q(price__lte=price_max)
+    if is_available is not None:
+        conditions &= Q(is_available=is_available)
+    return conditions
+
+
+def filter_by_offers(queryset, conditions, service_ids=(), match=MATCH_ANY):
+    """
+    Оставляет клиники с подходящей услугой или, при match=all,
+    с подходящей услугой из каждой service_ids. Условие проверяется
+    подзапросом, а не JOIN, поэтому клиники в выборке не дублируются.
+    """
+    if not conditions:
+        return queryset
+    offers = ClinicService.objects.filter(conditions).order_by()
+    service_ids = set(service_ids)
+    if match == MATCH_ALL and len(service_ids) > 1:
+        matching = offers.values('clinic_id').annotate(
+            matched=Count('service_id', distinct=True)
+        ).filter(matched=len(service_ids)).values('clinic_id')
+        return queryset.filter(pk__in=matching)
+    return queryset.filter(Exists(offers.filter(clinic_id=OuterRef('pk'))))
+
+
+def price_buckets(bounds=None):
+    """
+    Ценовые диапазоны [(min, max), ...] по границам CLINIC_PRICE_FACET_BOUNDS;
+    у первого диапазона нет нижней границы, у последнего - верхней
+    """
+    bounds = tuple(settings.CLINIC_PRICE_FACET_BOUNDS if bounds is None else bounds)
+    return list(zip((None,) + bounds, bounds + (None,)))
+
+
+def _bucket_expression(bounds):
+    return Case(
+        *(When(price__lt=bound, then=Value(index)) for index, bound in enumerate(bounds)),
+        default=Value(len(bounds)),
+        output_field=IntegerField(),
+    )
+
+
+def clinic_facets(clinics, conditions=Q(), is_available=None, bounds=None):
+    """
+    Счетчики для отфильтрованной выборки клиник clinics:
+    services - число клиник с каждой услугой (с учетом is_available),
+    prices - число клиник с подходящей под conditions услугой в каждом
+    ценовом диапазоне.
+
+    Обе группировки выполняются одним запросом: UNION ALL двух GROUP BY
+    по услугам клиник из выборки.
+    """
+    bounds = tuple(settings.CLINIC_PRICE_FACET_BOUNDS if bounds is None else bounds)
+    offers = ClinicService.objects.filter(
+        clinic_id__in=clinics.order_by().values('pk')
+    ).order_by()
+    availability = Q() if is_available is None else Q(is_available=is_available)
+
+    by_service = offers.filter(availability).annotate(
+        facet=Value(_SERVICE_FACET), key=F('service_id')
+    ).values('facet', 'key').annotate(
+        clinics=Count('clinic_id', distinct=True)
+    ).values_list('facet', 'key', 'clinics')
+    by_price = offers.filter(conditions).annotate(
+        facet=Value(_PRICE_FACET), key=_bucket_expression(bounds)
+    ).values('facet', 'key').annotate(
+        clinics=Count('clinic_id', distinct=True)
+    ).values_list('facet', 'key', 'clinics')
+
+    services, prices = [], dict.fromkeys(range(len(bounds) + 1), 0)
+    for facet, key, count in by_service.union(by_price, all=True):
+        if facet == _SERVICE_FACET:
+            services.append({'service_id': key, 'count': count})
+        else:
+            prices[key] = count
+
+    services.sort(key=lambda item: (-item['count'], item['service_id']))
+    return {
+        'services': services,
+        'prices': [
+            {'min': low, 'max': high, 'count': prices[index]}
+            for index, (low, high) in enumerate(price_buckets(bounds))
+        ],
+    }
@@ -0,0 +1,39 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from rest_framework import filters
+from .models import SEARCH_CONFIG
+
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+
+class ClinicSearchFilter(filters.SearchFilter):
+    """
+    Полнотекстовый поиск клиник по индексированному search_vector.
+    Слова запроса ищутся по префиксу, нечеткое совпадение названия
+    обеспечивает триграммный индекс. Результаты упорядочены по релевантности,
+    если в запросе не задан параметр ordering.
+    """
+
+    def get_search_query(self, terms):
+        words = [word for term in terms for word in _NON_WORD_RE.split(term) if word]
+        if not words:
+            return None
+        return SearchQuery(
+            ' & '.join(f'{word}:*' for word in words),
+            config=SEARCH_CONFIG,
+            search_type='raw'
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        query = self.get_search_query(terms)
+        if query is None:
+            return queryset
+
+        text = ' '.join(terms)
+        return queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), query) + TrigramSimilarity('name', text)
+        ).filter(
+            Q(search_vector=query) | Q(name__trigram_similar=text)
+        ).order_by('-search_rank', 'name')
@@ -0,0 +1,319 @@
+import math
+import threading
+import numpy as np
+from django.conf import settings
+from core.cache import TieredCache
+
+EARTH_RADIUS_KM = 6371
+
+# Номер поколения матрицы в общем кэше: изменение клиник в любом процессе
+# увеличивает его и записывает изменение в журнал под новым номером,
+# остальные процессы применяют записи журнала к своей матрице
+geo_matrix_state = TieredCache(
+    'geo_matrix',
+    generation_ttl=settings.GEO_MATRIX_GENERATION_TTL,
+)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Расстояние между двумя точками по формуле гаверсинусов (в километрах)
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+
+    a = (math.sin(dphi / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2)
+
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Возвращает прямоугольник (min_lat, max_lat, min_lon, max_lon),
+    гарантированно содержащий окружность заданного радиуса
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat, max_lat = lat - dlat, lat + dlat
+
+    # Окружность накрывает полюс или пересекает антимеридиан -
+    # ограничиваем только широту
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    ratio = math.sin(angular) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return min_lat, max_lat, -180.0, 180.0
+
+    dlon = math.degrees(math.asin(ratio))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+
+    return min_lat, max_lat, min_lon, max_lon
+
+
+class ClinicGeoMatrix:
+    """
+    Координаты активных клиник в непрерывных массивах float64 для
+    векторизованного расчёта расстояний сразу до всех клиник.
+    Общий экземпляр живёт в памяти процесса и сверяется с номером поколения
+    в общем кэше: изменения из других процессов применяются по журналу
+    изменений, а если журнал неполон - матрица загружается заново.
+    """
+    _shared = None
+    _shared_generation = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, capacity=1024):
+        self._lock = threading.RLock()
+        self._size = 0
+        self._positions = {}
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity):
+        ids = np.empty(capacity, dtype=np.int64)
+        lat = np.empty(capacity, dtype=np.float64)
+        lon = np.empty(capacity, dtype=np.float64)
+        cos_lat = np.empty(capacity, dtype=np.float64)
+        if self._size:
+            ids[:self._size] = self._ids[:self._size]
+            lat[:self._size] = self._lat[:self._size]
+            lon[:self._size] = self._lon[:self._size]
+            cos_lat[:self._size] = self._cos_lat[:self._size]
+        self._ids, self._lat, self._lon, self._cos_lat = ids, lat, lon, cos_lat
+
+    @classmethod
+    def from_points(cls, points):
+        """
+        Строит матрицу из последовательности (id, широта, долгота)
+        """
+        points = [(pk, float(lat), float(lon)) for pk, lat, lon in points]
+        matrix = cls(capacity=max(len(points) * 2, 1024))
+        if points:
+            ids, lat, lon = zip(*points)
+            size = len(points)
+            matrix._ids[:size] = ids
+            matrix._lat[:size] = np.radians(lat)
+            matrix._lon[:size] = np.radians(lon)
+            matrix._cos_lat[:size] = np.cos(matrix._lat[:size])
+            matrix._size = size
+            matrix._positions = {pk: position for position, pk in enumerate(ids)}
+        return matrix
+
+    @classmethod
+    def load(cls):
+        """
+        Строит матрицу по активным клиникам с координатами из базы
+        """
+        from .models import VetClinic
+        return cls.from_points(
+            VetClinic.objects.filter(
+                is_active=True,
+                latitude__isnull=False,
+                longitude__isnull=False,
+            ).values_list('pk', 'latitude', 'longitude').order_by()
+        )
+
+    @classmethod
+    def shared(cls):
+        """
+        Возвращает общий для процесса экземпляр. Загружает его при первом
+        обращении и догоняет по журналу изменений, если номер поколения
+        в общем кэше изменился
+        """
+        generation = geo_matrix_state.generation()
+        matrix = cls._shared
+        if matrix is not None and cls._shared_generation == generation:
+            return matrix
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared_generation != generation:
+                cls._advance(generation)
+            return cls._shared
+
+    @staticmethod
+    def _change_key(generation):
+        return f'{geo_matrix_state.namespace}:change:{generation}'
+
+    @classmethod
+    def _advance(cls, generation):
+        """
+        Доводит матрицу процесса до поколения generation (под _shared_lock).
+        Изменения применяются на месте, если в журнале есть все записи после
+        поколения матрицы и их не больше GEO_MATRIX_MAX_CHANGES; иначе матрица
+        загружается из базы
+        """
+        matrix, current = cls._shared, cls._shared_generation
+        if (matrix is not None and current is not None and
+                current < generation <= current + settings.GEO_MATRIX_MAX_CHANGES):
+            keys = [cls._change_key(number) for number in range(current + 1, generation + 1)]
+            changes = geo_matrix_state.shared.get_many(keys)
+            if len(changes) == len(keys):
+                for key in keys:
+                    pk, point = changes[key]
+                    if point is None:
+                        matrix.remove(pk)
+                    else:
+                        matrix.upsert(pk, *point)
+                cls._shared_generation = generation
+                return
+        cls._shared = cls.load()
+        cls._shared_generation = generation
+
+    @classmethod
+    def is_loaded(cls):
+        return cls._shared is not None
+
+    @classmethod
+    def reset_shared(cls):
+        """
+        Сбрасывает экземпляр процесса; он будет перестроен при следующем обращении
+        """
+        with cls._shared_lock:
+            cls._shared = None
+            cls._shared_generation = None
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Сбрасывает матрицы во всех процессах: после массовых изменений клиник,
+        которые не отправляют сигналы (импорт, генерация данных). Новое
+        поколение не попадает в журнал, поэтому процессы загружают матрицу
+        заново
+        """
+        with cls._shared_lock:
+            geo_matrix_state.bump()
+            cls._shared = None
+            cls._shared_generation = None
+
+    @classmethod
+    def apply_change(cls, pk, point=None):
+        """
+        Применяет изменение клиники после фиксации транзакции: point - её
+        координаты или None, если клиника удалена из поиска. Изменение
+        записывается в журнал под новым номером поколения, остальные процессы
+        применяют его к своей матрице без перезагрузки.
+        """
+        if point is not None:
+            point = (float(point[0]), float(point[1]))
+        with cls._shared_lock:
+            generation = geo_matrix_state.bump()
+            geo_matrix_state.shared.set(
+                cls._change_key(generation), (pk, point), settings.GEO_MATRIX_CHANGE_TIMEOUT
+            )
+            if cls._shared is not None:
+                cls._advance(generation)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, pk):
+        return pk in self._positions
+
+    def upsert(self, pk, lat, lon):
+        """
+        Добавляет клинику или обновляет её координаты
+        """
+        lat_rad = math.radians(float(lat))
+        lon_rad = math.radians(float(lon))
+        with self._lock:
+            position = self._positions.get(pk)
+            if position is None:
+                if self._size == len(self._ids):
+                    self._allocate(len(self._ids) * 2)
+                position = self._size
+                self._size += 1
+                self._positions[pk] = position
+                self._ids[position] = pk
+            self._lat[position] = lat_rad
+            self._lon[position] = lon_rad
+            self._cos_lat[position] = math.cos(lat_rad)
+
+    def remove(self, pk):
+        """
+        Удаляет клинику, перенося на её место последний элемент массивов
+        """
+        with self._lock:
+            position = self._positions.pop(pk, None)
+            if position is None:
+                return
+            last = self._size - 1
+            if position != last:
+                moved = int(self._ids[last])
+                self._ids[position] = self._ids[last]
+                self._lat[position] = self._lat[last]
+                self._lon[position] = self._lon[last]
+                self._cos_lat[position] = self._cos_lat[last]
+                self._positions[moved] = position
+            self._size = last
+
+    def _distances(self, lat, lon):
+        lat = np.radians(np.atleast_1d(np.asarray(lat, dtype=np.float64)))[:, None]
+        lon = np.radians(np.atleast_1d(np.asarray(lon, dtype=np.float64)))[:, None]
+        size = self._size
+
+        a = (np.sin((self._lat[:size] - lat) / 2) ** 2 +
+             np.cos(lat) * self._cos_lat[:size] *
+             np.sin((self._lon[:size] - lon) / 2) ** 2)
+        np.minimum(a, 1.0, out=a)
+
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a)), self._ids[:size].copy()
+
+    def distances(self, lat, lon):
+        """
+        Расстояния (км) от одной или нескольких точек до всех клиник.
+        Возвращает пару (массив id, матрица расстояний формы (точки, клиники)).
+        """
+        with self._lock:
+            distances, ids = self._distances(lat, lon)
+        return ids, distances
+
+    @staticmethod
+    def _top(distances, ids, limit):
+        if limit is not None and limit < len(distances):
+            candidates = np.argpartition(distances, limit - 1)[:limit]
+        else:
+            candidates = np.arange(len(distances))
+        order = candidates[np.argsort(distances[candidates], kind='stable')]
+        return [(float(distances[i]), int(ids[i])) for i in order]
+
+    def nearest(self, lat, lon, limit=10, radius=None, ids=None):
+        """
+        Ближайшие клиники к точке: список пар (расстояние, id) по возрастанию
+        расстояния. limit=None возвращает все клиники; ids ограничивает выборку.
+        """
+        if limit is not None and limit <= 0:
+            return []
+        with self._lock:
+            distances, clinic_ids = self._distances(lat, lon)
+        distances = distances[0]
+
+        mask = None
+        if radius is not None:
+            mask = distances <= radius
+        if ids is not None:
+            allowed = np.isin(clinic_ids, np.fromiter(ids, dtype=np.int64))
+            mask = allowed if mask is None else mask & allowed
+        if mask is not None:
+            distances, clinic_ids = distances[mask], clinic_ids[mask]
+
+        return self._top(distances, clinic_ids, limit)
+
+    def nearest_many(self, points, limit=10, radius=None):
+        """
+        Ближайшие клиники сразу для нескольких точек за один векторизованный проход
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        with self._lock:
+            distances, clinic_ids = self._distances(points[:, 0], points[:, 1])
+
+        results = []
+        for row in distances:
+            if radius is not None:
+                mask = row <= radius
+                results.append(self._top(row[mask], clinic_ids[mask], limit))
+            else:
+                results.append(self._top(row, clinic_ids, limit))
+        return results
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from clinics.models import VetClinic
+from clinics.services.export_service import EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает каталог клиник с услугами в CSV или NDJSON в формате файла импорта'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            type=str,
+            nargs='?',
+            default='-',
+            help='Путь к файлу выгрузки (по умолчанию - стандартный вывод)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default=None,
+            help='Формат выгрузки (по умолчанию - по расширению файла, иначе ndjson)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Число строк, читаемых из курсора за раз (по умолчанию {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--city',
+            action='append',
+            dest='cities',
+            help='Выгрузить только клиники города (можно указать несколько раз)'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+        output = options['output']
+        export_format = options['format'] or ('csv' if output.endswith('.csv') else 'ndjson')
+
+        queryset = VetClinic.objects.all()
+        if options['cities']:
+            queryset = queryset.filter(city__in=options['cities'])
+        blocks = iter_export(export_format, queryset, chunk_size=options['chunk_size'])
+
+        if output == '-':
+            # Блоки заканчиваются на границе строки, их можно декодировать по отдельности
+            for block in blocks:
+                self.stdout.write(block.decode(), ending='')
+            return
+
+        try:
+            with open(output, 'wb') as file:
+                for block in blocks:
+                    file.write(block)
+        except OSError as e:
+            raise CommandError(f'Ошибка записи файла: {str(e)}')
+        self.stdout.write(self.style.SUCCESS(f'Каталог клиник выгружен в {output}'))
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.core.management.base import CommandError
-from clinics.services.import_service import ClinicImportService
+from clinics.services.import_service import ClinicImportService, DEFAULT_CHUNK_SIZE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,14 +10,44 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str, help='Путь к CSV-файлу с данными о клиниках')
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Массовый импорт пакетами вместо построчной обработки'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Размер пакета строк для массового импорта (по умолчанию {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число процессов для проверки строк при массовом импорте (по умолчанию 1)'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным')
+        if options['workers'] < 1:
+            raise CommandError('Число процессов должно быть положительным')
+        if options['workers'] > 1 and not options['bulk']:
+            raise CommandError('Параметр --workers используется только вместе с --bulk')
         self.stdout.write(f'Начало импорта из файла: {csv_file}')
 
         try:
             service = ClinicImportService()
-            results = service.import_clinics(csv_file)
+            if options['bulk']:
+                results = service.import_clinics_bulk(
+                    csv_file,
+                    chunk_size=options['chunk_size'],
+                    workers=options['workers']
+                )
+            else:
+                results = service.import_clinics(csv_file)
 
             # Вывод результатов
             self.stdout.write(self.style.SUCCESS(
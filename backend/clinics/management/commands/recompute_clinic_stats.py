@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from clinics.cache import invalidate_catalogue
+from clinics.stats import recompute_clinic_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сводные показатели клиник: число услуг, цены, избранное, записи и рейтинг'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clinic',
+            type=int,
+            action='append',
+            dest='clinics',
+            help='ID клиники для пересчета (можно указать несколько раз, по умолчанию - все)'
+        )
+
+    def handle(self, *args, **options):
+        updated = recompute_clinic_stats(options['clinics'])
+        invalidate_catalogue()
+        self.stdout.write(self.style.SUCCESS(f'Пересчитаны показатели клиник: {updated}'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0004_delete_vetrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vetclinic',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12, verbose_name='Геохеш'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='Широта'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True, verbose_name='Долгота'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['latitude', 'longitude'], name='clinic_lat_lon_idx'),
+        ),
+    ]
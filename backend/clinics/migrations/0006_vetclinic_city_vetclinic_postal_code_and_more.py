@@ -0,0 +1,52 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:38
+
+from django.db import migrations, models
+from django.db.models import Count
+
+NAME_MAX_LENGTH = 200
+
+
+def rename_duplicate_clinics(apps, schema_editor):
+    """
+    Перед ограничением уникальности переименовывает клиники с повторяющимися
+    названиями: первая остается как есть, остальные получают суффикс с id.
+    Клиники не объединяются, чтобы не потерять избранное и записи.
+    """
+    VetClinic = apps.get_model('clinics', 'VetClinic')
+    duplicates = (
+        VetClinic.objects.values('name').annotate(total=Count('pk'))
+        .filter(total__gt=1).values_list('name', flat=True)
+    )
+    for name in duplicates:
+        clinics = VetClinic.objects.filter(name=name).order_by('pk').values_list('pk', flat=True)
+        for pk in list(clinics)[1:]:
+            suffix = f' ({pk})'
+            VetClinic.objects.filter(pk=pk).update(
+                name=name[:NAME_MAX_LENGTH - len(suffix)] + suffix
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0005_vetclinic_geohash_vetclinic_latitude_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vetclinic',
+            name='city',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='Город'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='postal_code',
+            field=models.CharField(blank=True, default='', max_length=10, verbose_name='Почтовый индекс'),
+        ),
+        migrations.RunPython(rename_duplicate_clinics, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='vetclinic',
+            name='name',
+            field=models.CharField(max_length=200, unique=True, verbose_name='Название клиники'),
+        ),
+    ]
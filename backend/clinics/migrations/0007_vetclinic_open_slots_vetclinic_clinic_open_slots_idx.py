@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:42
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+from clinics.schedule import working_hours_slots
+
+
+def fill_open_slots(apps, schema_editor):
+    VetClinic = apps.get_model('clinics', 'VetClinic')
+    clinics = []
+    for clinic in VetClinic.objects.only('id', 'working_hours').iterator(chunk_size=1000):
+        clinic.open_slots = working_hours_slots(clinic.working_hours)
+        clinics.append(clinic)
+    VetClinic.objects.bulk_update(clinics, ['open_slots'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0006_vetclinic_city_vetclinic_postal_code_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vetclinic',
+            name='open_slots',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.SmallIntegerField(), blank=True, default=list, editable=False, size=None, verbose_name='Слоты работы'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['open_slots'], name='clinic_open_slots_idx'),
+        ),
+        migrations.RunPython(fill_open_slots, migrations.RunPython.noop),
+    ]
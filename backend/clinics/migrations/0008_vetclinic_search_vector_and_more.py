@@ -0,0 +1,30 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0007_vetclinic_open_slots_vetclinic_clinic_open_slots_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('address', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), '||', django.contrib.postgres.search.SearchVector('description', config='russian', weight='C'), django.contrib.postgres.search.SearchConfig('russian')), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='clinic_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='clinic_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
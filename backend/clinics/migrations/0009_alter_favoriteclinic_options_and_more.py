@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0008_vetclinic_search_vector_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='favoriteclinic',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Избранная клиника', 'verbose_name_plural': 'Избранные клиники'},
+        ),
+        migrations.AddIndex(
+            model_name='favoriteclinic',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='favorite_user_created_idx'),
+        ),
+    ]
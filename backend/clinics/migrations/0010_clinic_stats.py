@@ -0,0 +1,97 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:12
+
+import django.db.models.expressions
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+
+def fill_clinic_stats(apps, schema_editor):
+    VetClinic = apps.get_model('clinics', 'VetClinic')
+    ClinicService = apps.get_model('clinics', 'ClinicService')
+    FavoriteClinic = apps.get_model('clinics', 'FavoriteClinic')
+    VetRecord = apps.get_model('pets', 'VetRecord')
+
+    def count(model):
+        return Coalesce(Subquery(
+            model.objects.filter(clinic=OuterRef('pk')).order_by()
+            .values('clinic').annotate(value=Count('pk')).values('value')[:1]
+        ), 0)
+
+    def price(aggregate):
+        return Subquery(
+            ClinicService.objects.filter(clinic=OuterRef('pk'), is_available=True).order_by()
+            .values('clinic').annotate(value=aggregate('price')).values('value')[:1]
+        )
+
+    VetClinic.objects.update(
+        services_count=count(ClinicService),
+        favorites_count=count(FavoriteClinic),
+        records_count=count(VetRecord),
+        min_price=price(Min),
+        max_price=price(Max),
+        stats_updated_at=Now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0009_alter_favoriteclinic_options_and_more'),
+        ('pets', '0003_pet_thumbnail_alter_pet_photo_vetrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vetclinic',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='max_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Максимальная цена доступной услуги'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='min_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Минимальная цена доступной услуги'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='records_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число записей'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='services_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число услуг'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='stats_updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата обновления показателей'),
+        ),
+        migrations.AddField(
+            model_name='vetclinic',
+            name='rating',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('favorites_count'), '*', models.Value(5)), '+', models.F('records_count')), output_field=models.PositiveIntegerField(), verbose_name='Рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['-rating', 'id'], name='clinic_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['min_price', 'id'], name='clinic_min_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['-services_count', 'id'], name='clinic_services_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['-favorites_count', 'id'], name='clinic_favorites_count_idx'),
+        ),
+        migrations.RunPython(fill_clinic_stats, migrations.RunPython.noop),
+    ]
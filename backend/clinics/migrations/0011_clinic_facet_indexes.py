@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0010_clinic_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clinicservice',
+            index=models.Index(fields=['service', 'is_available', 'price'], name='clinic_service_facet_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['city', 'name'], name='clinic_city_name_idx'),
+        ),
+    ]
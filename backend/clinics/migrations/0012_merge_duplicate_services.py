@@ -0,0 +1,69 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:31
+
+from django.db import migrations
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def merge_duplicate_services(apps, schema_editor):
+    """
+    Объединяет услуги с одинаковым названием в услугу с наименьшим id:
+    связи с клиниками и записи переносятся на неё, повторная связь
+    с той же клиникой удаляется. Затем пересчитываются показатели
+    затронутых клиник.
+    """
+    Service = apps.get_model('clinics', 'Service')
+    ClinicService = apps.get_model('clinics', 'ClinicService')
+    VetClinic = apps.get_model('clinics', 'VetClinic')
+    VetRecord = apps.get_model('pets', 'VetRecord')
+
+    duplicates = (
+        Service.objects.values('name').annotate(total=Count('pk'), keep=Min('pk'))
+        .filter(total__gt=1).values_list('name', 'keep')
+    )
+    affected = set()
+    for name, keep in list(duplicates):
+        others = list(Service.objects.filter(name=name).exclude(pk=keep).values_list('pk', flat=True))
+        kept_clinics = ClinicService.objects.filter(service_id=keep).values('clinic_id')
+        links = ClinicService.objects.filter(service_id__in=others)
+        affected.update(links.values_list('clinic_id', flat=True))
+
+        links.filter(clinic_id__in=kept_clinics).delete()
+        # Из нескольких дубликатов у одной клиники переносим одну связь
+        for link in links.order_by('clinic_id', 'pk'):
+            if not ClinicService.objects.filter(clinic_id=link.clinic_id, service_id=keep).exists():
+                ClinicService.objects.filter(pk=link.pk).update(service_id=keep)
+        ClinicService.objects.filter(service_id__in=others).delete()
+
+        VetRecord.objects.filter(service_id__in=others).update(service_id=keep)
+        Service.objects.filter(pk__in=others).delete()
+
+    if not affected:
+        return
+
+    def price(aggregate):
+        return Subquery(
+            ClinicService.objects.filter(clinic=OuterRef('pk'), is_available=True).order_by()
+            .values('clinic').annotate(value=aggregate('price')).values('value')[:1]
+        )
+
+    VetClinic.objects.filter(pk__in=affected).update(
+        services_count=Coalesce(Subquery(
+            ClinicService.objects.filter(clinic=OuterRef('pk')).order_by()
+            .values('clinic').annotate(value=Count('pk')).values('value')[:1]
+        ), 0),
+        min_price=price(Min),
+        max_price=price(Max),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0011_clinic_facet_indexes'),
+        ('pets', '0007_documentupload'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_services, migrations.RunPython.noop),
+    ]
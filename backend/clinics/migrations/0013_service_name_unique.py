@@ -0,0 +1,20 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Отдельно от 0012: в PostgreSQL нельзя менять схему таблицы в той же
+    # транзакции, где остались отложенные проверки внешних ключей
+
+    dependencies = [
+        ('clinics', '0012_merge_duplicate_services'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='service',
+            name='name',
+            field=models.CharField(max_length=100, unique=True, verbose_name='Название услуги'),
+        ),
+    ]
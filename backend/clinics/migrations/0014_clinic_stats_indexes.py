@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0013_service_name_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['max_price', 'id'], name='clinic_max_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['-records_count', 'id'], name='clinic_records_count_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0014_clinic_stats_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vetclinic',
+            name='clinic_lat_lon_idx',
+        ),
+        migrations.RemoveField(
+            model_name='vetclinic',
+            name='geohash',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0015_remove_vetclinic_geohash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vetclinic',
+            index=models.Index(fields=['latitude', 'longitude'], name='clinic_lat_lon_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinics', '0016_clinic_lat_lon_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vetclinic',
+            name='admins',
+            field=models.ManyToManyField(blank=True, related_name='administered_clinics', to=settings.AUTH_USER_MODEL, verbose_name='Администраторы клиники'),
+        ),
+    ]
@@ -1,7 +1,19 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
 from django.conf import settings
 from decimal import Decimal
 import math
+from .geo import EARTH_RADIUS_KM, haversine, bounding_box, ClinicGeoMatrix
+from .schedule import working_hours_slots, slot_at
+
+# Конфигурация полнотекстового поиска PostgreSQL
+SEARCH_CONFIG = 'russian'
+# Вес добавления в избранное относительно одного посещения в рейтинге клиники
+RATING_FAVORITE_WEIGHT = 5
 
 class VetClinic(models.Model):
     """
@@ -9,6 +21,7 @@ class VetClinic(models.Model):
     """
     name = models.CharField(
         max_length=200,
+        unique=True,
         verbose_name='Название клиники'
     )
     description = models.TextField(
@@ -17,6 +30,32 @@ class VetClinic(models.Model):
     address = models.TextField(
         verbose_name='Адрес'
     )
+    city = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name='Город'
+    )
+    postal_code = models.CharField(
+        max_length=10,
+        blank=True,
+        default='',
+        verbose_name='Почтовый индекс'
+    )
+    latitude = models.DecimalField(
+        max_digits=9,
+        decimal_places=6,
+        null=True,
+        blank=True,
+        verbose_name='Широта'
+    )
+    longitude = models.DecimalField(
+        max_digits=9,
+        decimal_places=6,
+        null=True,
+        blank=True,
+        verbose_name='Долгота'
+    )
     phone = models.CharField(
         max_length=20,
         verbose_name='Телефон'
@@ -32,10 +71,73 @@ class VetClinic(models.Model):
     working_hours = models.TextField(
         verbose_name='Часы работы'
     )
+    open_slots = ArrayField(
+        models.SmallIntegerField(),
+        default=list,
+        blank=True,
+        editable=False,
+        verbose_name='Слоты работы'
+    )
     is_active = models.BooleanField(
         default=True,
         verbose_name='Активна'
     )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('name', weight='A', config=SEARCH_CONFIG) +
+            SearchVector('address', weight='B', config=SEARCH_CONFIG) +
+            SearchVector('description', weight='C', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name='Поисковый вектор'
+    )
+    # Сводные показатели для карточек клиник. Поддерживаются сигналами
+    # (clinics.stats), полный пересчет - команда recompute_clinic_stats
+    services_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число услуг'
+    )
+    min_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Минимальная цена доступной услуги'
+    )
+    max_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Максимальная цена доступной услуги'
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='В избранном'
+    )
+    records_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число записей'
+    )
+    # Отзывов в системе нет: рейтинг - популярность по избранному и посещениям
+    rating = models.GeneratedField(
+        expression=models.F('favorites_count') * RATING_FAVORITE_WEIGHT + models.F('records_count'),
+        output_field=models.PositiveIntegerField(),
+        db_persist=True,
+        verbose_name='Рейтинг'
+    )
+    stats_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата обновления показателей'
+    )
+    admins = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name='administered_clinics',
+        verbose_name='Администраторы клиники'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания'
@@ -49,40 +151,114 @@ class VetClinic(models.Model):
         verbose_name = 'Ветеринарная клиника'
         verbose_name_plural = 'Ветеринарные клиники'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-rating', 'id'], name='clinic_rating_idx'),
+            models.Index(fields=['min_price', 'id'], name='clinic_min_price_idx'),
+            models.Index(fields=['max_price', 'id'], name='clinic_max_price_idx'),
+            models.Index(fields=['-records_count', 'id'], name='clinic_records_count_idx'),
+            models.Index(fields=['-services_count', 'id'], name='clinic_services_count_idx'),
+            models.Index(fields=['-favorites_count', 'id'], name='clinic_favorites_count_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='clinic_lat_lon_idx'),
+            models.Index(fields=['city', 'name'], name='clinic_city_name_idx'),
+            GinIndex(fields=['open_slots'], name='clinic_open_slots_idx'),
+            GinIndex(fields=['search_vector'], name='clinic_search_vector_idx'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='clinic_name_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.open_slots = working_hours_slots(self.working_hours)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'working_hours' in update_fields:
+                update_fields.add('open_slots')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def open_at_q(moment=None):
+        """
+        Условие "клиника работает в указанный момент" (по умолчанию - сейчас).
+        Проверка вхождения слота использует GIN-индекс по open_slots.
+        """
+        return Q(is_active=True, open_slots__contains=[slot_at(moment)])
+
+    def is_open_at(self, moment=None):
+        return self.is_active and slot_at(moment) in self.open_slots
+
     def calculate_distance(self, lat, lon):
         """
         Рассчитывает расстояние до клиники по формуле гаверсинусов
         """
-        R = 6371  # Радиус Земли в километрах
-
-        lat1, lon1 = float(self.latitude), float(self.longitude)
-        lat2, lon2 = float(lat), float(lon)
+        if self.latitude is None or self.longitude is None:
+            return None
 
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+        distance = haversine(float(self.latitude), float(self.longitude),
+                             float(lat), float(lon))
+        return round(distance, 2)
 
-        a = (math.sin(dlat/2) * math.sin(dlat/2) +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-             math.sin(dlon/2) * math.sin(dlon/2))
+    @staticmethod
+    def distance_expression(lat, lon):
+        """
+        Расстояние (км) от точки до клиники по формуле гаверсинусов в SQL
+        """
+        lat, lon = math.radians(lat), math.radians(lon)
+        clinic_lat = Radians(Cast('latitude', FloatField()))
+        clinic_lon = Radians(Cast('longitude', FloatField()))
+        a = (
+            Power(Sin((clinic_lat - Value(lat)) / 2), 2) +
+            Value(math.cos(lat)) * Cos(clinic_lat) *
+            Power(Sin((clinic_lon - Value(lon)) / 2), 2)
+        )
+        return 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0))))
 
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
+    @classmethod
+    def with_distance(cls, lat, lon, radius=None, queryset=None):
+        """
+        Активные клиники с координатами и аннотацией distance (км),
+        при radius - только не дальше radius от точки. Кандидаты отбираются
+        ограничивающим прямоугольником по индексу (latitude, longitude),
+        точное расстояние считается в SQL только для них.
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        queryset = queryset.filter(
+            is_active=True, latitude__isnull=False, longitude__isnull=False
+        )
+        if radius is not None:
+            min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius)
+            queryset = queryset.filter(
+                latitude__range=(min_lat, max_lat),
+                longitude__range=(min_lon, max_lon),
+            )
+        queryset = queryset.annotate(distance=cls.distance_expression(lat, lon))
+        if radius is not None:
+            queryset = queryset.filter(distance__lte=radius)
+        return queryset
 
-        return round(distance, 2)
+    @classmethod
+    def load_ranked(cls, ranked, queryset=None):
+        """
+        Загружает клиники для списка пар (расстояние, id), сохраняя порядок
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        clinics = queryset.in_bulk([pk for _, pk in ranked])
+        return [(clinics[pk], round(distance, 2)) for distance, pk in ranked
+                if pk in clinics]
 
     @classmethod
-    def find_nearest(cls, lat, lon, limit=10):
+    def find_nearest(cls, lat, lon, limit=10, radius=None, queryset=None):
         """
         Находит ближайшие клиники к указанным координатам
         """
-        clinics = cls.objects.filter(is_active=True)
-        distances = [(clinic, clinic.calculate_distance(lat, lon)) 
-                    for clinic in clinics]
-        return sorted(distances, key=lambda x: x[1])[:limit]
+        ranked = ClinicGeoMatrix.shared().nearest(
+            float(lat), float(lon), limit=limit, radius=radius
+        )
+        return cls.load_ranked(ranked, queryset)
 
 class Service(models.Model):
     """
@@ -90,6 +266,7 @@ class Service(models.Model):
     """
     name = models.CharField(
         max_length=100,
+        unique=True,
         verbose_name='Название услуги'
     )
     description = models.TextField(
@@ -157,6 +334,10 @@ class ClinicService(models.Model):
         verbose_name_plural = 'Услуги клиник'
         unique_together = ['clinic', 'service']
         ordering = ['clinic', 'service']
+        indexes = [
+            # Фасетный поиск: клиники с услугой, доступностью и ценой в диапазоне
+            models.Index(fields=['service', 'is_available', 'price'], name='clinic_service_facet_idx'),
+        ]
 
     def __str__(self):
         return f'{self.clinic.name} - {self.service.name}'
@@ -186,7 +367,10 @@ class FavoriteClinic(models.Model):
         verbose_name = 'Избранная клиника'
         verbose_name_plural = 'Избранные клиники'
         unique_together = ['user', 'clinic']
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='favorite_user_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} - {self.clinic.name}' 
\ No newline at end of file
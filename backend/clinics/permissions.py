@@ -0,0 +1,35 @@
+from django.db.models import Exists, OuterRef
+from rest_framework import permissions
+from .models import VetClinic
+
+
+def with_admin_flag(queryset, user):
+    """
+    Добавляет клиникам флаг is_administered: пользователь входит
+    в администраторы клиники. Проверка многих клиник - одним запросом
+    """
+    return queryset.annotate(is_administered=Exists(
+        VetClinic.admins.through.objects.filter(vetclinic_id=OuterRef('pk'), customuser_id=user.pk)
+    ))
+
+
+class IsClinicAdmin(permissions.BasePermission):
+    """
+    Администратор клиник или сотрудник сервиса. Роль is_clinic_admin берётся
+    из токена, поэтому проверка обычно обходится без запроса к базе.
+    Изменять клинику может только ее администратор или сотрудник сервиса
+    """
+    message = 'Действие доступно только администраторам клиник'
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_clinic_admin or user.is_staff))
+
+    def has_object_permission(self, request, view, obj):
+        user = request.user
+        if user.is_staff:
+            return True
+        administered = getattr(obj, 'is_administered', None)
+        if administered is None:
+            administered = obj.admins.filter(pk=user.pk).exists()
+        return administered
@@ -0,0 +1,29 @@
+import json
+from rest_framework.renderers import BaseRenderer
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Формат выгрузки каталога: сами данные отдаются потоком из
+    представления, рендерер нужен для выбора формата. Ошибки отдаются
+    как JSON
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = f'application/json; charset={self.charset}'
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
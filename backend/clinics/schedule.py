@@ -0,0 +1,42 @@
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from .validators import parse_working_hours
+
+# Неделя делится на 7 x 96 слотов по 15 минут
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+
+
+def schedule_to_slots(schedule):
+    """
+    Переводит расписание parse_working_hours в отсортированный список
+    номеров 15-минутных слотов недели, полностью попадающих в часы работы
+    """
+    slots = []
+    for day, intervals in enumerate(schedule):
+        offset = day * SLOTS_PER_DAY
+        for opens, closes in intervals:
+            first = -(-opens // SLOT_MINUTES)
+            last = closes // SLOT_MINUTES
+            slots.extend(range(offset + first, offset + last))
+    return sorted(set(slots))
+
+
+def working_hours_slots(working_hours):
+    """
+    Слоты работы для строки часов работы; пустой список, если строку
+    не удалось разобрать
+    """
+    try:
+        return schedule_to_slots(parse_working_hours(working_hours))
+    except (ValidationError, TypeError, AttributeError):
+        return []
+
+
+def slot_at(moment=None):
+    """
+    Номер слота недели для момента времени в часовом поясе проекта
+    """
+    moment = timezone.localtime(moment) if moment is not None else timezone.localtime()
+    return moment.weekday() * SLOTS_PER_DAY + (moment.hour * 60 + moment.minute) // SLOT_MINUTES
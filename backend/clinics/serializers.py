@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import VetClinic, Service, ClinicService, FavoriteClinic
+from .stats import STATS_FIELDS
 
 class ServiceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -13,28 +15,73 @@ class ClinicServiceSerializer(serializers.ModelSerializer):
         model = ClinicService
         fields = ['id', 'clinic', 'service', 'service_name', 'price', 'duration', 'is_available']
 
+class ClinicServiceBulkItemSerializer(serializers.Serializer):
+    """Строка массового обновления услуг клиник"""
+    clinic_id = serializers.IntegerField(min_value=1, required=False)
+    service_id = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    duration = serializers.IntegerField(min_value=1, required=False)
+    is_available = serializers.BooleanField(required=False)
+
+class ClinicServiceBulkSerializer(serializers.Serializer):
+    """
+    Массовое обновление услуг клиник. Строки без clinic_id применяются
+    ко всем клиникам из clinic_ids
+    """
+    clinic_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False,
+        max_length=settings.CLINIC_SERVICE_BULK_MAX_ROWS
+    )
+    # Строки проверяются по одной, чтобы вернуть ошибки по каждой строке
+    items = serializers.ListField(
+        child=serializers.JSONField(), allow_empty=False,
+        max_length=settings.CLINIC_SERVICE_BULK_MAX_ROWS
+    )
+
+class ClinicServiceBulkResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    clinic_id = serializers.IntegerField(allow_null=True)
+    service_id = serializers.IntegerField(allow_null=True)
+    status = serializers.ChoiceField(choices=['created', 'updated', 'error'])
+    errors = serializers.ListField(child=serializers.CharField(), required=False)
+
 class VetClinicSerializer(serializers.ModelSerializer):
     services = ClinicServiceSerializer(many=True, read_only=True)
     is_favorite = serializers.SerializerMethodField()
 
     class Meta:
         model = VetClinic
-        fields = '__all__'
+        exclude = ('open_slots', 'search_vector', 'stats_updated_at', 'admins')
+        read_only_fields = STATS_FIELDS
+
+    def get_favorite_clinic_ids(self):
+        """
+        Загружает id избранных клиник пользователя один раз на запрос.
+        Контекст общий для всех вложенных сериализаторов списка.
+        """
+        if 'favorite_clinic_ids' not in self.context:
+            request = self.context.get('request')
+            if request and request.user.is_authenticated:
+                favorite_ids = set(FavoriteClinic.objects.filter(
+                    user=request.user
+                ).values_list('clinic_id', flat=True))
+            else:
+                favorite_ids = set()
+            self.context['favorite_clinic_ids'] = favorite_ids
+        return self.context['favorite_clinic_ids']
 
     def get_is_favorite(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return FavoriteClinic.objects.filter(
-                user=request.user,
-                clinic=obj
-            ).exists()
-        return False
+        return obj.pk in self.get_favorite_clinic_ids()
 
 class VetClinicCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = VetClinic
-        fields = ('name', 'description', 'address', 'phone', 'email',
-                 'website', 'working_hours')
+        fields = ('name', 'description', 'address', 'city', 'postal_code',
+                 'latitude', 'longitude', 'phone', 'email', 'website',
+                 'working_hours')
+
+class NearestClinicSerializer(VetClinicSerializer):
+    distance = serializers.FloatField(read_only=True)
 
 class FavoriteClinicSerializer(serializers.ModelSerializer):
     clinic_name = serializers.CharField(source='clinic.name', read_only=True)
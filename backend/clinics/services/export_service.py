@@ -0,0 +1,96 @@
+"""
+Потоковая выгрузка каталога клиник в CSV или NDJSON в формате строк,
+который принимает ClinicImportService.
+
+Клиники читаются серверным курсором пакетами по chunk_size вместе
+с названиями услуг, собранными в том же запросе, поэтому память
+не зависит от размера каталога.
+"""
+import csv
+import json
+from typing import Dict, Iterator, Optional
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import QuerySet
+from ..models import VetClinic
+
+# Колонки выгрузки: обязательные поля импорта и координаты
+EXPORT_FIELDS = (
+    'name', 'address', 'city', 'postal_code', 'phone', 'email',
+    'website', 'working_hours', 'services', 'latitude', 'longitude',
+)
+CLINIC_FIELDS = tuple(field for field in EXPORT_FIELDS if field != 'services')
+EXPORT_FORMATS = ('ndjson', 'csv')
+# Разделитель услуг, как в колонке services импорта
+SERVICES_DELIMITER = ', '
+# Размер пакета строк, читаемых из курсора за раз
+DEFAULT_CHUNK_SIZE = 2000
+# Размер блока ответа, байт
+EXPORT_BLOCK_SIZE = 64 * 1024
+
+
+def export_queryset(queryset: Optional[QuerySet] = None) -> QuerySet:
+    """Строки выгрузки: поля клиники и её услуги через запятую одним запросом"""
+    if queryset is None:
+        queryset = VetClinic.objects.all()
+    return queryset.order_by('pk').values('pk', *CLINIC_FIELDS).annotate(
+        services=StringAgg(
+            'services__service__name',
+            delimiter=SERVICES_DELIMITER,
+            ordering='services__service__name',
+            default='',
+        )
+    )
+
+
+def _text(value) -> str:
+    return '' if value is None else str(value)
+
+
+def iter_export_rows(queryset: Optional[QuerySet] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, str]]:
+    """Строки выгрузки в виде словарей со строковыми значениями"""
+    for values in export_queryset(queryset).iterator(chunk_size=chunk_size):
+        yield {field: _text(values[field]) for field in EXPORT_FIELDS}
+
+
+class _Echo:
+    """Файл для csv.writer, возвращающий записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv_lines(rows: Iterator[Dict[str, str]]) -> Iterator[str]:
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson_lines(rows: Iterator[Dict[str, str]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def iter_export(export_format: str, queryset: Optional[QuerySet] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                block_size: int = EXPORT_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Выгрузка в формате export_format (csv или ndjson) блоками
+    около block_size байт в UTF-8
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Неизвестный формат выгрузки: {export_format}')
+    rows = iter_export_rows(queryset, chunk_size)
+    lines = iter_csv_lines(rows) if export_format == 'csv' else iter_ndjson_lines(rows)
+
+    buffer, length = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        length += len(data)
+        if length >= block_size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
@@ -1,66 +1,75 @@
 import csv
 import logging
-from typing import List, Dict, Any
-from django.core.exceptions import ValidationError
-from ..models import VetClinic, Service
-from ..validators import (
-    validate_phone,
-    validate_working_hours,
-    validate_services,
-    validate_postal_code
+from decimal import Decimal
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+from django.db import transaction
+from django.utils import timezone
+from ..cache import invalidate_catalogue
+from ..geo import ClinicGeoMatrix
+from ..models import VetClinic, Service, ClinicService
+from ..schedule import working_hours_slots
+from ..stats import recompute_clinic_stats
+from .validation import (
+    NumberedRow,
+    REQUIRED_FIELDS,
+    iter_validated_chunks,
+    validate_chunk,
+    validate_row,
 )
 
 logger = logging.getLogger(__name__)
 
-class ClinicImportService:
-    def __init__(self):
-        self.required_fields = {
-            'name', 'address', 'city', 'postal_code',
-            'phone', 'email', 'website', 'working_hours', 'services'
-        }
+# Размер пакета строк для массового импорта
+DEFAULT_CHUNK_SIZE = 1000
+# Значения для новых связей клиника-услуга: в CSV нет цены и длительности
+DEFAULT_SERVICE_PRICE = Decimal('0')
+DEFAULT_SERVICE_DURATION = 30
+# Поля клиники, обновляемые при повторном импорте
+CLINIC_UPDATE_FIELDS = [
+    'address', 'city', 'postal_code', 'phone', 'email', 'website',
+    'working_hours', 'open_slots', 'updated_at',
+]
+COORDINATE_FIELDS = ['latitude', 'longitude']
 
-    def validate_row(self, row: Dict[str, Any]) -> List[str]:
-        """Проверяет корректность данных в строке CSV"""
-        errors = []
-        
-        # Проверка наличия обязательных полей
-        missing_fields = self.required_fields - set(row.keys())
-        if missing_fields:
-            errors.append(f"Отсутствуют обязательные поля: {', '.join(missing_fields)}")
-            return errors
-
-        # Валидация данных
-        try:
-            validate_phone(row['phone'])
-        except ValidationError as e:
-            errors.append(f"Ошибка в поле phone: {str(e)}")
 
-        try:
-            validate_working_hours(row['working_hours'])
-        except ValidationError as e:
-            errors.append(f"Ошибка в поле working_hours: {str(e)}")
+def parse_services(services_str: str) -> List[str]:
+    """Разбирает список услуг из строки CSV"""
+    return [s.strip() for s in services_str.split(',') if s.strip()]
 
-        try:
-            validate_services(row['services'])
-        except ValidationError as e:
-            errors.append(f"Ошибка в поле services: {str(e)}")
 
-        try:
-            validate_postal_code(row['postal_code'])
-        except ValidationError as e:
-            errors.append(f"Ошибка в поле postal_code: {str(e)}")
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Разбивает поток на списки не длиннее size"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class ClinicImportService:
+    def __init__(self):
+        self.required_fields = set(REQUIRED_FIELDS)
 
-        return errors
+    def validate_row(self, row: Dict[str, Any]) -> List[str]:
+        """Проверяет корректность данных в строке CSV"""
+        return validate_row(row, self.required_fields)
 
     def process_services(self, clinic: VetClinic, services_str: str) -> None:
         """Обрабатывает и создает связи с услугами"""
-        services = [s.strip() for s in services_str.split(',')]
-        for service_name in services:
+        for service_name in parse_services(services_str):
             service, created = Service.objects.get_or_create(
                 name=service_name,
                 defaults={'description': f'Услуга {service_name}'}
             )
-            clinic.services.add(service)
+            ClinicService.objects.get_or_create(
+                clinic=clinic,
+                service=service,
+                defaults={
+                    'price': DEFAULT_SERVICE_PRICE,
+                    'duration': DEFAULT_SERVICE_DURATION,
+                }
+            )
 
     def import_clinics(self, csv_file_path: str) -> Dict[str, Any]:
         """Импортирует клиники из CSV-файла"""
@@ -76,7 +85,7 @@ class ClinicImportService:
                 reader = csv.DictReader(file)
                 
                 for row_number, row in enumerate(reader, 1):
-                    logger.info(f"Обработка строки {row_number}: {row.get('name', 'Unknown')}")
+                    logger.debug(f"Обработка строки {row_number}: {row.get('name', 'Unknown')}")
                     
                     # Валидация данных
                     errors = self.validate_row(row)
@@ -128,4 +137,153 @@ class ClinicImportService:
                 'errors': [f"Ошибка чтения файла: {str(e)}"]
             })
 
-        return results 
\ No newline at end of file
+        return results
+
+    def validate_chunk(self, rows: List[NumberedRow]) -> Tuple[List[NumberedRow], List[Dict[str, Any]]]:
+        """Проверяет пакет строк, возвращает корректные строки и ошибки"""
+        return validate_chunk(rows, self.required_fields)
+
+    def resolve_services(self, names: Iterable[str]) -> Dict[str, int]:
+        """Возвращает id услуг по названиям, создавая недостающие одним запросом"""
+        names = set(names)
+        existing = dict(
+            Service.objects.filter(name__in=names).values_list('name', 'id')
+        )
+        missing = names - existing.keys()
+        if missing:
+            Service.objects.bulk_create(
+                [Service(name=name, description=f'Услуга {name}') for name in missing],
+                ignore_conflicts=True
+            )
+            existing.update(
+                Service.objects.filter(name__in=missing).values_list('name', 'id')
+            )
+        return existing
+
+    def build_clinic(self, row: Dict[str, Any]) -> VetClinic:
+        """Создает несохраненный объект клиники из строки CSV"""
+        clinic = VetClinic(
+            name=row['name'],
+            address=row['address'],
+            city=row['city'],
+            postal_code=row['postal_code'],
+            phone=row['phone'],
+            email=row['email'],
+            website=row['website'] or None,
+            working_hours=row['working_hours'],
+            open_slots=working_hours_slots(row['working_hours']),
+        )
+        if row.get('latitude') and row.get('longitude'):
+            clinic.latitude = Decimal(row['latitude'])
+            clinic.longitude = Decimal(row['longitude'])
+        return clinic
+
+    def write_chunk(self, rows: List[NumberedRow], with_coordinates: bool = False) -> int:
+        """Сохраняет пакет проверенных строк в одной транзакции"""
+        # Последняя строка с тем же названием побеждает, как при update_or_create
+        rows_by_name = {row['name']: row for _, row in rows}
+        update_fields = CLINIC_UPDATE_FIELDS + (COORDINATE_FIELDS if with_coordinates else [])
+        now = timezone.now()
+
+        with transaction.atomic():
+            clinics = []
+            for row in rows_by_name.values():
+                clinic = self.build_clinic(row)
+                clinic.updated_at = now
+                clinics.append(clinic)
+
+            VetClinic.objects.bulk_create(
+                clinics,
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=update_fields
+            )
+            clinic_ids = dict(
+                VetClinic.objects.filter(name__in=rows_by_name.keys()).values_list('name', 'id')
+            )
+
+            services = {
+                name: parse_services(row['services'])
+                for name, row in rows_by_name.items()
+            }
+            service_ids = self.resolve_services(
+                service_name for names in services.values() for service_name in names
+            )
+
+            ClinicService.objects.bulk_create(
+                [
+                    ClinicService(
+                        clinic_id=clinic_ids[clinic_name],
+                        service_id=service_ids[service_name],
+                        price=DEFAULT_SERVICE_PRICE,
+                        duration=DEFAULT_SERVICE_DURATION,
+                    )
+                    for clinic_name, names in services.items()
+                    for service_name in names
+                ],
+                ignore_conflicts=True
+            )
+            # Массовое создание услуг не отправляет сигналы сводных показателей
+            recompute_clinic_stats(clinic_ids.values())
+
+        return len(rows)
+
+    def import_clinics_bulk(self, csv_file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                            workers: int = 1) -> Dict[str, Any]:
+        """
+        Импортирует клиники из CSV-файла пакетами: файл читается потоково,
+        каждый пакет проверяется (при workers > 1 - в пуле процессов)
+        и записывается массовыми запросами в отдельной транзакции
+        """
+        results = {
+            'success': 0,
+            'errors': 0,
+            'skipped': 0,
+            'details': []
+        }
+
+        try:
+            with open(csv_file_path, 'r', encoding='utf-8') as file:
+                reader = csv.DictReader(file)
+                with_coordinates = {'latitude', 'longitude'} <= set(reader.fieldnames or [])
+
+                validated = iter_validated_chunks(
+                    chunked(enumerate(reader, 1), chunk_size),
+                    workers=workers,
+                    required_fields=self.required_fields
+                )
+                for valid_rows, details in validated:
+                    results['errors'] += len(details)
+                    results['details'].extend(details)
+                    if not valid_rows:
+                        continue
+
+                    try:
+                        results['success'] += self.write_chunk(valid_rows, with_coordinates)
+                    except Exception as e:
+                        results['errors'] += len(valid_rows)
+                        results['details'].append({
+                            'row': valid_rows[0][0],
+                            'clinic': f'Строки {valid_rows[0][0]}-{valid_rows[-1][0]}',
+                            'errors': [str(e)]
+                        })
+                        logger.error(f"Ошибка при записи пакета строк {valid_rows[0][0]}-{valid_rows[-1][0]}: {str(e)}")
+                        continue
+
+                    logger.info(f"Импортировано строк: {results['success']}, ошибок: {results['errors']}")
+
+        except Exception as e:
+            logger.error(f"Ошибка при чтении файла: {str(e)}")
+            results['errors'] += 1
+            results['details'].append({
+                'row': 0,
+                'clinic': 'File',
+                'errors': [f"Ошибка чтения файла: {str(e)}"]
+            })
+
+        # Массовые запросы не отправляют сигналы - перестраиваем матрицу
+        # расстояний во всех процессах и сбрасываем кэш каталога
+        ClinicGeoMatrix.invalidate()
+        invalidate_catalogue()
+
+        return results
@@ -0,0 +1,152 @@
+from typing import List, Dict, Any, Iterable, Optional
+from django.db import transaction
+from django.utils import timezone
+from ..cache import invalidate_catalogue
+from ..models import VetClinic, Service, ClinicService
+from ..stats import recompute_clinic_stats
+
+# Изменяемые поля услуги клиники
+CLINIC_SERVICE_FIELDS = ('price', 'duration', 'is_available')
+# Поля, без которых нельзя создать новую связь клиника-услуга
+CLINIC_SERVICE_REQUIRED_FIELDS = ('price', 'duration')
+# Размер пакета строк в одном UPDATE/INSERT
+BULK_BATCH_SIZE = 1000
+
+
+def expand_row(index: int, item: Dict[str, Any], clinic_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Разворачивает строку без clinic_id на все клиники из clinic_ids:
+    одна строка прайса применяется ко всей сети клиник
+    """
+    if item.get('clinic_id') is not None or not clinic_ids:
+        return [{**item, 'index': index}]
+    return [{**item, 'clinic_id': clinic_id, 'index': index} for clinic_id in clinic_ids]
+
+
+def expanded_row_count(items: List[Any], clinic_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Число строк после expand_row без разворота: позволяет отклонить
+    слишком большой запрос до создания строк в памяти
+    """
+    if not clinic_ids:
+        return len(items)
+    clinic_count = len(clinic_ids)
+    return sum(
+        1 if isinstance(item, dict) and item.get('clinic_id') is not None else clinic_count
+        for item in items
+    )
+
+
+def _result(row, status, errors=None):
+    result = {
+        'index': row['index'],
+        'clinic_id': row.get('clinic_id'),
+        'service_id': row.get('service_id'),
+        'status': status,
+    }
+    if errors:
+        result['errors'] = errors
+    return result
+
+
+def apply_clinic_service_updates(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Обновляет и создает услуги клиник по проверенным строкам
+    {index, clinic_id, service_id, price?, duration?, is_available?}.
+    Строки с ключом errors не прошли проверку формата и только попадают в ответ.
+
+    Существование клиник и услуг проверяется двумя запросами, текущие
+    связи читаются одним запросом с блокировкой, изменения записываются
+    одним bulk_update и одним bulk_create в общей транзакции.
+    Возвращает статус по каждой строке: created, updated или error.
+    """
+    results = {}
+    errors = {}
+
+    def fail(position, message):
+        errors.setdefault(position, []).append(message)
+
+    for position, row in enumerate(rows):
+        if row.get('errors'):
+            errors[position] = list(row['errors'])
+        elif row.get('clinic_id') is None:
+            fail(position, 'Не указана клиника: clinic_id или clinic_ids')
+
+    clinic_ids = {row['clinic_id'] for position, row in enumerate(rows) if position not in errors}
+    service_ids = {row['service_id'] for position, row in enumerate(rows) if position not in errors}
+    known_clinics = set(VetClinic.objects.filter(pk__in=clinic_ids).values_list('pk', flat=True))
+    known_services = set(Service.objects.filter(pk__in=service_ids).values_list('pk', flat=True))
+
+    seen = {}
+    for position, row in enumerate(rows):
+        if position in errors:
+            continue
+        if row['clinic_id'] not in known_clinics:
+            fail(position, f'Клиника {row["clinic_id"]} не найдена')
+        if row['service_id'] not in known_services:
+            fail(position, f'Услуга {row["service_id"]} не найдена')
+        key = (row['clinic_id'], row['service_id'])
+        if key in seen:
+            fail(position, f'Услуга клиники уже указана в строке {rows[seen[key]]["index"]}')
+        else:
+            seen[key] = position
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            (link.clinic_id, link.service_id): link
+            for link in ClinicService.objects.select_for_update().filter(
+                clinic_id__in=known_clinics, service_id__in=known_services
+            )
+        }
+
+        to_update, update_fields = [], {'updated_at'}
+        # Новые связи группируются по набору переданных полей: при
+        # конфликте обновляются только поля, указанные в строке
+        to_create = {}
+        for position, row in enumerate(rows):
+            if position in errors:
+                continue
+            values = {field: row[field] for field in CLINIC_SERVICE_FIELDS if field in row}
+            link = existing.get((row['clinic_id'], row['service_id']))
+            if link is not None:
+                for field, value in values.items():
+                    setattr(link, field, value)
+                link.updated_at = now
+                update_fields.update(values)
+                to_update.append(link)
+                results[position] = _result(row, 'updated')
+                continue
+
+            missing = [field for field in CLINIC_SERVICE_REQUIRED_FIELDS if field not in values]
+            if missing:
+                fail(position, f'Для новой услуги клиники обязательны поля: {", ".join(missing)}')
+                continue
+            to_create.setdefault(tuple(sorted(values)), []).append(ClinicService(
+                clinic_id=row['clinic_id'], service_id=row['service_id'], **values
+            ))
+            results[position] = _result(row, 'created')
+
+        if to_update:
+            ClinicService.objects.bulk_update(to_update, sorted(update_fields), batch_size=BULK_BATCH_SIZE)
+        created = []
+        for fields, links in to_create.items():
+            # Связь могла появиться в параллельном запросе после чтения
+            # existing: вместо ошибки уникальности записываем новые значения
+            ClinicService.objects.bulk_create(
+                links,
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['clinic', 'service'],
+                update_fields=[*fields, 'updated_at'],
+            )
+            created.extend(links)
+        if to_update or created:
+            # Массовые операции не отправляют сигналы: пересчитываем сводные
+            # показатели затронутых клиник и сбрасываем кэш каталога
+            recompute_clinic_stats({link.clinic_id for link in to_update + created})
+            invalidate_catalogue()
+
+    for position, messages in errors.items():
+        results[position] = _result(rows[position], 'error', messages)
+    return [results[position] for position in range(len(rows))]
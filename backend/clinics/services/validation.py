@@ -0,0 +1,106 @@
+"""
+Проверка строк CSV при импорте клиник.
+
+Модуль не обращается к моделям и настройкам Django, поэтому его функции
+можно выполнять в дочерних процессах пула проверки.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+from django.core.exceptions import ValidationError
+from ..validators import (
+    validate_phone,
+    validate_working_hours,
+    validate_services,
+    validate_postal_code,
+    validate_latitude,
+    validate_longitude
+)
+
+REQUIRED_FIELDS = frozenset({
+    'name', 'address', 'city', 'postal_code',
+    'phone', 'email', 'website', 'working_hours', 'services'
+})
+
+# Поля и их валидаторы в порядке проверки
+FIELD_VALIDATORS = (
+    ('phone', validate_phone),
+    ('working_hours', validate_working_hours),
+    ('services', validate_services),
+    ('postal_code', validate_postal_code),
+)
+# Необязательные поля координат: проверяются, только если заполнены
+COORDINATE_VALIDATORS = (
+    ('latitude', validate_latitude),
+    ('longitude', validate_longitude),
+)
+
+NumberedRow = Tuple[int, Dict[str, Any]]
+ErrorDetail = Dict[str, Any]
+
+
+def validate_row(row: Dict[str, Any], required_fields: Iterable[str] = REQUIRED_FIELDS) -> List[str]:
+    """Проверяет корректность данных в строке CSV"""
+    missing_fields = set(required_fields) - set(row.keys())
+    if missing_fields:
+        return [f"Отсутствуют обязательные поля: {', '.join(sorted(missing_fields))}"]
+
+    errors = []
+    for field, validator in FIELD_VALIDATORS:
+        try:
+            validator(row[field])
+        except ValidationError as e:
+            errors.append(f"Ошибка в поле {field}: {str(e)}")
+
+    filled = [field for field, _ in COORDINATE_VALIDATORS if row.get(field)]
+    if len(filled) == 1:
+        errors.append('Координаты должны быть указаны вместе: latitude и longitude')
+    for field, validator in COORDINATE_VALIDATORS:
+        if field not in filled:
+            continue
+        try:
+            validator(row[field])
+        except ValidationError as e:
+            errors.append(f"Ошибка в поле {field}: {str(e)}")
+    return errors
+
+
+def validate_chunk(rows: List[NumberedRow], required_fields: Iterable[str] = REQUIRED_FIELDS) -> Tuple[List[NumberedRow], List[ErrorDetail]]:
+    """Проверяет пакет строк, возвращает корректные строки и ошибки"""
+    valid_rows = []
+    details = []
+    for row_number, row in rows:
+        errors = validate_row(row, required_fields)
+        if errors:
+            details.append({
+                'row': row_number,
+                'clinic': row.get('name', 'Unknown'),
+                'errors': errors
+            })
+        else:
+            valid_rows.append((row_number, row))
+    return valid_rows, details
+
+
+def iter_validated_chunks(chunks: Iterable[List[NumberedRow]], workers: int = 1,
+                          required_fields: Iterable[str] = REQUIRED_FIELDS) -> Iterator[Tuple[List[NumberedRow], List[ErrorDetail]]]:
+    """
+    Проверяет пакеты строк и возвращает результаты в исходном порядке.
+    При workers > 1 пакеты проверяются в пуле процессов; в работе находится
+    не более 2 * workers пакетов, поэтому файл не читается в память целиком.
+    """
+    required_fields = frozenset(required_fields)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield validate_chunk(chunk, required_fields)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(validate_chunk, chunk, required_fields))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
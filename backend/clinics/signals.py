@@ -0,0 +1,92 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .cache import invalidate_catalogue
+from .geo import ClinicGeoMatrix
+from .models import VetClinic, ClinicService, Service, FavoriteClinic
+from .stats import update_clinic_stats
+
+
+@receiver(post_save, sender=VetClinic)
+def update_clinic_geo_matrix(sender, instance, **kwargs):
+    """Обновляет координаты клиники в матрице расстояний после коммита"""
+    point = None
+    if instance.is_active and instance.latitude is not None and instance.longitude is not None:
+        point = (instance.latitude, instance.longitude)
+    pk = instance.pk
+    transaction.on_commit(lambda: ClinicGeoMatrix.apply_change(pk, point))
+
+
+@receiver(post_delete, sender=VetClinic)
+def remove_clinic_from_geo_matrix(sender, instance, **kwargs):
+    """Удаляет клинику из матрицы расстояний после коммита"""
+    pk = instance.pk
+    transaction.on_commit(lambda: ClinicGeoMatrix.apply_change(pk))
+
+
+@receiver(post_save, sender=VetClinic)
+@receiver(post_delete, sender=VetClinic)
+@receiver(post_save, sender=ClinicService)
+@receiver(post_delete, sender=ClinicService)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_catalogue_cache(sender, **kwargs):
+    """Сбрасывает кэш ответов каталога при изменении клиник и услуг"""
+    invalidate_catalogue()
+
+
+@receiver(post_init, sender=ClinicService)
+@receiver(post_init, sender='pets.VetRecord')
+def remember_stats_clinic(sender, instance, **kwargs):
+    """Запоминает клинику, к которой объект относился при загрузке"""
+    instance._stats_clinic_id = instance.__dict__.get('clinic_id')
+
+
+def _moved_from(instance, created):
+    # Клиника, из которой объект перенесен при сохранении, или None
+    previous = getattr(instance, '_stats_clinic_id', None)
+    instance._stats_clinic_id = instance.clinic_id
+    if created or previous == instance.clinic_id:
+        return None
+    return previous
+
+
+@receiver(post_save, sender=ClinicService)
+def count_clinic_service(sender, instance, created, **kwargs):
+    """Число услуг и диапазон цен клиники"""
+    previous = _moved_from(instance, created)
+    if previous is not None:
+        update_clinic_stats(previous, services=-1, prices=True)
+    update_clinic_stats(
+        instance.clinic_id, services=1 if created or previous is not None else 0, prices=True
+    )
+
+
+@receiver(post_delete, sender=ClinicService)
+def uncount_clinic_service(sender, instance, **kwargs):
+    update_clinic_stats(instance.clinic_id, services=-1, prices=True)
+
+
+@receiver(post_save, sender=FavoriteClinic)
+def count_favorite(sender, instance, created, **kwargs):
+    if created:
+        update_clinic_stats(instance.clinic_id, favorites=1)
+
+
+@receiver(post_delete, sender=FavoriteClinic)
+def uncount_favorite(sender, instance, **kwargs):
+    update_clinic_stats(instance.clinic_id, favorites=-1)
+
+
+@receiver(post_save, sender='pets.VetRecord')
+def count_record(sender, instance, created, **kwargs):
+    previous = _moved_from(instance, created)
+    if previous is not None:
+        update_clinic_stats(previous, records=-1)
+    if created or previous is not None:
+        update_clinic_stats(instance.clinic_id, records=1)
+
+
+@receiver(post_delete, sender='pets.VetRecord')
+def uncount_record(sender, instance, **kwargs):
+    update_clinic_stats(instance.clinic_id, records=-1)
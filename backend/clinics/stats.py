@@ -0,0 +1,76 @@
+"""
+Сводные показатели клиник: число услуг, диапазон цен доступных услуг,
+число добавлений в избранное и записей. Счетчики меняются атомарными
+UPDATE с F(), цены пересчитываются подзапросом по услугам одной клиники.
+"""
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from .cache import touch_catalogue_stats
+from .models import VetClinic, ClinicService, FavoriteClinic
+
+# Показатели, доступные для сортировки и фильтрации списка клиник
+STATS_FIELDS = (
+    'services_count', 'min_price', 'max_price', 'favorites_count', 'records_count', 'rating',
+)
+
+
+def _add(field, delta):
+    # Счетчик не уходит в минус, даже если разошелся с данными до пересчета
+    return Greatest(F(field) + delta, Value(0))
+
+
+def _price_subquery(aggregate):
+    return Subquery(
+        ClinicService.objects.filter(clinic=OuterRef('pk'), is_available=True)
+        .order_by().values('clinic').annotate(value=aggregate('price')).values('value')[:1]
+    )
+
+
+def _count_subquery(queryset):
+    return Coalesce(Subquery(
+        queryset.filter(clinic=OuterRef('pk'))
+        .order_by().values('clinic').annotate(value=Count('pk')).values('value')[:1]
+    ), 0)
+
+
+def update_clinic_stats(clinic_id, services=0, favorites=0, records=0, prices=False):
+    """
+    Одним UPDATE меняет счетчики клиники на заданные приращения
+    и при prices=True пересчитывает диапазон цен. Кэш каталога не
+    сбрасывается: изменения услуг сбрасывают его в своих сигналах,
+    а счетчики меняют только поколение catalogue_stats_state
+    """
+    if clinic_id is None:
+        return
+    values = {'stats_updated_at': timezone.now()}
+    for field, delta in (('services_count', services), ('favorites_count', favorites),
+                         ('records_count', records)):
+        if delta:
+            values[field] = _add(field, delta)
+    if prices:
+        values['min_price'] = _price_subquery(Min)
+        values['max_price'] = _price_subquery(Max)
+    VetClinic.objects.filter(pk=clinic_id).update(**values)
+    touch_catalogue_stats()
+
+
+def recompute_clinic_stats(clinic_ids=None):
+    """
+    Полностью пересчитывает показатели клиник (всех, если clinic_ids=None).
+    Нужен после массовых операций, которые не отправляют сигналы.
+    Возвращает число обновленных клиник.
+    """
+    from pets.models import VetRecord
+
+    queryset = VetClinic.objects.all()
+    if clinic_ids is not None:
+        queryset = queryset.filter(pk__in=list(clinic_ids))
+    return queryset.update(
+        services_count=_count_subquery(ClinicService.objects.all()),
+        favorites_count=_count_subquery(FavoriteClinic.objects.all()),
+        records_count=_count_subquery(VetRecord.objects.all()),
+        min_price=_price_subquery(Min),
+        max_price=_price_subquery(Max),
+        stats_updated_at=timezone.now(),
+    )
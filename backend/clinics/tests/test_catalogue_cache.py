@@ -0,0 +1,106 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from core.cache import LocalLRUCache, TieredCache
+from core.tests.test_base import BaseAPITest
+from clinics.cache import catalogue_cache
+from clinics.models import VetClinic, Service, ClinicService
+
+class TieredCacheTest(SimpleTestCase):
+    def test_local_lru_evicts_oldest_entry(self):
+        """Test LRU keeps only the most recently used entries."""
+        lru = LocalLRUCache(max_entries=2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(len(lru), 2)
+
+    def test_bump_invalidates_all_keys(self):
+        """Test generation bump hides entries in both tiers."""
+        cache = TieredCache('test-tiered')
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        cache.bump()
+        self.assertIsNone(cache.get('key'))
+
+        cache.set('key', 'new value')
+        cache.clear_local()
+        self.assertEqual(cache.get('key'), 'new value')
+
+
+class CatalogueCacheAPITest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        catalogue_cache.clear_local()
+        self.clinic = VetClinic.objects.create(
+            name='Test Clinic',
+            description='Test Description',
+            address='Test Address',
+            phone='+74950000000',
+            email='clinic@example.com',
+            working_hours='Mo-Fr 9-18'
+        )
+        self.service = Service.objects.create(
+            name='Test Service',
+            description='Test Description',
+            category='Test'
+        )
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_anonymous_list_is_cached(self):
+        """Test repeated anonymous list is served without queries."""
+        response, _ = self.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        response, queries = self.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(queries, 0)
+        self.assertEqual(response.data['results'][0]['name'], 'Test Clinic')
+
+    def test_cache_key_uses_normalized_params(self):
+        """Test equivalent query strings share one cache entry."""
+        self.get(self.url, {'search': ' Test  Clinic', 'page': 1})
+        response, queries = self.get(self.url, {'search': 'test clinic', 'utm_source': 'mail'})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(queries, 0)
+        response, _ = self.get(self.url, {'search': 'other'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_clinic_and_service_changes_invalidate_cache(self):
+        """Test saves of clinics, clinic services and services bump the generation."""
+        detail_url = f'{self.url}{self.clinic.pk}/'
+        self.get(detail_url)
+
+        ClinicService.objects.create(clinic=self.clinic, service=self.service, price=100, duration=30)
+        response, _ = self.get(detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['services']), 1)
+
+        self.clinic.name = 'Renamed Clinic'
+        self.clinic.save()
+        response, _ = self.get(detail_url)
+        self.assertEqual(response.data['name'], 'Renamed Clinic')
+
+        self.get('/api/services/')
+        self.service.name = 'Renamed Service'
+        self.service.save()
+        response, _ = self.get('/api/services/')
+        self.assertEqual(response.data['results'][0]['name'], 'Renamed Service')
+
+    def test_authenticated_requests_are_not_cached(self):
+        """Test per-user fields are never served from cache."""
+        self.authenticate()
+        self.get(self.url)
+        response, queries = self.get(self.url)
+        self.assertNotIn('X-Cache', response)
+        self.assertGreater(queries, 0)
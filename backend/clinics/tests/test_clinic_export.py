@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, Service, ClinicService
+from clinics.services.export_service import EXPORT_FIELDS, iter_export
+from clinics.services.import_service import ClinicImportService
+from clinics.tests.test_import_service import CLINICS_CSV
+
+
+class ClinicExportTest(BaseAPITest):
+    url = '/api/clinics/export/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.source = self.write_file(CLINICS_CSV)
+        ClinicImportService().import_clinics_bulk(self.source)
+
+    def write_file(self, content, suffix='.csv'):
+        tmp_file = tempfile.NamedTemporaryFile('w', suffix=suffix, encoding='utf-8', delete=False)
+        tmp_file.write(content)
+        tmp_file.close()
+        self.addCleanup(os.unlink, tmp_file.name)
+        return tmp_file.name
+
+    def get_export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_is_default(self):
+        """Test NDJSON export has one object per clinic with joined services."""
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['ВетКлиника №1', 'ВетКлиника №2', 'ВетКлиника №3'])
+        self.assertEqual(set(rows[0]), set(EXPORT_FIELDS))
+        self.assertEqual(rows[0]['services'], 'Вакцинация, Стоматология, Хирургия')
+        self.assertEqual(rows[0]['latitude'], '')
+
+    def test_csv_round_trip(self):
+        """Test CSV export can be imported back unchanged."""
+        content = self.get_export(format='csv')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]['working_hours'], 'Mo-Fr 10-20, Sa-Su 10-16')
+
+        VetClinic.objects.all().delete()
+        results = ClinicImportService().import_clinics_bulk(self.write_file(content))
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(VetClinic.objects.count(), 3)
+        self.assertEqual(ClinicService.objects.count(), 10)
+        self.assertEqual(self.get_export(format='csv'), content)
+
+    def test_inactive_clinics_only_for_staff(self):
+        """Test hidden clinics are exported to staff but not to other users."""
+        VetClinic.objects.filter(name='ВетКлиника №2').update(is_active=False)
+        names = [json.loads(line)['name'] for line in self.get_export().splitlines()]
+        self.assertEqual(names, ['ВетКлиника №1', 'ВетКлиника №3'])
+
+        self.user.is_staff = True
+        self.user.save()
+        self.authenticate()
+        self.assertEqual(len(self.get_export().splitlines()), 3)
+
+    def test_city_filter_and_accept_header(self):
+        """Test city filter and format negotiation by Accept header."""
+        VetClinic.objects.filter(name='ВетКлиника №2').update(city='Казань')
+        response = self.client.get(self.url, {'city': 'Казань'}, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('clinics.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['name'] for row in rows], ['ВетКлиника №2'])
+
+    def test_query_count_is_constant(self):
+        """Test services are joined in the export query, not loaded per clinic."""
+        with CaptureQueriesContext(connection) as small:
+            self.get_export()
+        service = Service.objects.create(name='Груминг', description='Test Description')
+        for i in range(5):
+            clinic = VetClinic.objects.create(
+                name=f'Clinic {i}', address='Test Address', phone='+74950000000',
+                email='clinic@example.com', working_hours='Mo-Fr 9-18'
+            )
+            ClinicService.objects.create(clinic=clinic, service=service, price=100, duration=30)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(len(self.get_export().splitlines()), 8)
+        self.assertEqual(len(large), len(small))
+
+    def test_small_chunks_and_blocks(self):
+        """Test output does not depend on cursor chunk and block sizes."""
+        expected = b''.join(iter_export('csv'))
+        blocks = list(iter_export('csv', chunk_size=1, block_size=1))
+        self.assertEqual(len(blocks), 4)
+        self.assertEqual(b''.join(blocks), expected)
+        with self.assertRaises(ValueError):
+            list(iter_export('xml'))
+
+    def test_export_command(self):
+        """Test command writes the chosen format to a file or stdout."""
+        output = self.write_file('')
+        call_command('export_clinics', output, stdout=io.StringIO())
+        with open(output, encoding='utf-8', newline='') as file:
+            self.assertEqual(file.read(), self.get_export(format='csv'))
+
+        stdout = io.StringIO()
+        call_command('export_clinics', '--chunk-size', '1', stdout=stdout)
+        self.assertEqual(stdout.getvalue(), self.get_export())
@@ -0,0 +1,123 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, Service, ClinicService
+
+
+class ClinicFacetsTest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.services = [
+            Service.objects.create(name=f'Service {i}', description='Test Description', category='Test')
+            for i in range(3)
+        ]
+        # Клиника: город, {номер услуги: (цена, доступна)}
+        layout = [
+            ('Москва', {0: (400, True), 1: (1500, True)}),
+            ('Москва', {0: (900, True), 2: (6000, True)}),
+            ('Казань', {1: (700, True), 2: (3000, False)}),
+            ('Казань', {}),
+        ]
+        self.clinics = []
+        for i, (city, offers) in enumerate(layout):
+            clinic = VetClinic.objects.create(
+                name=f'Clinic {i}',
+                description='Test Description',
+                address='Test Address',
+                city=city,
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+            for index, (price, available) in offers.items():
+                ClinicService.objects.create(
+                    clinic=clinic, service=self.services[index],
+                    price=price, duration=30, is_available=available
+                )
+            self.clinics.append(clinic)
+
+    def names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(clinic['name'] for clinic in response.data['results'])
+
+    def test_single_service_is_backward_compatible(self):
+        """Test a single service ID still filters clinics."""
+        self.assertEqual(self.names(service=self.services[2].pk), ['Clinic 1', 'Clinic 2'])
+
+    def test_multiple_services_any_and_all(self):
+        """Test OR and AND semantics without duplicated clinics."""
+        ids = f'{self.services[0].pk},{self.services[1].pk}'
+        self.assertEqual(self.names(service=ids), ['Clinic 0', 'Clinic 1', 'Clinic 2'])
+        self.assertEqual(self.names(service=ids, service_match='all'), ['Clinic 0'])
+
+        response = self.client.get(
+            f'{self.url}?service={self.services[0].pk}&service={self.services[2].pk}&service_match=all'
+        )
+        self.assertEqual([c['name'] for c in response.data['results']], ['Clinic 1'])
+
+    def test_price_availability_and_city(self):
+        """Test price range applies to the selected services together with availability and city."""
+        self.assertEqual(
+            self.names(service=self.services[0].pk, price_max=500), ['Clinic 0']
+        )
+        self.assertEqual(self.names(price_min=2000), ['Clinic 1', 'Clinic 2'])
+        self.assertEqual(self.names(price_min=2000, is_available='true'), ['Clinic 1'])
+        self.assertEqual(self.names(city='Казань'), ['Clinic 2', 'Clinic 3'])
+        self.assertEqual(self.names(city='Казань', service=self.services[1].pk), ['Clinic 2'])
+
+    def test_invalid_params(self):
+        """Test malformed facet params return 400."""
+        for params in ({'service': 'abc'}, {'service_match': 'some'}, {'price_min': 'x'},
+                       {'price_min': 10, 'price_max': 5}, {'is_available': 'maybe'},
+                       {'price_min': '1e999999999'}, {'price_max': '-100000000'},
+                       {'price_max': '99999999.999'}, {'min_price_max': '1e30'},
+                       {'rating_min': '1e999999999'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
+
+    def test_number_params_are_rounded_to_price_precision(self):
+        """Test prices at the column limit and with extra decimals are accepted."""
+        self.assertEqual(self.names(price_min='5999.999', price_max='99999999.99'), ['Clinic 1'])
+        self.assertEqual(self.names(price_max='399.996'), ['Clinic 0'])
+
+    def test_facet_counts_in_one_query(self):
+        """Test facet counts come from a single grouped query."""
+        self.authenticate()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'city': 'Москва', 'facets': 'true'})
+        self.assertEqual(response.status_code, 200)
+
+        facet_queries = [q for q in queries.captured_queries if 'UNION ALL' in q['sql']]
+        self.assertEqual(len(facet_queries), 1)
+
+        facets = response.data['facets']
+        self.assertEqual(facets['services'], [
+            {'service_id': self.services[0].pk, 'count': 2},
+            {'service_id': self.services[1].pk, 'count': 1},
+            {'service_id': self.services[2].pk, 'count': 1},
+        ])
+        self.assertEqual(
+            [(bucket['min'], bucket['max'], bucket['count']) for bucket in facets['prices']],
+            [(None, 500, 1), (500, 1000, 1), (1000, 2000, 1), (2000, 5000, 0), (5000, None, 1)]
+        )
+
+    def test_facets_follow_filters(self):
+        """Test price facets count only offers matching the filters."""
+        response = self.client.get(self.url, {
+            'service': self.services[2].pk, 'is_available': 'true', 'facets': 'true',
+        })
+        facets = response.data['facets']
+        self.assertEqual([c['name'] for c in response.data['results']], ['Clinic 1'])
+        self.assertEqual([bucket['count'] for bucket in facets['prices']], [0, 0, 0, 0, 1])
+        self.assertEqual(
+            {item['service_id'] for item in facets['services']},
+            {self.services[0].pk, self.services[2].pk}
+        )
+
+        response = self.client.get(self.url, {'service': self.services[2].pk})
+        self.assertNotIn('facets', response.data)
@@ -0,0 +1,128 @@
+from datetime import datetime
+from django.utils import timezone
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic
+from clinics.schedule import SLOTS_PER_DAY, slot_at
+
+class ClinicOpenFilterTest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.clinics = {}
+        for name, working_hours in (
+            ('Weekdays', 'Mo-Fr 9-18'),
+            ('Weekends', 'Sa-Su 10-16'),
+            ('Round the clock', 'Mo-Su 0-24'),
+            ('Evening', 'Mo-Fr 18:30-23:45'),
+        ):
+            self.clinics[name] = VetClinic.objects.create(
+                name=name,
+                description='Test Description',
+                address='Test Address',
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours=working_hours
+            )
+        VetClinic.objects.filter(name='Evening').update(is_active=False)
+
+    def open_names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return {c['name'] for c in response.data['results']}
+
+    def test_open_slots_are_stored_on_save(self):
+        """Test working hours are converted to weekly quarter-hour slots."""
+        clinic = self.clinics['Weekdays']
+        self.assertEqual(len(clinic.open_slots), 5 * 9 * 4)
+        self.assertEqual(clinic.open_slots[0], 9 * 4)
+        self.assertEqual(clinic.open_slots[-1], 4 * SLOTS_PER_DAY + 18 * 4 - 1)
+        self.assertEqual(len(self.clinics['Round the clock'].open_slots), 7 * SLOTS_PER_DAY)
+
+    def test_overnight_open_slots(self):
+        """Test overnight hours cover the next morning, Sunday night included."""
+        clinic = VetClinic.objects.create(
+            name='Night', address='Test Address', phone='+74950000000',
+            email='clinic@example.com', working_hours='Mo-Su 20-8'
+        )
+        self.assertEqual(len(clinic.open_slots), 7 * 12 * 4)
+        self.assertEqual(clinic.open_slots[0], 0)
+        self.assertIn(6 * SLOTS_PER_DAY + 23 * 4, clinic.open_slots)
+        self.assertNotIn(8 * 4, clinic.open_slots)
+
+    def test_slot_at_uses_local_time(self):
+        """Test moments are mapped to slots in the project time zone."""
+        monday = timezone.make_aware(datetime(2024, 3, 11, 9, 20))
+        self.assertEqual(slot_at(monday), 9 * 4 + 1)
+
+    def test_open_at_filter(self):
+        """Test open_at filters clinics by their schedule."""
+        self.assertEqual(
+            self.open_names(open_at='2024-03-11T10:00:00'),
+            {'Weekdays', 'Round the clock'}
+        )
+        self.assertEqual(
+            self.open_names(open_at='2024-03-16T15:45:00'),
+            {'Weekends', 'Round the clock'}
+        )
+        self.assertEqual(
+            self.open_names(open_at='2024-03-11T20:00:00', is_open='false'),
+            {'Weekdays', 'Weekends', 'Evening'}
+        )
+
+    def test_is_open_now(self):
+        """Test is_open uses the current time."""
+        self.assertIn('Round the clock', self.open_names(is_open='true'))
+        self.assertNotIn('Evening', self.open_names(is_open='true'))
+
+    def test_invalid_open_at(self):
+        """Test malformed open_at is rejected."""
+        response = self.client.get(self.url, {'open_at': 'tomorrow'})
+        self.assertEqual(response.status_code, 400)
+
+class ClinicSearchTest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        for name, address, description in (
+            ('Айболит', 'ул. Ленина, 10', 'Хирургия и вакцинация собак'),
+            ('Лесная ветклиника', 'пр. Мира, 25', 'Лечение кошек и птиц'),
+            ('Зоодоктор', 'ул. Лесная, 3', 'Стоматология'),
+        ):
+            VetClinic.objects.create(
+                name=name,
+                description=description,
+                address=address,
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+
+    def search(self, term, **params):
+        response = self.client.get(self.url, {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [c['name'] for c in response.data['results']]
+
+    def test_search_uses_russian_stemming(self):
+        """Test word forms are matched through the russian configuration."""
+        self.assertEqual(self.search('птицы'), ['Лесная ветклиника'])
+        self.assertEqual(self.search('вакцинации'), ['Айболит'])
+
+    def test_search_ranks_name_above_address(self):
+        """Test matches in the name rank above matches in the address."""
+        self.assertEqual(self.search('лесная'), ['Лесная ветклиника', 'Зоодоктор'])
+
+    def test_search_prefix_and_fuzzy_name(self):
+        """Test prefixes and misspelled names are found."""
+        self.assertEqual(self.search('зоодок'), ['Зоодоктор'])
+        self.assertEqual(self.search('Айболид'), ['Айболит'])
+
+    def test_search_respects_explicit_ordering(self):
+        """Test ordering parameter overrides relevance ordering."""
+        self.assertEqual(
+            self.search('лесная', ordering='name'),
+            ['Зоодоктор', 'Лесная ветклиника']
+        )
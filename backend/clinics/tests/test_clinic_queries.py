@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, Service, ClinicService, FavoriteClinic
+
+class ClinicListQueriesTest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.clinics = [
+            VetClinic.objects.create(
+                name=f'Clinic {i:02d}',
+                description='Test Description',
+                address='Test Address',
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+            for i in range(10)
+        ]
+        self.services = [
+            Service.objects.create(
+                name=f'Service {i}',
+                description='Test Description',
+                category='Test'
+            )
+            for i in range(3)
+        ]
+        FavoriteClinic.objects.create(user=self.user, clinic=self.clinics[1])
+        FavoriteClinic.objects.create(user=self.user, clinic=self.clinics[3])
+
+    def get_list(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, queries
+
+    def test_is_favorite_resolved_with_single_query(self):
+        """Test favorites are fetched once per request, not per clinic."""
+        self.authenticate()
+        response, queries = self.get_list()
+
+        favorite_queries = [
+            q for q in queries.captured_queries
+            if FavoriteClinic._meta.db_table in q['sql']
+        ]
+        self.assertEqual(len(favorite_queries), 1)
+
+        favorites = {c['name'] for c in response.data['results'] if c['is_favorite']}
+        self.assertEqual(favorites, {'Clinic 01', 'Clinic 03'})
+
+    def test_is_favorite_for_anonymous_user(self):
+        """Test anonymous users get no favorites and no favorite queries."""
+        response, queries = self.get_list()
+        self.assertFalse(any(c['is_favorite'] for c in response.data['results']))
+        self.assertFalse(any(
+            FavoriteClinic._meta.db_table in q['sql'] for q in queries.captured_queries
+        ))
+
+    def add_services(self, clinics):
+        for clinic in clinics:
+            for service in self.services:
+                ClinicService.objects.create(
+                    clinic=clinic,
+                    service=service,
+                    price=100,
+                    duration=30
+                )
+
+    def test_nested_services_query_count_is_constant(self):
+        """Test query count does not grow with the number of clinics on a page."""
+        self.authenticate()
+        self.add_services(self.clinics)
+        for clinic in self.clinics[:2]:
+            clinic.is_active = False
+            clinic.save()
+
+        response, small_page = self.get_list(is_open='false', open_at='2024-03-11T10:00:00')
+        self.assertEqual(len(response.data['results']), 2)
+
+        response, full_page = self.get_list()
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(full_page), len(small_page))
+
+        services = response.data['results'][0]['services']
+        self.assertEqual(
+            [s['service_name'] for s in services],
+            ['Service 0', 'Service 1', 'Service 2']
+        )
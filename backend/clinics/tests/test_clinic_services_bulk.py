@@ -0,0 +1,209 @@
+from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, Service, ClinicService
+from clinics.serializers import ClinicServiceBulkSerializer
+
+class ClinicServiceBulkUpdateTest(BaseAPITest):
+    url = '/api/clinics/services/bulk/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.user.is_clinic_admin = True
+        self.user.save()
+        self.clinics = [
+            VetClinic.objects.create(
+                name=f'Clinic {i}',
+                description='Test Description',
+                address='Test Address',
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+            for i in range(3)
+        ]
+        self.services = [
+            Service.objects.create(name=f'Service {i}', description='Test Description', category='Test')
+            for i in range(2)
+        ]
+        for clinic in self.clinics:
+            ClinicService.objects.create(clinic=clinic, service=self.services[0], price=100, duration=30)
+        self.user.administered_clinics.set(self.clinics)
+
+    def link(self, clinic, service):
+        return ClinicService.objects.filter(clinic=clinic, service=service).first()
+
+    def test_updates_and_creates_for_many_clinics(self):
+        """Test one item is applied to every clinic with a single UPDATE and INSERT."""
+        self.authenticate()
+        data = {
+            'clinic_ids': [clinic.pk for clinic in self.clinics],
+            'items': [
+                {'service_id': self.services[0].pk, 'price': '150.00'},
+                {'service_id': self.services[1].pk, 'price': '300.00', 'duration': 45,
+                 'is_available': False},
+            ],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [r['status'] for r in response.data['results']],
+            ['updated'] * 3 + ['created'] * 3
+        )
+        table = f'"{ClinicService._meta.db_table}"'
+        writes = [q['sql'].split()[0] for q in queries.captured_queries
+                  if q['sql'].startswith((f'UPDATE {table}', f'INSERT INTO {table}'))]
+        self.assertEqual(writes, ['UPDATE', 'INSERT'])
+
+        for clinic in self.clinics:
+            updated = self.link(clinic, self.services[0])
+            self.assertEqual(updated.price, Decimal('150.00'))
+            self.assertEqual(updated.duration, 30)
+            created = self.link(clinic, self.services[1])
+            self.assertEqual((created.price, created.duration, created.is_available),
+                             (Decimal('300.00'), 45, False))
+
+    def test_reports_errors_per_row(self):
+        """Test invalid rows are reported while valid rows are applied."""
+        self.authenticate()
+        clinic = self.clinics[0]
+        response = self.client.post(self.url, {'items': [
+            {'clinic_id': clinic.pk, 'service_id': self.services[0].pk, 'is_available': False},
+            {'clinic_id': clinic.pk, 'service_id': self.services[0].pk, 'price': '1.00'},
+            {'clinic_id': clinic.pk, 'service_id': self.services[1].pk, 'price': '-5'},
+            {'clinic_id': clinic.pk, 'service_id': self.services[1].pk, 'price': '10.00'},
+            {'clinic_id': 999999, 'service_id': self.services[0].pk, 'price': '10.00'},
+            {'service_id': self.services[0].pk, 'price': '10.00'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 207)
+        results = response.data['results']
+        self.assertEqual(
+            [r['status'] for r in results],
+            ['updated', 'error', 'error', 'error', 'error', 'error']
+        )
+        self.assertIn('строке 0', results[1]['errors'][0])
+        self.assertIn('price', results[2]['errors'][0])
+        self.assertIn('duration', results[3]['errors'][0])
+        self.assertFalse(self.link(clinic, self.services[0]).is_available)
+        self.assertEqual(self.link(clinic, self.services[0]).price, Decimal('100.00'))
+        self.assertIsNone(self.link(clinic, self.services[1]))
+
+    def test_requires_clinic_admin(self):
+        """Test regular users cannot reprice services."""
+        self.user.is_clinic_admin = False
+        self.user.save()
+        self.authenticate()
+        response = self.client.post(self.url, {'items': [
+            {'clinic_id': self.clinics[0].pk, 'service_id': self.services[0].pk, 'price': '1.00'}
+        ]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_requires_admin_of_every_clinic(self):
+        """Test a clinic admin cannot reprice clinics they do not administer."""
+        self.user.administered_clinics.remove(self.clinics[2])
+        self.authenticate()
+        response = self.client.post(self.url, {
+            'clinic_ids': [clinic.pk for clinic in self.clinics],
+            'items': [{'service_id': self.services[0].pk, 'price': '1.00'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ClinicService.objects.filter(price=Decimal('1.00')).exists())
+
+        response = self.client.post(self.url, {'items': [
+            {'clinic_id': self.clinics[0].pk, 'service_id': self.services[0].pk, 'price': '1.00'}
+        ]}, format='json')
+        self.assertEqual(response.status_code, 207)
+
+    def test_staff_can_reprice_any_clinic(self):
+        """Test service staff are not limited to administered clinics."""
+        self.user.administered_clinics.clear()
+        self.user.is_staff = True
+        self.user.save()
+        self.authenticate()
+        response = self.client.post(self.url, {'items': [
+            {'clinic_id': self.clinics[1].pk, 'service_id': self.services[0].pk, 'price': '1.00'}
+        ]}, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.link(self.clinics[1], self.services[0]).price, Decimal('1.00'))
+
+    def test_invalidates_catalogue_cache(self):
+        """Test cached anonymous responses show new prices."""
+        clinic_url = f'/api/clinics/{self.clinics[0].pk}/'
+        self.assertEqual(self.client.get(clinic_url).data['services'][0]['price'], '100.00')
+        self.authenticate()
+        self.client.post(self.url, {'items': [
+            {'clinic_id': self.clinics[0].pk, 'service_id': self.services[0].pk, 'price': '120.00'}
+        ]}, format='json')
+        self.client.credentials()
+        self.assertEqual(self.client.get(clinic_url).data['services'][0]['price'], '120.00')
+
+    def test_rejects_too_many_rows_before_expanding(self):
+        """Test the row limit is checked on items x clinic_ids before rows are built."""
+        self.authenticate()
+        data = {
+            'clinic_ids': [clinic.pk for clinic in self.clinics],
+            'items': [{'service_id': self.services[0].pk, 'price': '1.00'}] * 2,
+        }
+        with override_settings(CLINIC_SERVICE_BULK_MAX_ROWS=5), \
+                mock.patch('clinics.views.expand_row') as expand_row:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.data)
+        expand_row.assert_not_called()
+
+        # Строки со своей клиникой не разворачиваются по clinic_ids
+        data['items'][1] = {'clinic_id': self.clinics[0].pk, 'service_id': self.services[1].pk,
+                            'price': '1.00', 'duration': 30}
+        with override_settings(CLINIC_SERVICE_BULK_MAX_ROWS=4):
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, 207)
+
+    def test_list_lengths_are_capped(self):
+        """Test clinic_ids and items longer than the row limit are rejected by the serializer."""
+        self.authenticate()
+        fields = ClinicServiceBulkSerializer().fields
+        self.assertEqual(fields['items'].max_length, fields['clinic_ids'].max_length)
+        limit = fields['items'].max_length
+        response = self.client.post(self.url, {
+            'clinic_ids': list(range(1, limit + 2)),
+            'items': [{'service_id': self.services[0].pk}],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('clinic_ids', response.data)
+
+    def test_concurrent_insert_is_upserted(self):
+        """Test a link created after the rows were read is updated instead of failing."""
+        self.authenticate()
+        clinic = self.clinics[0]
+        # Связь не видна при чтении, как если бы ее создал параллельный запрос
+        with mock.patch.object(ClinicService.objects, 'select_for_update',
+                               return_value=ClinicService.objects.none()):
+            response = self.client.post(self.url, {'items': [
+                {'clinic_id': clinic.pk, 'service_id': self.services[0].pk,
+                 'price': '250.00', 'duration': 60},
+            ]}, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['results'][0]['status'], 'created')
+        link = self.link(clinic, self.services[0])
+        self.assertEqual((link.price, link.duration), (Decimal('250.00'), 60))
+        self.assertEqual(ClinicService.objects.filter(clinic=clinic).count(), 1)
+
+    def test_concurrent_upsert_keeps_omitted_fields(self):
+        """Test the upsert does not overwrite fields the row did not supply."""
+        self.authenticate()
+        clinic = self.clinics[0]
+        ClinicService.objects.filter(clinic=clinic).update(is_available=False)
+        with mock.patch.object(ClinicService.objects, 'select_for_update',
+                               return_value=ClinicService.objects.none()):
+            response = self.client.post(self.url, {'items': [
+                {'clinic_id': clinic.pk, 'service_id': self.services[0].pk,
+                 'price': '250.00', 'duration': 60},
+            ]}, format='json')
+        self.assertEqual(response.status_code, 207)
+        link = self.link(clinic, self.services[0])
+        self.assertEqual((link.price, link.is_available), (Decimal('250.00'), False))
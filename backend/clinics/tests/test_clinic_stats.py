@@ -0,0 +1,194 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from core.tests.test_base import BaseAPITest
+from clinics.cache import catalogue_cache, catalogue_stats_state
+from clinics.models import VetClinic, Service, ClinicService, FavoriteClinic, RATING_FAVORITE_WEIGHT
+from pets.models import Pet, VetRecord
+
+
+class ClinicStatsTest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.clinics = [
+            VetClinic.objects.create(
+                name=f'Clinic {i}',
+                description='Test Description',
+                address='Test Address',
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+            for i in range(3)
+        ]
+        self.clinic = self.clinics[0]
+        self.services = [
+            Service.objects.create(name=f'Service {i}', description='Test Description', category='Test')
+            for i in range(3)
+        ]
+        self.pet = Pet.objects.create(
+            owner=self.user,
+            name='Барсик',
+            pet_type='cat',
+            gender='male',
+            birth_date='2020-01-01',
+            weight=Decimal('4.50')
+        )
+
+    def add_service(self, clinic, service, price, **kwargs):
+        return ClinicService.objects.create(
+            clinic=clinic, service=service, price=price, duration=30, **kwargs
+        )
+
+    def add_record(self, clinic):
+        return VetRecord.objects.create(
+            pet=self.pet, clinic=clinic, service=self.services[0], date=timezone.now()
+        )
+
+    def test_services_count_and_prices(self):
+        """Test service signals keep count and price range of available services."""
+        first = self.add_service(self.clinic, self.services[0], 500)
+        self.add_service(self.clinic, self.services[1], 1500)
+        self.add_service(self.clinic, self.services[2], 100, is_available=False)
+        self.clinic.refresh_from_db()
+        self.assertEqual(self.clinic.services_count, 3)
+        self.assertEqual(self.clinic.min_price, Decimal('500'))
+        self.assertEqual(self.clinic.max_price, Decimal('1500'))
+
+        first.price = 300
+        first.save()
+        self.clinic.refresh_from_db()
+        self.assertEqual(self.clinic.min_price, Decimal('300'))
+
+        first.clinic = self.clinics[1]
+        first.save()
+        self.clinic.refresh_from_db()
+        self.clinics[1].refresh_from_db()
+        self.assertEqual(self.clinic.services_count, 2)
+        self.assertEqual(self.clinic.min_price, Decimal('1500'))
+        self.assertEqual(self.clinics[1].services_count, 1)
+
+        ClinicService.objects.filter(clinic=self.clinic).delete()
+        self.clinic.refresh_from_db()
+        self.assertEqual(self.clinic.services_count, 0)
+        self.assertIsNone(self.clinic.min_price)
+        self.assertIsNone(self.clinic.max_price)
+
+    def test_favorites_and_records_update_rating(self):
+        """Test favorites and vet records update counters and the generated rating."""
+        favorite = FavoriteClinic.objects.create(user=self.user, clinic=self.clinic)
+        record = self.add_record(self.clinic)
+        self.add_record(self.clinic)
+        self.clinic.refresh_from_db()
+        self.assertEqual(self.clinic.favorites_count, 1)
+        self.assertEqual(self.clinic.records_count, 2)
+        self.assertEqual(self.clinic.rating, RATING_FAVORITE_WEIGHT + 2)
+
+        record.clinic = self.clinics[1]
+        record.save()
+        favorite.delete()
+        self.clinic.refresh_from_db()
+        self.clinics[1].refresh_from_db()
+        self.assertEqual(self.clinic.favorites_count, 0)
+        self.assertEqual(self.clinic.records_count, 1)
+        self.assertEqual(self.clinics[1].records_count, 1)
+
+    def test_recompute_command(self):
+        """Test the command restores counters after bulk writes."""
+        ClinicService.objects.bulk_create([
+            ClinicService(clinic=self.clinic, service=service, price=200 * (i + 1), duration=30)
+            for i, service in enumerate(self.services)
+        ])
+        VetClinic.objects.filter(pk=self.clinics[1].pk).update(favorites_count=7)
+        self.clinic.refresh_from_db()
+        self.assertEqual(self.clinic.services_count, 0)
+
+        call_command('recompute_clinic_stats', stdout=StringIO())
+        self.clinic.refresh_from_db()
+        self.clinics[1].refresh_from_db()
+        self.assertEqual(self.clinic.services_count, 3)
+        self.assertEqual(self.clinic.min_price, Decimal('200'))
+        self.assertEqual(self.clinic.max_price, Decimal('600'))
+        self.assertEqual(self.clinics[1].favorites_count, 0)
+        self.assertIsNotNone(self.clinic.stats_updated_at)
+
+    def test_ordering_and_filters(self):
+        """Test the list is sortable and filterable by stats without aggregation."""
+        FavoriteClinic.objects.create(user=self.user, clinic=self.clinics[2])
+        self.add_record(self.clinics[1])
+        self.add_service(self.clinics[1], self.services[0], 800)
+        self.add_service(self.clinics[2], self.services[0], 2000)
+
+        response = self.client.get(self.url, {'ordering': '-rating'})
+        self.assertEqual(response.status_code, 200)
+        names = [clinic['name'] for clinic in response.data['results']]
+        self.assertEqual(names, ['Clinic 2', 'Clinic 1', 'Clinic 0'])
+        self.assertEqual(response.data['results'][0]['rating'], RATING_FAVORITE_WEIGHT)
+
+        response = self.client.get(self.url, {'min_price_max': '1000'})
+        self.assertEqual([clinic['name'] for clinic in response.data['results']], ['Clinic 1'])
+
+        response = self.client.get(self.url, {'rating_min': '1', 'services_count_min': '1'})
+        self.assertEqual(
+            {clinic['name'] for clinic in response.data['results']}, {'Clinic 1', 'Clinic 2'}
+        )
+
+        response = self.client.get(self.url, {'rating_min': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.data)
+
+    def test_stats_fields_are_read_only(self):
+        """Test stats can not be written through the API."""
+        self.authenticate()
+        response = self.client.patch(
+            f'{self.url}{self.clinic.pk}/', {'favorites_count': 100, 'rating': 100}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.clinic.refresh_from_db()
+        self.assertEqual(self.clinic.favorites_count, 0)
+        self.assertNotIn('stats_updated_at', response.data)
+
+    def test_anonymous_list_follows_stats(self):
+        """Test cached anonymous list is reset when only stats change."""
+        response = self.client.get(self.url, {'ordering': '-rating'})
+        self.assertEqual(response.data['results'][0]['name'], 'Clinic 0')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FavoriteClinic.objects.create(user=self.user, clinic=self.clinics[2])
+        response = self.client.get(self.url, {'ordering': '-rating'})
+        self.assertEqual(response.data['results'][0]['name'], 'Clinic 2')
+        self.assertEqual(response.data['results'][0]['favorites_count'], 1)
+
+    def test_counters_do_not_reset_catalogue(self):
+        """Test favorites and records change only the sampled stats generation."""
+        generation = catalogue_cache.generation()
+        stats_generation = catalogue_stats_state.generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            FavoriteClinic.objects.create(user=self.user, clinic=self.clinic)
+            self.add_record(self.clinic)
+        self.assertEqual(catalogue_cache.generation(), generation)
+        self.assertGreater(catalogue_stats_state.generation(), stats_generation)
+
+        # Другой процесс видит новое поколение счетчиков только после
+        # CATALOGUE_STATS_GENERATION_TTL, поэтому его кэш не сбрасывается сразу
+        stats_generation = catalogue_stats_state.generation()
+        catalogue_stats_state.shared.incr(catalogue_stats_state.generation_key)
+        self.assertEqual(catalogue_stats_state.generation(), stats_generation)
+        catalogue_stats_state.clear_local()
+        self.assertEqual(catalogue_stats_state.generation(), stats_generation + 1)
+
+    def test_etag_changes_after_favorite(self):
+        """Test ETag changes when only the stats of a clinic change."""
+        self.authenticate()
+        detail_url = f'{self.url}{self.clinic.pk}/'
+        etag = self.client.get(detail_url)['ETag']
+
+        self.client.post(f'{detail_url}add_to_favorites/')
+
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['favorites_count'], 1)
@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_base import BaseAPITest
+from clinics.cache import catalogue_cache
+from clinics.models import VetClinic, Service, ClinicService, FavoriteClinic
+
+class ClinicConditionalGetTest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        catalogue_cache.clear_local()
+        self.clinic = VetClinic.objects.create(
+            name='Test Clinic',
+            description='Test Description',
+            address='Test Address',
+            phone='+74950000000',
+            email='clinic@example.com',
+            working_hours='Mo-Fr 9-18'
+        )
+        self.service = Service.objects.create(
+            name='Test Service',
+            description='Test Description',
+            category='Test'
+        )
+
+    def test_list_returns_not_modified(self):
+        """Test matching ETag gets 304 without loading clinics."""
+        self.authenticate()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        # Только избранное: валидатор списка - поколение кэша каталога,
+        # пользователь берётся из токена
+        self.assertEqual(len(queries), 1)
+
+    def test_list_etag_follows_catalogue_changes(self):
+        """Test list ETag changes with prices and clinics without aggregating the catalogue."""
+        self.authenticate()
+        etags = [self.client.get(self.url)['ETag']]
+
+        link = ClinicService.objects.create(clinic=self.clinic, service=self.service, price=100, duration=30)
+        etags.append(self.client.get(self.url)['ETag'])
+
+        link.price = 200
+        link.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['services'][0]['price'], '200.00')
+        etags.append(response['ETag'])
+
+        self.clinic.delete()
+        etags.append(self.client.get(self.url)['ETag'])
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_etag_changes_with_related_data(self):
+        """Test service links, services and favorites change the validator."""
+        self.authenticate()
+        detail_url = f'{self.url}{self.clinic.pk}/'
+        etags = [self.client.get(detail_url)['ETag']]
+
+        ClinicService.objects.create(clinic=self.clinic, service=self.service, price=100, duration=30)
+        etags.append(self.client.get(detail_url)['ETag'])
+
+        self.service.name = 'Renamed Service'
+        self.service.save()
+        etags.append(self.client.get(detail_url)['ETag'])
+
+        FavoriteClinic.objects.create(user=self.user, clinic=self.clinic)
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_favorite'])
+        etags.append(response['ETag'])
+
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_cached_anonymous_response_returns_not_modified(self):
+        """Test cached catalogue entries answer conditional requests without queries."""
+        etag = self.client.get(self.url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+    def test_if_modified_since(self):
+        """Test Last-Modified validator on service detail."""
+        url = f'/api/services/{self.service.pk}/'
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_clinic_is_not_conditional(self):
+        """Test unknown pk still returns 404."""
+        response = self.client.get(f'{self.url}0/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,153 @@
+import os
+import tempfile
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from clinics.models import VetClinic, Service, ClinicService
+from clinics.services.import_service import ClinicImportService
+from clinics.services.validation import validate_row
+
+HEADER = 'name,address,city,postal_code,phone,email,website,working_hours,services\n'
+
+CLINICS_CSV = HEADER + (
+    '"ВетКлиника №1","ул. Ленина, 10","Москва","123456","+74951234567",'
+    '"info@vetclinic1.ru","https://vetclinic1.ru","Mo-Fr 9-18","Вакцинация,Хирургия,Стоматология"\n'
+    '"ВетКлиника №2","пр. Мира, 25","Москва","123457","+74952345678",'
+    '"info@vetclinic2.ru","https://vetclinic2.ru","Mo-Fr 10-20, Sa-Su 10-16","Вакцинация,Терапия,УЗИ"\n'
+    '"ВетКлиника №3","ул. Тверская, 15","Москва","123458","+74953456789",'
+    '"info@vetclinic3.ru","https://vetclinic3.ru","Mo-Fr 8-20","Вакцинация,Хирургия,Терапия,УЗИ"\n'
+)
+
+class ClinicBulkImportTest(TestCase):
+    def write_csv(self, content):
+        tmp_file = tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', encoding='utf-8', delete=False
+        )
+        tmp_file.write(content)
+        tmp_file.close()
+        self.addCleanup(os.unlink, tmp_file.name)
+        return tmp_file.name
+
+    def setUp(self):
+        """Set up test data."""
+        self.clinics_csv = self.write_csv(CLINICS_CSV)
+
+    def test_bulk_import(self):
+        """Test bulk import creates clinics, services and links."""
+        results = ClinicImportService().import_clinics_bulk(self.clinics_csv, chunk_size=2)
+        self.assertEqual(results['success'], 3)
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(VetClinic.objects.count(), 3)
+        self.assertEqual(Service.objects.count(), 5)
+        self.assertEqual(ClinicService.objects.count(), 10)
+
+        clinic = VetClinic.objects.get(name='ВетКлиника №2')
+        self.assertEqual(clinic.city, 'Москва')
+        self.assertEqual(clinic.postal_code, '123457')
+        self.assertEqual(len(clinic.open_slots), (5 * 10 + 2 * 6) * 4)
+
+    def test_bulk_import_updates_existing_clinics(self):
+        """Test repeated import upserts clinics without duplicating links."""
+        ClinicImportService().import_clinics_bulk(self.clinics_csv)
+        path = self.write_csv(
+            HEADER +
+            '"ВетКлиника №1","ул. Новая, 1","Москва","123456","+74950000000",'
+            '"new@vetclinic1.ru","","Mo-Fr 9-18","Вакцинация,Груминг"\n'
+        )
+        results = ClinicImportService().import_clinics_bulk(path)
+        self.assertEqual(results['success'], 1)
+        self.assertEqual(VetClinic.objects.count(), 3)
+
+        clinic = VetClinic.objects.get(name='ВетКлиника №1')
+        self.assertEqual(clinic.address, 'ул. Новая, 1')
+        self.assertEqual(clinic.email, 'new@vetclinic1.ru')
+        self.assertEqual(
+            set(clinic.services.values_list('service__name', flat=True)),
+            {'Вакцинация', 'Хирургия', 'Стоматология', 'Груминг'}
+        )
+
+    def test_bulk_import_reports_invalid_rows(self):
+        """Test invalid rows are reported and valid rows are still imported."""
+        path = self.write_csv(
+            HEADER +
+            '"Clinic A","Address","Москва","123456","+74950000000",'
+            '"a@example.com","","Mo-Fr 9-18","Терапия"\n'
+            '"Clinic B","Address","Москва","12","123",'
+            '"b@example.com","","always","Терапия"\n'
+        )
+        results = ClinicImportService().import_clinics_bulk(path)
+        self.assertEqual(results['success'], 1)
+        self.assertEqual(results['errors'], 1)
+        self.assertEqual(results['details'][0]['row'], 2)
+        self.assertEqual(len(results['details'][0]['errors']), 3)
+        self.assertFalse(VetClinic.objects.filter(name='Clinic B').exists())
+
+    def test_import_command_bulk_mode(self):
+        """Test management command exposes bulk mode."""
+        call_command('import_clinics', self.clinics_csv, '--bulk', '--chunk-size', '1', stdout=open(os.devnull, 'w'))
+        self.assertEqual(VetClinic.objects.count(), 3)
+
+    def test_bulk_import_with_validation_workers(self):
+        """Test process pool validation keeps row order and error reports."""
+        rows = [
+            f'"Clinic {i:03d}","Address","Москва","123456","{"+74950000000" if i % 7 else "1"}",'
+            f'"c{i}@example.com","","Mo-Fr 9-18","Терапия"\n'
+            for i in range(1, 51)
+        ]
+        path = self.write_csv(HEADER + ''.join(rows))
+        results = ClinicImportService().import_clinics_bulk(path, chunk_size=4, workers=2)
+        self.assertEqual(results['success'], 43)
+        self.assertEqual(results['errors'], 7)
+        self.assertEqual([d['row'] for d in results['details']], list(range(7, 51, 7)))
+        self.assertEqual(VetClinic.objects.count(), 43)
+
+    def test_bulk_import_reports_invalid_coordinates(self):
+        """Test bad coordinates are reported per row instead of failing the chunk."""
+        rows = [
+            ('Clinic A', '55.75', '37.61'),
+            ('Clinic B', 'abc', '37.61'),
+            ('Clinic C', '95', '37.61'),
+            ('Clinic D', 'NaN', 'Infinity'),
+            ('Clinic E', '55.75', ''),
+            ('Clinic F', '', ''),
+        ]
+        path = self.write_csv(
+            HEADER.rstrip('\n') + ',latitude,longitude\n' + ''.join(
+                f'"{name}","Address","Москва","123456","+74950000000",'
+                f'"a@example.com","","Mo-Fr 9-18","Терапия","{lat}","{lon}"\n'
+                for name, lat, lon in rows
+            )
+        )
+        results = ClinicImportService().import_clinics_bulk(path)
+        self.assertEqual(results['success'], 2)
+        self.assertEqual(results['errors'], 4)
+        self.assertEqual([d['row'] for d in results['details']], [2, 3, 4, 5])
+        self.assertEqual(len(results['details'][2]['errors']), 2)
+        self.assertEqual(
+            set(VetClinic.objects.values_list('name', flat=True)), {'Clinic A', 'Clinic F'}
+        )
+        clinic = VetClinic.objects.get(name='Clinic A')
+        self.assertEqual(float(clinic.latitude), 55.75)
+        self.assertEqual(float(clinic.longitude), 37.61)
+
+    def test_coordinates_are_optional(self):
+        """Test rows without coordinate columns stay valid."""
+        row = dict(zip(HEADER.strip().split(','), [
+            'Clinic', 'Address', 'Москва', '123456', '+74950000000',
+            'a@example.com', '', 'Mo-Fr 9-18', 'Терапия',
+        ]))
+        self.assertEqual(validate_row(row), [])
+        self.assertEqual(validate_row({**row, 'latitude': '-90', 'longitude': '180'}), [])
+
+    def test_services_are_not_duplicated(self):
+        """Test existing services are reused and service names are unique."""
+        Service.objects.create(name='Терапия', description='Test Description')
+        service_ids = ClinicImportService().resolve_services(['Терапия', 'УЗИ', 'Терапия'])
+        self.assertEqual(set(service_ids), {'Терапия', 'УЗИ'})
+        self.assertEqual(Service.objects.filter(name='Терапия').count(), 1)
+        self.assertEqual(
+            ClinicImportService().resolve_services(['УЗИ']), {'УЗИ': service_ids['УЗИ']}
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Service.objects.create(name='УЗИ', description='Test Description')
@@ -0,0 +1,201 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_base import BaseAPITest
+from clinics.geo import ClinicGeoMatrix, geo_matrix_state
+from clinics.models import VetClinic
+
+class NearestClinicsAPITest(BaseAPITest):
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        ClinicGeoMatrix.reset_shared()
+        self.points = {
+            'Kremlin': (55.752023, 37.617499),
+            'Arbat': (55.749511, 37.591708),
+            'Sokolniki': (55.789230, 37.679858),
+            'Saint Petersburg': (59.938630, 30.314130),
+        }
+        for name, (lat, lon) in self.points.items():
+            VetClinic.objects.create(
+                name=name,
+                description='Test Description',
+                address='Test Address',
+                latitude=lat,
+                longitude=lon,
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+        VetClinic.objects.create(
+            name='No coordinates',
+            description='Test Description',
+            address='Test Address',
+            phone='+74950000000',
+            email='clinic@example.com',
+            working_hours='Mo-Fr 9-18'
+        )
+
+    def test_list_radius_uses_exact_distance(self):
+        """Test list radius filter matches the distance ordering and nearest."""
+        params = {'lat': 55.7520, 'lon': 37.6175, 'radius': 3}
+        response = self.client.get('/api/clinics/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({c['name'] for c in response.data['results']}, {'Kremlin', 'Arbat'})
+
+        response = self.client.get('/api/clinics/', {**params, 'ordering': 'distance'})
+        self.assertEqual([c['name'] for c in response.data['results']], ['Kremlin', 'Arbat'])
+
+        # Клиника в углу ограничивающего прямоугольника, но дальше радиуса
+        self.assertEqual(
+            list(VetClinic.with_distance(55.7520, 37.6175, 0.1).values_list('name', flat=True)),
+            ['Kremlin']
+        )
+        self.assertFalse(VetClinic.with_distance(55.7520 + 0.0008, 37.6175 + 0.0014, 0.1).exists())
+
+    def test_radius_prefilter_runs_in_sql(self):
+        """Test radius uses the indexed bounding box instead of ids from Python."""
+        queryset = VetClinic.with_distance(55.7520, 37.6175, 10)
+        sql = str(queryset.query)
+        self.assertIn('"latitude" BETWEEN', sql)
+        self.assertIn('"longitude" BETWEEN', sql)
+        self.assertNotIn('"id" IN', sql)
+        distances = {c.name: c.distance for c in queryset}
+        self.assertEqual(set(distances), {'Kremlin', 'Arbat', 'Sokolniki'})
+        kremlin = VetClinic.objects.get(name='Kremlin')
+        self.assertAlmostEqual(distances['Kremlin'], kremlin.calculate_distance(55.7520, 37.6175), places=2)
+
+    def test_find_nearest_with_radius(self):
+        """Test nearest clinics are ranked by distance inside the radius."""
+        nearest = VetClinic.find_nearest(55.7520, 37.6175, radius=10)
+        self.assertEqual(
+            [clinic.name for clinic, _ in nearest],
+            ['Kremlin', 'Arbat', 'Sokolniki']
+        )
+        distances = [distance for _, distance in nearest]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_find_nearest_without_radius(self):
+        """Test search without radius ranks every active clinic."""
+        nearest = VetClinic.find_nearest(55.7520, 37.6175, limit=10)
+        self.assertEqual(len(nearest), 4)
+        self.assertEqual(nearest[-1][0].name, 'Saint Petersburg')
+
+    def test_geo_matrix_follows_clinic_changes(self):
+        """Test matrix is updated incrementally after commit on save and delete."""
+        matrix = ClinicGeoMatrix.shared()
+        kremlin = VetClinic.objects.get(name='Kremlin')
+        self.assertIn(kremlin.pk, matrix)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            kremlin.latitude, kremlin.longitude = 59.9386, 30.3141
+            kremlin.save()
+        nearest = VetClinic.find_nearest(59.9386, 30.3141, limit=2)
+        self.assertEqual({c.name for c, _ in nearest}, {'Kremlin', 'Saint Petersburg'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            kremlin.is_active = False
+            kremlin.save()
+            # До коммита матрица не меняется: откат не оставит лишних записей
+            self.assertIn(kremlin.pk, matrix)
+        self.assertNotIn(kremlin.pk, matrix)
+
+        arbat = VetClinic.objects.get(name='Arbat')
+        with self.captureOnCommitCallbacks(execute=True):
+            arbat.delete()
+        self.assertNotIn(arbat.pk, matrix)
+        self.assertEqual(len(matrix), 2)
+        self.assertIs(ClinicGeoMatrix.shared(), matrix)
+
+    def test_geo_matrix_reloads_after_change_in_other_process(self):
+        """Test a bumped shared generation makes the process reload its matrix."""
+        matrix = ClinicGeoMatrix.shared()
+        kremlin = VetClinic.objects.get(name='Kremlin')
+        # Изменение из другого процесса: строка в базе и номер поколения в кэше
+        VetClinic.objects.filter(pk=kremlin.pk).update(is_active=False)
+        geo_matrix_state.bump()
+
+        reloaded = ClinicGeoMatrix.shared()
+        self.assertIsNot(reloaded, matrix)
+        self.assertNotIn(kremlin.pk, reloaded)
+        nearest = VetClinic.find_nearest(55.7520, 37.6175, radius=10)
+        self.assertEqual([c.name for c, _ in nearest], ['Arbat', 'Sokolniki'])
+
+    def test_geo_matrix_applies_changes_from_other_process(self):
+        """Test changes logged by another process are applied without a reload."""
+        matrix = ClinicGeoMatrix.shared()
+        kremlin = VetClinic.objects.get(name='Kremlin')
+        # Другой процесс увеличивает номер поколения и записывает изменение в журнал
+        generation = geo_matrix_state.bump()
+        geo_matrix_state.shared.set(ClinicGeoMatrix._change_key(generation), (kremlin.pk, None))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIs(ClinicGeoMatrix.shared(), matrix)
+        self.assertEqual(queries.captured_queries, [])
+        self.assertNotIn(kremlin.pk, matrix)
+
+    def test_non_finite_search_params(self):
+        """Test nan and inf coordinates or radius are rejected."""
+        for params in ({'lat': 55, 'lon': 37, 'radius': 'nan'},
+                       {'lat': 'nan', 'lon': 37},
+                       {'lat': 55, 'lon': 'inf', 'radius': 5}):
+            for url in ('/api/clinics/', '/api/clinics/nearest/'):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400, (url, params))
+                self.assertIn('error', response.data)
+
+    def test_geo_matrix_batch_queries(self):
+        """Test several points are ranked in one pass."""
+        matrix = ClinicGeoMatrix.shared()
+        results = matrix.nearest_many([(55.7520, 37.6175), (59.9386, 30.3141)], limit=1)
+        kremlin = VetClinic.objects.get(name='Kremlin')
+        spb = VetClinic.objects.get(name='Saint Petersburg')
+        self.assertEqual([r[0][1] for r in results], [kremlin.pk, spb.pk])
+
+    def test_list_ordering_by_distance(self):
+        """Test list endpoint can be ordered by distance."""
+        url = '/api/clinics/'
+        response = self.client.get(url, {
+            'lat': 59.9386, 'lon': 30.3141, 'ordering': 'distance'
+        })
+        self.assertEqual(response.status_code, 200)
+        names = [c['name'] for c in response.data['results']]
+        distances = [c['distance'] for c in response.data['results']]
+        self.assertEqual(names[0], 'Saint Petersburg')
+        self.assertEqual(distances, sorted(distances))
+        self.assertEqual(response.data['count'], 4)
+
+    def test_list_ordering_by_distance_runs_in_sql(self):
+        """Test distance ordering loads only the page instead of every filtered id."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/clinics/', {
+                'lat': 55.7520, 'lon': 37.6175, 'radius': 10, 'ordering': 'distance',
+                'pagination': 'cursor',
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([c['name'] for c in response.data['results']], ['Kremlin', 'Arbat', 'Sokolniki'])
+        distance = response.data['results'][1]['distance']
+        self.assertEqual(distance, round(distance, 2))
+        clinics_table = f'FROM "{VetClinic._meta.db_table}"'
+        selects = [q['sql'] for q in queries.captured_queries
+                   if clinics_table in q['sql'] and 'COUNT(' not in q['sql']]
+        self.assertEqual(len(selects), 1)
+        self.assertIn('ORDER BY', selects[0])
+        self.assertIn('LIMIT', selects[0])
+        self.assertNotIn('"id" IN', selects[0])
+
+    def test_nearest_endpoint(self):
+        """Test nearest action on clinics endpoint."""
+        url = '/api/clinics/nearest/'
+        response = self.client.get(url, {'lat': 55.7520, 'lon': 37.6175, 'radius': 3, 'limit': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['name'] for c in response.data], ['Kremlin', 'Arbat'])
+        self.assertIn('distance', response.data[0])
+
+    def test_nearest_endpoint_requires_coordinates(self):
+        """Test nearest action validates query params."""
+        url = '/api/clinics/nearest/'
+        response = self.client.get(url, {'lat': 55.7520})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {'lat': 'abc', 'lon': 37.6})
+        self.assertEqual(response.status_code, 400)
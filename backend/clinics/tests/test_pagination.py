@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, FavoriteClinic
+
+class ClinicCursorPaginationTest(BaseAPITest):
+    url = '/api/clinics/'
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.clinics = [
+            VetClinic.objects.create(
+                name=f'Clinic {i:02d}',
+                description='Test Description',
+                address='Test Address',
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+            for i in range(15)
+        ]
+
+    def collect_pages(self, url, params=None, field='name'):
+        names, page_queries = [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            page_queries.append(queries.captured_queries)
+            names.extend(c[field] for c in response.data['results'])
+            url, params = response.data['next'], None
+        return names, page_queries
+
+    def test_page_number_pagination_is_default(self):
+        """Test list keeps page numbers and count without opt-in."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 15)
+
+    def test_cursor_pagination_walks_all_clinics(self):
+        """Test cursor pages cover every clinic in name order without COUNT."""
+        names, page_queries = self.collect_pages(self.url, {'pagination': 'cursor'})
+        self.assertEqual(names, [c.name for c in self.clinics])
+        self.assertEqual(len(page_queries), 2)
+        for queries in page_queries:
+            self.assertFalse(any('COUNT(*)' in q['sql'] for q in queries))
+            self.assertFalse(any('OFFSET' in q['sql'] for q in queries))
+
+    def test_cursor_ordering_by_non_unique_field(self):
+        """Test ?ordering= on a field with ties gets a pk tiebreaker and pages every clinic once."""
+        VetClinic.objects.filter(pk__in=[c.pk for c in self.clinics[::2]]).update(rating=5)
+        names, page_queries = self.collect_pages(self.url, {'pagination': 'cursor', 'ordering': '-rating'})
+        self.assertEqual(sorted(names), sorted(c.name for c in self.clinics))
+        self.assertEqual(len(names), len(set(names)))
+        self.assertTrue(any('"clinics_vetclinic"."id" DESC' in q['sql'] for q in page_queries[0]))
+
+    def test_favorites_cursor_pagination(self):
+        """Test favorites are paged newest first by cursor."""
+        self.authenticate()
+        for clinic in self.clinics[:12]:
+            FavoriteClinic.objects.create(user=self.user, clinic=clinic)
+        names, _ = self.collect_pages(
+            '/api/favorites/', {'pagination': 'cursor'}, field='clinic_name'
+        )
+        self.assertEqual(names, [c.name for c in reversed(self.clinics[:12])])
@@ -0,0 +1,55 @@
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+from clinics.validators import (
+    parse_working_hours,
+    validate_working_hours,
+    validate_phone,
+    validate_postal_code,
+)
+
+class WorkingHoursParserTest(SimpleTestCase):
+    def test_parse_day_ranges_and_single_days(self):
+        """Test schedule is expanded to weekdays with minute intervals."""
+        schedule = parse_working_hours('Mo-Fr 9-18, Sa 10-14')
+        self.assertEqual(schedule[0], ((540, 1080),))
+        self.assertEqual(schedule[4], ((540, 1080),))
+        self.assertEqual(schedule[5], ((600, 840),))
+        self.assertEqual(schedule[6], ())
+
+    def test_parse_minutes_and_wrapping_ranges(self):
+        """Test minutes and ranges across Sunday are supported."""
+        schedule = parse_working_hours('Sa-Mo 9:30-20:45, Tu 0-24')
+        self.assertEqual([schedule[d] for d in (5, 6, 0)], [((570, 1245),)] * 3)
+        self.assertEqual(schedule[1], ((0, 1440),))
+        self.assertEqual(schedule[2], ())
+
+    def test_parse_overnight_ranges(self):
+        """Test ranges closing before they open continue into the next day."""
+        schedule = parse_working_hours('Mo-Su 20-8')
+        self.assertEqual(schedule[0], ((0, 480), (1200, 1440)))
+        self.assertEqual(schedule[6], ((0, 480), (1200, 1440)))
+
+        schedule = parse_working_hours('Fr 22-2, Sa 10-0, Su 23:30-0:30')
+        self.assertEqual(schedule[4], ((1320, 1440),))
+        self.assertEqual(schedule[5], ((0, 120), (600, 1440)))
+        self.assertEqual(schedule[6], ((1410, 1440),))
+        self.assertEqual(schedule[0], ((0, 30),))
+
+    def test_invalid_working_hours(self):
+        """Test malformed schedules are rejected."""
+        for value in ('Mo-Fr', 'Xx-Fr 9-18', 'Mo-Fr 9-9', 'Mo 9-25', 'Mo 9:75-18', 'always'):
+            with self.assertRaises(ValidationError):
+                validate_working_hours(value)
+
+    def test_parsed_schedules_are_cached(self):
+        """Test repeated schedule strings are parsed once."""
+        self.assertIs(parse_working_hours('Mo-Su 8-20'), parse_working_hours('Mo-Su 8-20'))
+
+    def test_phone_and_postal_code(self):
+        """Test compiled phone and postal code validators."""
+        validate_phone('+7 (495) 123-45-67')
+        validate_postal_code('123456')
+        with self.assertRaises(ValidationError):
+            validate_phone('123')
+        with self.assertRaises(ValidationError):
+            validate_postal_code('12a45')
@@ -1,19 +1,87 @@
 from django.core.validators import URLValidator, EmailValidator
 from django.core.exceptions import ValidationError
+from functools import lru_cache
 import re
+from decimal import Decimal, InvalidOperation
+
+WEEKDAYS = ('mo', 'tu', 'we', 'th', 'fr', 'sa', 'su')
+_WEEKDAY_INDEX = {day: index for index, day in enumerate(WEEKDAYS)}
+
+_NON_DIGIT_RE = re.compile(r'\D')
+_POSTAL_CODE_RE = re.compile(r'\d{5,10}')
+_WORKING_HOURS_SEPARATOR_RE = re.compile(r',\s*')
+_WORKING_HOURS_GROUP_RE = re.compile(
+    r'(?P<first>[A-Za-z]{2})(?:-(?P<last>[A-Za-z]{2}))?\s+'
+    r'(?P<open_h>\d{1,2})(?::(?P<open_m>\d{2}))?-'
+    r'(?P<close_h>\d{1,2})(?::(?P<close_m>\d{2}))?'
+)
+
+WORKING_HOURS_ERROR = 'Неверный формат часов работы. Используйте формат: Mo-Fr 9-18, Sa 10-14'
 
 def validate_phone(value):
     """Проверяет корректность номера телефона"""
     # Удаляем все нецифровые символы
-    phone = re.sub(r'\D', '', value)
+    phone = _NON_DIGIT_RE.sub('', value)
     if len(phone) < 10 or len(phone) > 15:
         raise ValidationError('Номер телефона должен содержать от 10 до 15 цифр')
 
+def _to_minutes(hours, minutes):
+    hours = int(hours)
+    minutes = int(minutes) if minutes else 0
+    if minutes >= 60 or hours > 24 or (hours == 24 and minutes):
+        raise ValueError
+    return hours * 60 + minutes
+
+def _expand_days(first, last):
+    start = _WEEKDAY_INDEX[first.lower()]
+    if last is None:
+        return (start,)
+    end = _WEEKDAY_INDEX[last.lower()]
+    # Диапазон может переходить через воскресенье: Sa-Mo
+    return tuple((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+
+@lru_cache(maxsize=1024)
+def _parse_working_hours(value):
+    schedule = [[] for _ in WEEKDAYS]
+    for group in _WORKING_HOURS_SEPARATOR_RE.split(value.strip()):
+        match = _WORKING_HOURS_GROUP_RE.fullmatch(group)
+        if match is None:
+            return None
+        try:
+            days = _expand_days(match['first'], match['last'])
+            opens = _to_minutes(match['open_h'], match['open_m'])
+            closes = _to_minutes(match['close_h'], match['close_m'])
+        except (KeyError, ValueError):
+            return None
+        if opens == closes:
+            return None
+        for day in days:
+            if opens < closes:
+                schedule[day].append((opens, closes))
+                continue
+            # Ночной интервал (Mo-Su 20-8) переходит через полночь:
+            # до конца дня и с начала следующего
+            schedule[day].append((opens, 24 * 60))
+            if closes:
+                schedule[(day + 1) % 7].append((0, closes))
+    return tuple(tuple(sorted(intervals)) for intervals in schedule)
+
+def parse_working_hours(value):
+    """
+    Разбирает часы работы в расписание на неделю: кортеж из 7 элементов
+    (понедельник - воскресенье), каждый - кортеж интервалов работы
+    (открытие, закрытие) в минутах от начала дня. Интервал, закрывающийся
+    раньше открытия, длится до утра и делится на части по дням.
+    Результаты кэшируются: в выгрузках повторяется небольшое число строк.
+    """
+    schedule = _parse_working_hours(value)
+    if schedule is None:
+        raise ValidationError(WORKING_HOURS_ERROR)
+    return schedule
+
 def validate_working_hours(value):
     """Проверяет корректность формата часов работы"""
-    pattern = r'^([A-Za-z]{2}-[A-Za-z]{2}\s\d{1,2}-\d{1,2}(,\s[A-Za-z]{2}-[A-Za-z]{2}\s\d{1,2}-\d{1,2})*)$'
-    if not re.match(pattern, value):
-        raise ValidationError('Неверный формат часов работы. Используйте формат: Mo-Fr 9-18, Sa 10-14')
+    parse_working_hours(value)
 
 def validate_services(value):
     """Проверяет корректность списка услуг"""
@@ -25,5 +93,23 @@ def validate_services(value):
 
 def validate_postal_code(value):
     """Проверяет корректность почтового индекса"""
-    if not re.match(r'^\d{5,10}$', value):
-        raise ValidationError('Почтовый индекс должен содержать от 5 до 10 цифр') 
\ No newline at end of file
+    if not _POSTAL_CODE_RE.fullmatch(value):
+        raise ValidationError('Почтовый индекс должен содержать от 5 до 10 цифр')
+
+def _validate_coordinate(value, limit, message):
+    try:
+        coordinate = Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValidationError(message)
+    # Decimal принимает NaN и Infinity, они не проходят сравнение с границей
+    if not coordinate.is_finite() or abs(coordinate) > limit:
+        raise ValidationError(message)
+    return coordinate
+
+def validate_latitude(value):
+    """Проверяет, что широта - число от -90 до 90"""
+    return _validate_coordinate(value, 90, 'Широта должна быть числом от -90 до 90')
+
+def validate_longitude(value):
+    """Проверяет, что долгота - число от -180 до 180"""
+    return _validate_coordinate(value, 180, 'Долгота должна быть числом от -180 до 180')
@@ -1,12 +1,29 @@
 from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+import math
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db.models import Q, Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from .models import VetClinic, Service, ClinicService, FavoriteClinic
+from .cache import CatalogueCacheMixin, catalogue_cache, catalogue_stats_state
+from .facets import MATCH_ANY, MATCH_CHOICES, clinic_facets, filter_by_offers, offer_conditions
+from .filters import ClinicSearchFilter
+from .permissions import IsClinicAdmin, with_admin_flag
+from .renderers import NDJSONRenderer, CSVRenderer
+from .stats import STATS_FIELDS
+from .services.export_service import EXPORT_FORMATS, iter_export
+from .services.pricing import expand_row, expanded_row_count, apply_clinic_service_updates
+from .schedule import slot_at
 from .serializers import (
     VetClinicSerializer, VetClinicCreateSerializer, ServiceSerializer,
-    ClinicServiceSerializer, FavoriteClinicSerializer
+    ClinicServiceSerializer, FavoriteClinicSerializer, NearestClinicSerializer,
+    ClinicServiceBulkSerializer, ClinicServiceBulkItemSerializer, ClinicServiceBulkResultSerializer
 )
 from drf_spectacular.utils import (
     extend_schema,
@@ -15,6 +32,19 @@ from drf_spectacular.utils import (
     OpenApiExample,
 )
 from drf_spectacular.types import OpenApiTypes
+from core.conditional import ConditionalGetMixin
+from core.metrics import SerializerMetricsMixin
+from core.pagination import CursorOrPageNumberPagination
+
+NEAREST_DEFAULT_LIMIT = 10
+NEAREST_MAX_LIMIT = 50
+# Параметры фильтрации по сводным показателям клиник
+STATS_FILTER_PARAMS = tuple(f'{field}_{bound}' for field in STATS_FIELDS for bound in ('min', 'max'))
+# Числовые параметры фильтров приводятся к точности колонки цены:
+# большие значения иначе приводят к переполнению numeric в запросе
+_PRICE_FIELD = ClinicService._meta.get_field('price')
+NUMBER_PARAM_QUANTUM = Decimal(1).scaleb(-_PRICE_FIELD.decimal_places)
+NUMBER_PARAM_LIMIT = Decimal(10) ** (_PRICE_FIELD.max_digits - _PRICE_FIELD.decimal_places)
 
 @extend_schema_view(
     list=extend_schema(
@@ -23,23 +53,88 @@ from drf_spectacular.types import OpenApiTypes
         parameters=[
             OpenApiParameter(
                 name="service",
-                type=OpenApiTypes.INT,
-                description="Фильтр по ID услуги"
+                type=OpenApiTypes.STR,
+                description="Фильтр по ID услуг: service=1&service=2 или service=1,2"
+            ),
+            OpenApiParameter(
+                name="service_match",
+                type=OpenApiTypes.STR,
+                enum=MATCH_CHOICES,
+                description="any - клиника оказывает хотя бы одну из услуг (по умолчанию), "
+                            "all - все услуги"
+            ),
+            OpenApiParameter(
+                name="price_min",
+                type=OpenApiTypes.NUMBER,
+                description="Минимальная цена услуги (выбранной в service, если указана)"
+            ),
+            OpenApiParameter(
+                name="price_max",
+                type=OpenApiTypes.NUMBER,
+                description="Максимальная цена услуги (выбранной в service, если указана)"
+            ),
+            OpenApiParameter(
+                name="is_available",
+                type=OpenApiTypes.BOOL,
+                description="Учитывать только доступные (true) или недоступные (false) услуги"
+            ),
+            OpenApiParameter(
+                name="city",
+                type=OpenApiTypes.STR,
+                description="Фильтр по городу, можно указать несколько: city=Москва,Казань"
+            ),
+            OpenApiParameter(
+                name="facets",
+                type=OpenApiTypes.BOOL,
+                description="Добавить в ответ счетчики facets: число клиник по услугам "
+                            "и ценовым диапазонам"
             ),
             OpenApiParameter(
                 name="is_open",
                 type=OpenApiTypes.BOOL,
-                description="Фильтр по статусу работы клиники"
+                description="Фильтр по клиникам, работающим сейчас (или в момент open_at)"
+            ),
+            OpenApiParameter(
+                name="open_at",
+                type=OpenApiTypes.DATETIME,
+                description="Фильтр по клиникам, работающим в указанный момент (ISO 8601)"
             ),
             OpenApiParameter(
                 name="search",
                 type=OpenApiTypes.STR,
-                description="Поиск по названию, адресу или описанию"
+                description="Полнотекстовый поиск по названию, адресу или описанию "
+                            "с нечетким совпадением названия"
             ),
             OpenApiParameter(
                 name="ordering",
                 type=OpenApiTypes.STR,
-                description="Сортировка по полям (name, rating)"
+                description="Сортировка по полям (name, rating, min_price, max_price, services_count, "
+                            "favorites_count, records_count, distance). "
+                            "Сортировка по distance требует параметров lat и lon"
+            ),
+            OpenApiParameter(
+                name="lat",
+                type=OpenApiTypes.FLOAT,
+                description="Широта точки для расчёта расстояния"
+            ),
+            OpenApiParameter(
+                name="lon",
+                type=OpenApiTypes.FLOAT,
+                description="Долгота точки для расчёта расстояния"
+            ),
+            OpenApiParameter(
+                name="radius",
+                type=OpenApiTypes.FLOAT,
+                description="Радиус поиска в километрах вокруг точки lat/lon"
+            ),
+            *(
+                OpenApiParameter(
+                    name=param,
+                    type=OpenApiTypes.NUMBER,
+                    description=f"{'Минимальное' if param.endswith('_min') else 'Максимальное'} "
+                                f"значение {param.rsplit('_', 1)[0]}"
+                )
+                for param in STATS_FILTER_PARAMS
             ),
         ],
         tags=["clinics"],
@@ -70,32 +165,388 @@ from drf_spectacular.types import OpenApiTypes
         tags=["clinics"],
     ),
 )
-class VetClinicViewSet(viewsets.ModelViewSet):
+class VetClinicViewSet(SerializerMetricsMixin, CatalogueCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = VetClinic.objects.all()
     serializer_class = VetClinicSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [ClinicSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'address', 'description']
-    ordering_fields = ['name', 'rating']
+    ordering_fields = ['name', *STATS_FIELDS]
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('name',)
+    conditional_related = ('services', 'services__service')
+    conditional_timestamps = ('updated_at', 'stats_updated_at')
+    cache_query_params = (
+        'search', 'service', 'service_match', 'price_min', 'price_max', 'is_available',
+        'city', 'facets', 'is_open', 'open_at', 'ordering',
+        'lat', 'lon', 'radius', 'page', 'pagination', 'cursor',
+        *STATS_FILTER_PARAMS,
+    )
 
     def get_serializer_class(self):
         if self.action == 'create':
             return VetClinicCreateSerializer
+        if self.get_distance_ordering() is not None:
+            return NearestClinicSerializer
         return VetClinicSerializer
 
+    def get_base_queryset(self):
+        """
+        Клиники с предзагруженными услугами: число запросов на страницу
+        не зависит от её размера
+        """
+        return VetClinic.objects.prefetch_related(
+            Prefetch('services', queryset=ClinicService.objects.select_related('service'))
+        )
+
     def get_queryset(self):
-        queryset = VetClinic.objects.all()
-        service = self.request.query_params.get('service', None)
+        queryset = self.get_base_queryset()
         is_open = self.request.query_params.get('is_open', None)
+        open_at = self.request.query_params.get('open_at', None)
+
+        offers = self.get_offer_filters()
+        queryset = filter_by_offers(
+            queryset, offer_conditions(**offers), offers['service_ids'], self.get_service_match()
+        )
 
-        if service:
-            queryset = queryset.filter(services__service_id=service)
+        cities = self.get_list_param('city')
+        if cities:
+            queryset = queryset.filter(city__in=cities)
 
-        if is_open is not None:
-            queryset = queryset.filter(is_active=is_open.lower() == 'true')
+        queryset = queryset.filter(**self.get_stats_filters())
+
+        if is_open is not None or open_at:
+            open_condition = VetClinic.open_at_q(self.parse_open_at(open_at))
+            if is_open is None or is_open.lower() == 'true':
+                queryset = queryset.filter(open_condition)
+            else:
+                queryset = queryset.exclude(open_condition)
+
+        if self.action == 'list':
+            point = self.get_search_point()
+            if point is not None and (point[2] is not None or self.get_distance_ordering()):
+                queryset = VetClinic.with_distance(*point, queryset=queryset)
 
         return queryset
 
+    def get_list_param(self, name):
+        """
+        Значения параметра, переданного несколько раз или через запятую
+        """
+        return [
+            value.strip()
+            for raw in self.request.query_params.getlist(name)
+            for value in raw.split(',') if value.strip()
+        ]
+
+    def get_number_param(self, name):
+        """
+        Числовой параметр запроса как Decimal или None, если он не передан.
+        Значение округляется до точности цены и по модулю должно быть
+        меньше NUMBER_PARAM_LIMIT
+        """
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            value = Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({'error': f'Некорректное значение {name}'})
+        if not value.is_finite():
+            raise ValidationError({'error': f'Некорректное значение {name}'})
+        # Граница проверяется до округления (quantize и abs не работают
+        # с огромными порядками) и после него: 99999999.999 округляется до 10^8
+        if value.copy_abs() < NUMBER_PARAM_LIMIT:
+            value = value.quantize(NUMBER_PARAM_QUANTUM)
+        if value.copy_abs() >= NUMBER_PARAM_LIMIT:
+            raise ValidationError({'error': f'{name} должен быть меньше {NUMBER_PARAM_LIMIT} по модулю'})
+        return value
+
+    def get_offer_filters(self):
+        """
+        Фильтры по услугам клиник: набор услуг, диапазон цен и доступность
+        """
+        try:
+            service_ids = [int(value) for value in self.get_list_param('service')]
+        except ValueError:
+            raise ValidationError({'error': 'Некорректное значение service'})
+
+        is_available = self.request.query_params.get('is_available')
+        if is_available:
+            if is_available.lower() not in ('true', 'false'):
+                raise ValidationError({'error': 'Некорректное значение is_available'})
+            is_available = is_available.lower() == 'true'
+        else:
+            is_available = None
+
+        price_min = self.get_number_param('price_min')
+        price_max = self.get_number_param('price_max')
+        if price_min is not None and price_max is not None and price_min > price_max:
+            raise ValidationError({'error': 'price_min больше price_max'})
+
+        return {
+            'service_ids': service_ids,
+            'price_min': price_min,
+            'price_max': price_max,
+            'is_available': is_available,
+        }
+
+    def get_service_match(self):
+        match = self.request.query_params.get('service_match') or MATCH_ANY
+        if match not in MATCH_CHOICES:
+            raise ValidationError({'error': 'service_match должен быть any или all'})
+        return match
+
+    def get_stats_filters(self):
+        """
+        Фильтры по сводным показателям: <поле>_min и <поле>_max,
+        например rating_min=10 или min_price_max=1000
+        """
+        lookups = {}
+        for param in STATS_FILTER_PARAMS:
+            value = self.get_number_param(param)
+            if value is None:
+                continue
+            field, bound = param.rsplit('_', 1)
+            lookups[f'{field}__{"gte" if bound == "min" else "lte"}'] = value
+        return lookups
+
+    def facets_requested(self):
+        return self.action == 'list' and self.request.query_params.get('facets', '').lower() == 'true'
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.facets_requested():
+            offers = self.get_offer_filters()
+            response.data['facets'] = clinic_facets(
+                self.filter_queryset(self.get_queryset()),
+                offer_conditions(**offers),
+                is_available=offers['is_available'],
+            )
+        return response
+
+    def parse_open_at(self, value):
+        """
+        Разбирает параметр open_at; без значения возвращает текущий момент
+        """
+        if not value:
+            return timezone.now()
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise ValidationError({'error': 'Некорректное значение open_at'})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def get_search_point(self):
+        """
+        Возвращает точку поиска (lat, lon, radius) из параметров запроса
+        или None, если координаты не переданы
+        """
+        params = self.request.query_params
+        if 'lat' not in params or 'lon' not in params:
+            return None
+
+        try:
+            lat = float(params['lat'])
+            lon = float(params['lon'])
+            radius = float(params['radius']) if params.get('radius') else None
+        except ValueError:
+            raise ValidationError({'error': 'Некорректные параметры поиска'})
+        # float() принимает nan и inf, которые не проходят сравнения ниже
+        if not all(math.isfinite(value) for value in (lat, lon, radius) if value is not None):
+            raise ValidationError({'error': 'Некорректные параметры поиска'})
+
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValidationError({'error': 'Координаты вне допустимого диапазона'})
+        if radius is not None and radius <= 0:
+            raise ValidationError({'error': 'Радиус должен быть положительным'})
+
+        return lat, lon, radius
+
+    def get_distance_ordering(self):
+        """
+        Точка поиска, если список нужно отсортировать по расстоянию
+        """
+        if self.action != 'list' or self.request.query_params.get('ordering') != 'distance':
+            return None
+        return self.get_search_point()
+
+    def get_cursor_ordering(self):
+        # Список по расстоянию пагинируется только постранично: ключ
+        # сортировки зависит от точки поиска
+        if self.get_distance_ordering() is not None:
+            return None
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset):
+        if self.get_distance_ordering() is None:
+            return super().paginate_queryset(queryset)
+
+        # Сортировка по расстоянию выполняется в SQL: в Python попадают только
+        # клиники текущей страницы, при radius кандидаты ограничены
+        # прямоугольником по индексу координат
+        page = super().paginate_queryset(queryset.order_by('distance', 'pk'))
+        for clinic in page if page is not None else []:
+            clinic.distance = round(clinic.distance, 2)
+        return page
+
+    def get_schedule_variant(self):
+        """
+        Текущий слот расписания, если ответ зависит от текущего времени
+        """
+        params = self.request.query_params
+        if 'is_open' in params and not params.get('open_at'):
+            return slot_at()
+        return None
+
+    def get_favorite_clinic_ids(self):
+        """
+        id избранных клиник пользователя, загружаются один раз на запрос
+        """
+        if not hasattr(self, '_favorite_clinic_ids'):
+            user = self.request.user
+            self._favorite_clinic_ids = set()
+            if user.is_authenticated:
+                self._favorite_clinic_ids = set(FavoriteClinic.objects.filter(
+                    user=user
+                ).values_list('clinic_id', flat=True))
+        return self._favorite_clinic_ids
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('list', 'retrieve', 'nearest'):
+            context['favorite_clinic_ids'] = self.get_favorite_clinic_ids()
+        return context
+
+    def get_conditional_state(self):
+        # Поколение кэша каталога меняется при любом изменении клиник и услуг,
+        # поколение счетчиков - при изменении избранного и записей, поэтому
+        # список не агрегирует всю отфильтрованную выборку на каждый запрос
+        if self.action == 'list':
+            return {
+                'generation': catalogue_cache.generation(),
+                'stats': catalogue_stats_state.generation(),
+            }
+        return super().get_conditional_state()
+
+    def get_conditional_extra(self):
+        return (
+            *super().get_conditional_extra(),
+            sorted(self.get_favorite_clinic_ids()),
+            self.get_schedule_variant(),
+        )
+
+    def get_cache_key(self, request):
+        return (
+            f'{super().get_cache_key(request)}:{self.get_schedule_variant()}'
+            f':{catalogue_stats_state.generation()}'
+        )
+
+    @extend_schema(
+        summary="Найти ближайшие клиники",
+        description="Возвращает активные клиники, отсортированные по расстоянию до указанной точки.",
+        parameters=[
+            OpenApiParameter(
+                name="lat",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Широта точки поиска"
+            ),
+            OpenApiParameter(
+                name="lon",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Долгота точки поиска"
+            ),
+            OpenApiParameter(
+                name="radius",
+                type=OpenApiTypes.FLOAT,
+                description="Радиус поиска в километрах"
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                description=f"Максимальное число клиник (не более {NEAREST_MAX_LIMIT})"
+            ),
+        ],
+        responses={200: NearestClinicSerializer(many=True)},
+        tags=["clinics"],
+    )
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        point = self.get_search_point()
+        if point is None:
+            return Response(
+                {'error': 'Параметры lat и lon обязательны'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        lat, lon, radius = point
+
+        try:
+            limit = int(request.query_params.get('limit', NEAREST_DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': 'Некорректные параметры поиска'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, NEAREST_MAX_LIMIT))
+
+        clinics = []
+        nearest = VetClinic.find_nearest(
+            lat, lon, limit=limit, radius=radius, queryset=self.get_base_queryset()
+        )
+        for clinic, distance in nearest:
+            clinic.distance = distance
+            clinics.append(clinic)
+
+        serializer = NearestClinicSerializer(
+            clinics, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        summary="Выгрузить каталог клиник",
+        description="Потоковая выгрузка всех клиник с услугами в NDJSON (по умолчанию) "
+                    "или CSV в формате файла импорта. Формат выбирается заголовком Accept "
+                    "или параметром format. Неактивные клиники выгружаются только сотрудникам.",
+        parameters=[
+            OpenApiParameter(
+                name="format",
+                type=OpenApiTypes.STR,
+                enum=EXPORT_FORMATS,
+                description="Формат выгрузки"
+            ),
+            OpenApiParameter(
+                name="city",
+                type=OpenApiTypes.STR,
+                description="Выгрузить только клиники указанных городов: city=Москва,Казань"
+            ),
+        ],
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR, (200, 'text/csv'): OpenApiTypes.STR},
+        tags=["clinics"],
+    )
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        # Скрытые клиники выгружаются только сотрудникам сервиса
+        queryset = VetClinic.objects.all()
+        if not request.user.is_staff:
+            queryset = queryset.filter(is_active=True)
+        cities = self.get_list_param('city')
+        if cities:
+            queryset = queryset.filter(city__in=cities)
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            iter_export(renderer.format, queryset, chunk_size=settings.CLINIC_EXPORT_CHUNK_SIZE),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="clinics.{renderer.format}"'
+        return response
+
     @extend_schema(
         summary="Добавить клинику в избранное",
         description="Добавляет ветеринарную клинику в список избранных клиник пользователя.",
@@ -124,6 +575,66 @@ class VetClinicViewSet(viewsets.ModelViewSet):
         ).delete()
         return Response({'status': 'clinic removed from favorites'})
 
+    @extend_schema(
+        summary="Массово обновить услуги клиник",
+        description=(
+            "Обновляет цену, длительность и доступность услуг одной или многих клиник "
+            "и создает недостающие услуги клиник в одной транзакции. Строки без clinic_id "
+            "применяются ко всем клиникам из clinic_ids. Ответ содержит статус каждой строки. "
+            "Доступно администраторам изменяемых клиник."
+        ),
+        request=ClinicServiceBulkSerializer,
+        responses={207: ClinicServiceBulkResultSerializer(many=True)},
+        tags=["clinics"],
+    )
+    @action(detail=False, methods=['post'], url_path='services/bulk',
+            permission_classes=[IsClinicAdmin])
+    def bulk_update_services(self, request):
+        serializer = ClinicServiceBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clinic_ids = serializer.validated_data.get('clinic_ids')
+        items = serializer.validated_data['items']
+
+        if expanded_row_count(items, clinic_ids) > settings.CLINIC_SERVICE_BULK_MAX_ROWS:
+            return Response(
+                {'error': f'Не более {settings.CLINIC_SERVICE_BULK_MAX_ROWS} строк за один запрос'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = []
+        for index, item in enumerate(items):
+            item_serializer = ClinicServiceBulkItemSerializer(data=item)
+            if item_serializer.is_valid():
+                rows.extend(expand_row(index, item_serializer.validated_data, clinic_ids))
+            else:
+                item = item if isinstance(item, dict) else {}
+                rows.append({
+                    'index': index,
+                    'clinic_id': item.get('clinic_id'),
+                    'service_id': item.get('service_id'),
+                    'errors': [
+                        f'Ошибка в поле {field}: {message}'
+                        for field, messages in item_serializer.errors.items()
+                        for message in messages
+                    ],
+                })
+
+        # Права проверяются до записи: администратор клиники меняет
+        # только свои клиники, несуществующие клиники попадают в ответ
+        # как ошибки строк
+        clinic_ids = {row['clinic_id'] for row in rows if row.get('clinic_id') is not None}
+        if clinic_ids and not request.user.is_staff:
+            clinics = with_admin_flag(VetClinic.objects.filter(pk__in=clinic_ids), request.user)
+            for clinic in clinics.only('pk'):
+                self.check_object_permissions(request, clinic)
+
+        results = apply_clinic_service_updates(rows)
+        ok = any(result['status'] != 'error' for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_207_MULTI_STATUS if ok else status.HTTP_400_BAD_REQUEST
+        )
+
 @extend_schema_view(
     list=extend_schema(
         summary="Получить список услуг",
@@ -156,7 +667,7 @@ class VetClinicViewSet(viewsets.ModelViewSet):
         tags=["services"],
     ),
 )
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(SerializerMetricsMixin, CatalogueCacheMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -183,9 +694,11 @@ class ServiceViewSet(viewsets.ModelViewSet):
         tags=["favorites"],
     ),
 )
-class FavoriteClinicViewSet(viewsets.ModelViewSet):
+class FavoriteClinicViewSet(SerializerMetricsMixin, viewsets.ModelViewSet):
     serializer_class = FavoriteClinicSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return FavoriteClinic.objects.filter(user=self.request.user)
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Потокобезопасный LRU-кэш в памяти процесса с ограничением по числу
+    записей и времени жизни
+    """
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    Двухуровневый версионируемый кэш: LRU в памяти процесса перед общим
+    кэшем Django (Redis).
+
+    Ключи включают номер поколения пространства имён. Инвалидация - это
+    увеличение номера поколения (bump), старые записи просто вытесняются.
+    """
+    def __init__(self, namespace, alias='default', timeout=300,
+                 local_size=512, generation_ttl=1):
+        self.namespace = namespace
+        self.alias = alias
+        self.timeout = timeout
+        self.generation_ttl = generation_ttl
+        self.local = LocalLRUCache(local_size)
+        self._generation = None
+        self._generation_expires = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @property
+    def generation_key(self):
+        return f'{self.namespace}:generation'
+
+    def generation(self):
+        """
+        Текущий номер поколения. Значение из общего кэша запоминается в процессе
+        на generation_ttl секунд, чтобы не ходить в Redis на каждый запрос.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._generation is not None and self._generation_expires > now:
+                return self._generation
+        generation = self.shared.get_or_set(self.generation_key, 1, timeout=None)
+        with self._lock:
+            self._generation = generation
+            self._generation_expires = now + self.generation_ttl
+        return generation
+
+    def bump(self):
+        """
+        Делает недействительными все записи пространства имён за O(1)
+        """
+        try:
+            generation = self.shared.incr(self.generation_key)
+        except ValueError:
+            generation = 2
+            if not self.shared.add(self.generation_key, generation, timeout=None):
+                generation = self.shared.incr(self.generation_key)
+        with self._lock:
+            self._generation = generation
+            self._generation_expires = time.monotonic() + self.generation_ttl
+        return generation
+
+    def make_key(self, key):
+        return f'{self.namespace}:{self.generation()}:{key}'
+
+    def get(self, key, default=None):
+        key = self.make_key(key)
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value, self.timeout)
+        return value
+
+    def set(self, key, value):
+        key = self.make_key(key)
+        self.local.set(key, value, self.timeout)
+        self.shared.set(key, value, self.timeout)
+
+    def clear_local(self):
+        """
+        Сбрасывает уровень в памяти процесса и запомненный номер поколения
+        """
+        self.local.clear()
+        with self._lock:
+            self._generation = None
@@ -0,0 +1,98 @@
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для list/retrieve.
+
+    Валидаторы строятся одним агрегатным запросом COUNT/MAX(updated_at)
+    по выборке ответа и связям из conditional_related, поэтому на
+    If-None-Match / If-Modified-Since отвечаем 304 без сериализации.
+    Представление может заменить состояние в get_conditional_state, например
+    номером поколения кэша; без ключа count ETag строится всегда.
+    """
+    conditional_actions = ('list', 'retrieve')
+    # Связи, данные которых входят в ответ, например 'services'
+    conditional_related = ()
+    # Отметки времени модели, изменение любой из которых меняет ответ
+    conditional_timestamps = ('updated_at',)
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        model = queryset.model
+        return model._default_manager.filter(pk__in=queryset.order_by().values('pk'))
+
+    def get_conditional_state(self):
+        aggregates = {'count': Count('pk', distinct=True)}
+        for field in self.conditional_timestamps:
+            key = 'updated' if field == 'updated_at' else field.removesuffix('_at')
+            aggregates[key] = Max(field)
+        for relation in self.conditional_related:
+            aggregates[f'{relation}_count'] = Count(f'{relation}__pk', distinct=True)
+            aggregates[f'{relation}_updated'] = Max(f'{relation}__updated_at')
+        return self.get_conditional_queryset().aggregate(**aggregates)
+
+    def get_conditional_extra(self):
+        """
+        Дополнительные данные, от которых зависит ответ; по умолчанию - пользователь
+        """
+        return (self.request.user.pk,)
+
+    def get_validators(self, request):
+        """
+        Возвращает (etag, last_modified) или (None, None), если объектов нет
+        """
+        state = self.get_conditional_state()
+        if 'count' in state and not state['count']:
+            return None, None
+
+        modified = [value for key, value in state.items()
+                    if key.endswith('updated') and value is not None]
+        last_modified = int(max(modified).timestamp()) if modified else None
+
+        renderer = getattr(request, 'accepted_renderer', None)
+        parts = [
+            request.get_full_path(),
+            getattr(renderer, 'format', ''),
+            *(f'{key}={value.isoformat() if hasattr(value, "isoformat") else value}'
+              for key, value in sorted(state.items())),
+            *map(str, self.get_conditional_extra()),
+        ]
+        digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+        return f'W/"{digest}"', last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.conditional_actions or request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        headers = {'ETag': etag}
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            response = Response(status=not_modified.status_code, headers=headers)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                for header, value in headers.items():
+                    response[header] = value
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,56 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_futures = set()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.BACKGROUND_WORKERS,
+                    thread_name_prefix='background-job',
+                )
+    return _executor
+
+
+def _run_local(task, args):
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась с ошибкой', task.name)
+    finally:
+        close_old_connections()
+
+
+def _dispatch(task, args):
+    if settings.CELERY_BROKER_URL:
+        task.delay(*args)
+        return
+    future = _get_executor().submit(_run_local, task, args)
+    _futures.add(future)
+    future.add_done_callback(_futures.discard)
+
+
+def run_in_background(task, *args):
+    """
+    Ставит задачу Celery в очередь после фиксации транзакции.
+    Без настроенного брокера задача выполняется в пуле потоков процесса.
+    """
+    transaction.on_commit(lambda: _dispatch(task, args))
+
+
+def wait_for_background_jobs(timeout=None):
+    """
+    Ожидает завершения задач, запущенных в пуле потоков процесса
+    """
+    wait(list(_futures), timeout=timeout)
@@ -0,0 +1,250 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from clinics.cache import invalidate_catalogue
+from clinics.geo import ClinicGeoMatrix
+from clinics.models import VetClinic, Service, ClinicService, FavoriteClinic
+from clinics.schedule import working_hours_slots
+from clinics.stats import recompute_clinic_stats
+from pets.models import Pet, VetPassport, VetRecord
+
+User = get_user_model()
+
+# Префикс имён синтетических объектов: по нему данные удаляются при --clear
+PREFIX = 'bench'
+# Пароль всех синтетических пользователей
+PASSWORD = 'bench-password'
+BATCH_SIZE = 2000
+
+# Города с центрами и разбросом координат клиник, градусы
+CITIES = (
+    ('Москва', 55.7558, 37.6173, 0.25, 0.4),
+    ('Санкт-Петербург', 59.9343, 30.3351, 0.15, 0.3),
+    ('Новосибирск', 55.0084, 82.9357, 0.1, 0.15),
+    ('Екатеринбург', 56.8389, 60.6057, 0.1, 0.15),
+    ('Казань', 55.7963, 49.1088, 0.08, 0.12),
+    ('Нижний Новгород', 56.2965, 43.9361, 0.08, 0.12),
+)
+# Доля клиник по городам: как в реальных выгрузках, большинство - в столицах
+CITY_WEIGHTS = (40, 20, 10, 10, 10, 10)
+
+WORKING_HOURS = (
+    'Mo-Fr 9-18',
+    'Mo-Fr 8-20, Sa 10-16',
+    'Mo-Su 0-24',
+    'Mo-Sa 9-21',
+    'Mo-Fr 10-19, Sa-Su 10-15',
+    'Tu-Su 9-18',
+)
+SERVICE_CATEGORIES = ('Диагностика', 'Терапия', 'Хирургия', 'Стоматология', 'Груминг', 'Вакцинация')
+SERVICE_WORDS = (
+    'Осмотр', 'УЗИ', 'Рентген', 'Анализ крови', 'Вакцинация', 'Чипирование',
+    'Стерилизация', 'Кастрация', 'Чистка зубов', 'Стрижка', 'Консультация', 'ЭКГ',
+)
+CLINIC_WORDS = ('Айболит', 'Ветдоктор', 'Зоосфера', 'Доктор Вет', 'Лапа', 'Хвост', 'Биоконтроль', 'Пульс')
+STREETS = ('Ленина', 'Мира', 'Гагарина', 'Советская', 'Садовая', 'Лесная', 'Центральная')
+PET_NAMES = ('Барсик', 'Мурка', 'Шарик', 'Рекс', 'Кеша', 'Луна', 'Граф', 'Соня', 'Бим', 'Тиша')
+BREEDS = {
+    'dog': ('Лабрадор', 'Такса', 'Овчарка', 'Корги', None),
+    'cat': ('Британская', 'Мейн-кун', 'Сфинкс', None),
+    'bird': ('Волнистый попугай', 'Канарейка'),
+    'reptile': ('Игуана', None),
+    'other': (None,),
+}
+PET_TYPE_WEIGHTS = (('dog', 45), ('cat', 40), ('bird', 7), ('reptile', 3), ('other', 5))
+
+
+def _batched_create(model, objects, **kwargs):
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE, **kwargs)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные для бенчмарков: клиники с координатами '
+        'и услугами, пользователей, питомцев, паспорта, записи и избранное'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clinics', type=int, default=1000, help='Число клиник (по умолчанию 1000)')
+        parser.add_argument('--services', type=int, default=60, help='Число услуг в справочнике (по умолчанию 60)')
+        parser.add_argument('--services-per-clinic', type=int, default=15,
+                            help='Среднее число услуг клиники (по умолчанию 15)')
+        parser.add_argument('--users', type=int, default=200, help='Число пользователей (по умолчанию 200)')
+        parser.add_argument('--pets-per-user', type=int, default=2,
+                            help='Среднее число питомцев пользователя (по умолчанию 2)')
+        parser.add_argument('--records-per-pet', type=int, default=4,
+                            help='Среднее число ветеринарных записей питомца (по умолчанию 4)')
+        parser.add_argument('--favorites-per-user', type=int, default=5,
+                            help='Среднее число избранных клиник пользователя (по умолчанию 5)')
+        parser.add_argument('--seed', type=int, default=42, help='Начальное значение генератора случайных чисел')
+        parser.add_argument('--clear', action='store_true', help='Удалить ранее сгенерированные данные')
+
+    def handle(self, *args, **options):
+        for option in ('clinics', 'services', 'users'):
+            if options[option] < 1:
+                raise CommandError(f'Параметр --{option} должен быть положительным')
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+
+        with transaction.atomic():
+            if options['clear']:
+                self.clear()
+            elif VetClinic.objects.filter(name__startswith=f'{PREFIX} ').exists():
+                raise CommandError('Синтетические данные уже созданы, используйте --clear')
+
+            services = self.create_services(options['services'])
+            clinics = self.create_clinics(options['clinics'])
+            clinic_services = self.create_clinic_services(
+                clinics, services, options['services_per_clinic']
+            )
+            users = self.create_users(options['users'])
+            pets = self.create_pets(users, options['pets_per_user'])
+            self.create_passports(pets)
+            records = self.create_records(pets, clinic_services, options['records_per_pet'])
+            favorites = self.create_favorites(users, clinics, options['favorites_per_user'])
+            recompute_clinic_stats(clinic.pk for clinic in clinics)
+
+        # Массовое создание не отправляет сигналы: сбрасываем производные данные явно
+        ClinicGeoMatrix.invalidate()
+        invalidate_catalogue()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: клиник {len(clinics)}, услуг {len(services)}, '
+            f'услуг клиник {len(clinic_services)}, пользователей {len(users)}, '
+            f'питомцев {len(pets)}, записей {records}, избранного {favorites}. '
+            f'Пароль пользователей {PREFIX}_user_N: {PASSWORD}'
+        ))
+
+    def clear(self):
+        VetClinic.objects.filter(name__startswith=f'{PREFIX} ').delete()
+        Service.objects.filter(name__startswith=f'{PREFIX} ').delete()
+        User.objects.filter(username__startswith=f'{PREFIX}_user_').delete()
+
+    def spread(self, average):
+        """Случайное число вокруг среднего, как в реальных данных с длинным хвостом"""
+        if average <= 0:
+            return 0
+        return min(int(self.rng.expovariate(1 / average)), average * 5)
+
+    def create_services(self, count):
+        return _batched_create(Service, [
+            Service(
+                name=f'{PREFIX} {SERVICE_WORDS[i % len(SERVICE_WORDS)]} {i}',
+                description=f'Услуга {SERVICE_WORDS[i % len(SERVICE_WORDS)].lower()}',
+                category=SERVICE_CATEGORIES[i % len(SERVICE_CATEGORIES)],
+            )
+            for i in range(count)
+        ])
+
+    def create_clinics(self, count):
+        rng = self.rng
+        clinics = []
+        for i in range(count):
+            city, lat, lon, lat_spread, lon_spread = rng.choices(CITIES, CITY_WEIGHTS)[0]
+            latitude = Decimal(f'{rng.gauss(lat, lat_spread / 2):.6f}')
+            longitude = Decimal(f'{rng.gauss(lon, lon_spread / 2):.6f}')
+            working_hours = rng.choice(WORKING_HOURS)
+            word = rng.choice(CLINIC_WORDS)
+            clinics.append(VetClinic(
+                name=f'{PREFIX} {word} {i}',
+                description=f'Ветеринарная клиника {word}, {city}',
+                address=f'ул. {rng.choice(STREETS)}, {rng.randint(1, 150)}',
+                city=city,
+                postal_code=str(rng.randint(100000, 699999)),
+                latitude=latitude,
+                longitude=longitude,
+                phone=f'+7495{rng.randint(1000000, 9999999)}',
+                email=f'clinic{i}@example.com',
+                working_hours=working_hours,
+                open_slots=working_hours_slots(working_hours),
+                # Небольшая доля закрытых клиник, как после реальных импортов
+                is_active=rng.random() > 0.05,
+            ))
+        return _batched_create(VetClinic, clinics)
+
+    def create_clinic_services(self, clinics, services, per_clinic):
+        rng = self.rng
+        links = []
+        for clinic in clinics:
+            count = min(max(1, self.spread(per_clinic)), len(services))
+            for service in rng.sample(services, count):
+                links.append(ClinicService(
+                    clinic=clinic,
+                    service=service,
+                    price=Decimal(rng.randrange(300, 15000, 50)),
+                    duration=rng.choice((15, 30, 45, 60, 90)),
+                    is_available=rng.random() > 0.1,
+                ))
+        return _batched_create(ClinicService, links)
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        return _batched_create(User, [
+            User(
+                username=f'{PREFIX}_user_{i}',
+                email=f'{PREFIX}_user_{i}@example.com',
+                first_name=self.rng.choice(('Анна', 'Иван', 'Мария', 'Олег', 'Елена', 'Пётр')),
+                last_name=self.rng.choice(('Иванова', 'Петров', 'Смирнова', 'Кузнецов')),
+                password=password,
+            )
+            for i in range(count)
+        ])
+
+    def create_pets(self, users, per_user):
+        rng = self.rng
+        types, weights = zip(*PET_TYPE_WEIGHTS)
+        pets = []
+        for user in users:
+            for _ in range(self.spread(per_user)):
+                pet_type = rng.choices(types, weights)[0]
+                pets.append(Pet(
+                    owner=user,
+                    name=rng.choice(PET_NAMES),
+                    pet_type=pet_type,
+                    breed=rng.choice(BREEDS[pet_type]),
+                    gender=rng.choice(('male', 'female', 'unknown')),
+                    birth_date=(self.now - timedelta(days=rng.randint(60, 5000))).date(),
+                    weight=Decimal(f'{rng.uniform(0.1, 45):.2f}'),
+                ))
+        return _batched_create(Pet, pets)
+
+    def create_passports(self, pets):
+        # Паспорт есть примерно у двух третей питомцев
+        return _batched_create(VetPassport, [
+            VetPassport(
+                pet=pet,
+                passport_number=f'{PREFIX}-{pet.pk}',
+                chip_number=f'643{pet.pk:012d}' if self.rng.random() > 0.5 else None,
+            )
+            for pet in pets if self.rng.random() < 0.66
+        ])
+
+    def create_records(self, pets, clinic_services, per_pet):
+        rng = self.rng
+        records = [
+            VetRecord(
+                pet=pet,
+                clinic_id=link.clinic_id,
+                service_id=link.service_id,
+                date=self.now - timedelta(days=rng.randint(0, 1500), minutes=rng.randint(0, 600)),
+                notes=rng.choice((None, 'Плановый приём', 'Повторный осмотр')),
+            )
+            for pet in pets
+            for link in rng.choices(clinic_services, k=self.spread(per_pet))
+        ]
+        _batched_create(VetRecord, records)
+        return len(records)
+
+    def create_favorites(self, users, clinics, per_user):
+        favorites = [
+            FavoriteClinic(user=user, clinic=clinic)
+            for user in users
+            for clinic in self.rng.sample(clinics, min(self.spread(per_user), len(clinics)))
+        ]
+        _batched_create(FavoriteClinic, favorites)
+        return len(favorites)
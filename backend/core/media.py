@@ -0,0 +1,119 @@
+from collections import Counter
+from functools import partial
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete
+from .models import MediaBlob
+from .storage import content_addressed_storage, sha256_from_name
+
+
+def acquire(name, count=1):
+    """
+    Учитывает новые ссылки на файл
+    """
+    if not name:
+        return
+    sha256 = sha256_from_name(name)
+    if sha256 is None:
+        return
+    with transaction.atomic():
+        blob, _ = MediaBlob.objects.select_for_update().get_or_create(
+            name=name,
+            defaults={'sha256': sha256, 'size': _size(name)},
+        )
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + count)
+
+
+def release(name):
+    """
+    Снимает ссылку на файл. Запись файла без ссылок остается со счетчиком 0,
+    файл и его производные удаляются после фиксации транзакции, если
+    к тому моменту на него снова не сослались.
+    """
+    if not name:
+        return
+    storage = content_addressed_storage()
+    if sha256_from_name(name) is None:
+        # Файл загружен до перехода на хранилище по содержимому и ни с кем не делится
+        transaction.on_commit(partial(storage.delete, name))
+        return
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if blob is None or blob.ref_count == 0:
+            return
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+        if blob.ref_count == 1:
+            transaction.on_commit(partial(_collect, name))
+
+
+def replace_references(old_names, new_names):
+    """
+    Пересчитывает ссылки после массового обновления полей (bulk_update
+    не отправляет сигналы): новые имена учитываются, старые снимаются
+    """
+    old_names, new_names = Counter(filter(None, old_names)), Counter(filter(None, new_names))
+    for name, count in (new_names - old_names).items():
+        acquire(name, count)
+    for name, count in (old_names - new_names).items():
+        for _ in range(count):
+            release(name)
+
+
+def _size(name):
+    try:
+        return content_addressed_storage().size(name)
+    except OSError:
+        return 0
+
+
+def _collect(name):
+    """
+    Удаляет файл без ссылок, его запись и ссылки на производные. Счетчик
+    перепроверяется под блокировкой записи: тот же файл могли сохранить
+    снова между release и этим вызовом, тогда он остается
+    """
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if blob is None or blob.ref_count > 0:
+            return
+        blob.delete()
+        content_addressed_storage().delete(name)
+        for formats in blob.renditions.values():
+            for rendition in formats.values():
+                release(rendition)
+
+
+def _field_name(instance, field):
+    value = instance.__dict__.get(field.attname)
+    return getattr(value, 'name', value) or ''
+
+
+def track_references(model, field_names):
+    """
+    Подключает подсчет ссылок на файлы для полей модели: при сохранении
+    с новым файлом ссылка на старый снимается, при удалении - снимаются все
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+
+    def remember(sender, instance, **kwargs):
+        instance._media_names = {f.attname: _field_name(instance, f) for f in fields}
+
+    def on_save(sender, instance, update_fields=None, **kwargs):
+        previous = getattr(instance, '_media_names', {})
+        for field in fields:
+            if update_fields is not None and field.name not in update_fields:
+                continue
+            old, new = previous.get(field.attname, ''), _field_name(instance, field)
+            if old != new:
+                acquire(new)
+                release(old)
+        remember(sender, instance)
+
+    def on_delete(sender, instance, **kwargs):
+        for field in fields:
+            release(_field_name(instance, field))
+
+    uid = f'media_refs_{model._meta.label_lower}'
+    post_init.connect(remember, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
@@ -0,0 +1,218 @@
+import bisect
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from rest_framework.serializers import ListSerializer
+
+# Границы корзин гистограмм по умолчанию, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Границы корзин для числа SQL-запросов на запрос
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """
+    Накопительная гистограмма в формате Prometheus: корзины, сумма и число
+    наблюдений отдельно для каждого набора меток
+    """
+
+    def __init__(self, name, documentation, labels, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def _format_labels(self, label_values, **extra):
+        pairs = list(zip(self.labels, label_values)) + list(extra.items())
+        if not pairs:
+            return ''
+        escaped = (
+            (key, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+            for key, value in pairs
+        )
+        return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, ([*counts], total, count))
+                            for key, (counts, total, count) in self._series.items())
+        for label_values, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                labels = self._format_labels(label_values, le=_format_value(bound))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = self._format_labels(label_values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return '\n'.join(lines)
+
+
+def _format_value(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Время обработки запроса', ('view', 'method', 'status'),
+)
+SQL_QUERIES = REGISTRY.histogram(
+    'http_request_sql_queries', 'Число SQL-запросов на запрос', ('view', 'method'),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+SQL_DURATION = REGISTRY.histogram(
+    'http_request_sql_duration_seconds', 'Время SQL-запросов на запрос', ('view', 'method'),
+)
+SERIALIZER_DURATION = REGISTRY.histogram(
+    'http_request_serializer_duration_seconds', 'Время сериализации ответа', ('view', 'method'),
+)
+
+
+class RequestMetrics:
+    """
+    Счётчики одного запроса. Текущий экземпляр доступен через current_metrics()
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_sql_count = 0
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка connection.execute_wrapper: учитывает каждый запрос к БД
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+            if self._serializer_depth:
+                self.serializer_sql_count += 1
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """
+        Значение заголовка Server-Timing, длительности в миллисекундах
+        """
+        return ', '.join((
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} queries"',
+            f'serializer;dur={self.serializer_time * 1000:.1f};'
+            f'desc="{self.serializer_sql_count} queries"',
+            f'total;dur={self.elapsed * 1000:.1f}',
+        ))
+
+    def observe(self, view, method, status):
+        SQL_QUERIES.observe(self.sql_count, view, method)
+        SQL_DURATION.observe(self.sql_time, view, method)
+        SERIALIZER_DURATION.observe(self.serializer_time, view, method)
+        REQUEST_LATENCY.observe(self.elapsed, view, method, str(status))
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def current_metrics():
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+class TimedDataMixin:
+    """
+    Учитывает время получения .data в метриках текущего запроса. Вложенные
+    сериализаторы не учитываются повторно
+    """
+
+    @property
+    def data(self):
+        metrics = _current.get()
+        if metrics is None:
+            return super().data
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            metrics._serializer_depth -= 1
+            if not metrics._serializer_depth:
+                metrics.serializer_time += time.perf_counter() - started
+
+
+@functools.lru_cache(maxsize=None)
+def timed_serializer_class(serializer_class):
+    """
+    Подкласс сериализатора с TimedDataMixin. Для many=True используется
+    такой же подкласс list_serializer_class, поэтому учитывается и список
+    """
+    attrs = {'__module__': serializer_class.__module__}
+    if not issubclass(serializer_class, ListSerializer):
+        meta = getattr(serializer_class, 'Meta', object)
+        list_class = getattr(meta, 'list_serializer_class', ListSerializer)
+        attrs['Meta'] = type('Meta', (meta,), {
+            'list_serializer_class': timed_serializer_class(list_class),
+        })
+    return type(serializer_class.__name__, (TimedDataMixin, serializer_class), attrs)
+
+
+class SerializerMetricsMixin:
+    """
+    Примесь представления: при включённых метриках запроса сериализаторы
+    из get_serializer учитывают время сериализации ответа
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if _current.get() is None:
+            return super().get_serializer(*args, **kwargs)
+        serializer_class = timed_serializer_class(self.get_serializer_class())
+        kwargs.setdefault('context', self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
@@ -0,0 +1,38 @@
+from contextlib import ExitStack
+from django.db import connections
+from .metrics import RequestMetrics, activate, deactivate
+
+
+class RequestMetricsMiddleware:
+    """
+    Метрики запроса: число и время SQL-запросов, время сериализации и общее
+    время ответа. Отдаются в заголовке Server-Timing и накапливаются в
+    гистограммах, доступных по /metrics. Подключается настройкой REQUEST_METRICS.
+    Время сериализации учитывают представления с SerializerMetricsMixin.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = activate(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            deactivate(token)
+
+        response['Server-Timing'] = metrics.server_timing()
+        metrics.observe(self.view_name(request), request.method, response.status_code)
+        return response
+
+    @staticmethod
+    def view_name(request):
+        # Имя маршрута, а не путь: число рядов гистограмм не зависит от id в URL
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route
@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class MediaBlob(models.Model):
+    """
+    Файл в хранилище с адресацией по содержимому и счетчиком ссылок
+    на него из полей моделей
+    """
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Путь в хранилище'
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        db_index=True,
+        verbose_name='SHA-256'
+    )
+    size = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Размер (байт)'
+    )
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число ссылок'
+    )
+    renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Производные файлы',
+        help_text='Миниатюры: {размер: {формат: путь}}'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+
+    class Meta:
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файлы'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,107 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по ключу сортировки: без COUNT(*) и OFFSET
+    """
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    def get_ordering(self, request, queryset, view):
+        # Явная сортировка из ?ordering= имеет приоритет, иначе - ключ представления
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return self.with_tiebreaker(tuple(ordering), queryset.model)
+        return self.with_tiebreaker(tuple(self.ordering), queryset.model)
+
+    @staticmethod
+    def with_tiebreaker(ordering, model):
+        """
+        Добавляет pk в направлении первого поля, если среди полей сортировки
+        нет уникального: иначе записи с одинаковым ключом могут пропасть
+        или повториться на границе страниц
+        """
+        for field in ordering:
+            name = field.lstrip('-')
+            if name == 'pk':
+                return ordering
+            try:
+                if model._meta.get_field(name).unique:
+                    return ordering
+            except FieldDoesNotExist:
+                pass
+        direction = '-' if ordering[0].startswith('-') else ''
+        return (*ordering, f'{direction}pk')
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с возможностью перейти на курсорную.
+
+    По умолчанию работает как PageNumberPagination. Если в запросе передан
+    параметр cursor или pagination=cursor, используется курсорная пагинация
+    по view.cursor_ordering: ответ не содержит count, а следующая страница
+    выбирается по индексу без OFFSET.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def get_cursor_ordering(self, view):
+        """
+        Ключ курсорной пагинации: view.get_cursor_ordering(), если
+        представление выбирает его по запросу, иначе view.cursor_ordering.
+        None - только постраничная пагинация
+        """
+        if hasattr(view, 'get_cursor_ordering'):
+            return view.get_cursor_ordering()
+        return getattr(view, 'cursor_ordering', None)
+
+    def use_cursor(self, queryset, request, view):
+        if self.get_cursor_ordering(view) is None:
+            return False
+        return (self.cursor_query_param in request.query_params or
+                request.query_params.get(self.mode_query_param) == self.cursor_mode)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_cursor(queryset, request, view):
+            self.keyset = KeysetPagination(self.get_cursor_ordering(view))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['required'] = ['results']
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, 'cursor_ordering', None) is None:
+            return parameters
+        return parameters + [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы при курсорной пагинации',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'cursor - курсорная пагинация без подсчета общего числа записей',
+                'schema': {'type': 'string', 'enum': [self.cursor_mode]},
+            },
+        ]
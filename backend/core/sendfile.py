@@ -0,0 +1,132 @@
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from .storage import sha256_from_name
+
+STREAM_BLOCK_SIZE = 64 * 1024
+# Файлы в хранилище по содержимому не меняются, их можно кэшировать надолго
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class MediaRenderer(BaseRenderer):
+    """
+    Рендерер для представлений, отдающих файлы: принимает любой Accept,
+    ошибки отдает как JSON
+    """
+    media_type = '*/*'
+    format = 'media'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Тело ошибки - JSON, а не согласованный тип */*
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = f'application/json; charset={self.charset}'
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+def media_version(name):
+    """
+    Версия файла для URL: ответы кэшируются как неизменяемые,
+    поэтому новый файл должен получать новый URL
+    """
+    return (sha256_from_name(name) or hashlib.sha256(name.encode()).hexdigest())[:16]
+
+
+def parse_range(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном.
+    Возвращает (start, end) включительно, None - если отдаем файл целиком,
+    False - если диапазон невыполним.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Последние N байт
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(STREAM_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def send_file(request, storage, name, filename=None):
+    """
+    Отдает файл из хранилища после проверки прав.
+
+    Если задан MEDIA_ACCEL_REDIRECT, передача отдается nginx через
+    X-Accel-Redirect (nginx сам обрабатывает Range). Иначе файл
+    отдается потоково из Python с поддержкой одного диапазона Range.
+    Если файла нет на диске, вызывает Http404.
+    """
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    disposition = None
+    if filename:
+        disposition = f"inline; filename*=UTF-8''{quote(filename)}"
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{settings.MEDIA_ACCEL_REDIRECT.rstrip('/')}/{quote(name)}"
+    else:
+        path = storage.path(name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            raise Http404('Файл не найден')
+        byte_range = parse_range(request.headers.get('Range'), size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is None:
+            try:
+                file = open(path, 'rb')
+            except OSError:
+                raise Http404('Файл не найден')
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(path, start, end - start + 1),
+                status=206,
+                content_type=content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        response['Accept-Ranges'] = 'bytes'
+
+    if disposition:
+        response['Content-Disposition'] = disposition
+    if sha256_from_name(name) is not None:
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import tempfile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+CAS_PREFIX = 'cas'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище с адресацией по содержимому.
+
+    Имя файла - SHA-256 содержимого, которое считается потоково во время
+    записи во временный файл. Повторная загрузка того же содержимого не
+    занимает места: временный файл удаляется, возвращается имя существующего.
+    Удалением файлов управляет core.media по счетчику ссылок.
+    """
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя определяется содержимым в _save
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if hasattr(content, 'temporary_file_path'):
+            return self._save_file(content.temporary_file_path(), extension)
+
+        directory = self.path(CAS_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek') and content.seekable():
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            name = content_name(digest.hexdigest(), extension)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(tmp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
+
+    def _save_file(self, source, extension):
+        """
+        Сохраняет файл, уже лежащий на диске: хэш считается блоками,
+        файл перемещается без копирования через память
+        """
+        digest = hashlib.sha256()
+        with open(source, 'rb') as file:
+            for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+
+        name = content_name(digest.hexdigest(), extension)
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.remove(source)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            file_move_safe(source, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+
+def content_name(sha256, extension=''):
+    """Имя файла в хранилище по хэшу содержимого"""
+    return f'{CAS_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}'
+
+
+def sha256_from_name(name):
+    """Хэш содержимого из имени файла или None для файлов вне хранилища"""
+    parts = name.split('/')
+    if len(parts) != 4 or parts[0] != CAS_PREFIX:
+        return None
+    return os.path.splitext(parts[3])[0]
+
+
+_storage = None
+
+
+def content_addressed_storage():
+    """Общий экземпляр хранилища; вызываемый объект для storage= полей модели"""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
@@ -0,0 +1,46 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from clinics.geo import ClinicGeoMatrix
+from clinics.models import VetClinic, ClinicService, FavoriteClinic
+from pets.models import Pet, VetRecord
+
+User = get_user_model()
+
+
+class GenerateBenchmarkDataTest(TestCase):
+    def generate(self, **options):
+        options = {'clinics': 30, 'services': 10, 'users': 8, 'stdout': StringIO(), **options}
+        call_command('generate_benchmark_data', **options)
+
+    def test_generates_consistent_dataset(self):
+        """Test clinics get derived columns and related objects are created."""
+        ClinicGeoMatrix.reset_shared()
+        self.generate()
+        self.assertEqual(VetClinic.objects.count(), 30)
+        self.assertFalse(VetClinic.objects.filter(latitude__isnull=True).exists())
+        self.assertFalse(VetClinic.objects.filter(open_slots=[]).exists())
+        self.assertTrue(ClinicService.objects.exists())
+        self.assertEqual(User.objects.filter(username__startswith='bench_user_').count(), 8)
+        self.assertTrue(FavoriteClinic.objects.exists())
+        self.assertTrue(VetRecord.objects.exists())
+        self.assertEqual(
+            len(ClinicGeoMatrix.shared()),
+            VetClinic.objects.filter(is_active=True).count()
+        )
+
+    def test_same_seed_gives_same_data(self):
+        """Test generation is reproducible and --clear replaces previous data."""
+        self.generate()
+        first = list(VetClinic.objects.order_by('name').values_list('name', 'latitude', 'working_hours'))
+        pets = Pet.objects.count()
+
+        with self.assertRaises(CommandError):
+            self.generate()
+
+        self.generate(clear=True)
+        second = list(VetClinic.objects.order_by('name').values_list('name', 'latitude', 'working_hours'))
+        self.assertEqual(first, second)
+        self.assertEqual(Pet.objects.count(), pets)
@@ -0,0 +1,43 @@
+from io import BytesIO
+from PIL import Image
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, override_settings
+from core.utils.image import open_image, create_renditions
+
+def make_jpeg(size, orientation=None):
+    buffer = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new('RGB', size, color='blue').save(buffer, 'JPEG', exif=exif.tobytes())
+    buffer.seek(0)
+    return buffer
+
+class OpenImageTest(SimpleTestCase):
+    def test_jpeg_is_decoded_in_draft_mode(self):
+        """Test JPEG is downscaled while decoding but stays above the target size."""
+        img = open_image(make_jpeg((4000, 3000)), 800)
+        self.assertEqual(img.size, (2000, 1500))
+
+    def test_exif_orientation_is_applied(self):
+        """Test rotated photos come out upright."""
+        img = open_image(make_jpeg((4000, 3000), orientation=6), 200)
+        self.assertGreater(img.height, img.width)
+        renditions = create_renditions(make_jpeg((4000, 3000), orientation=6),
+                                       sizes=(64,), formats=('jpeg',))
+        with Image.open(BytesIO(renditions[64]['jpeg'])) as thumb:
+            self.assertEqual(thumb.size, (48, 64))
+
+    @override_settings(THUMBNAIL_MAX_PIXELS=1_000_000)
+    def test_pixel_budget(self):
+        """Test images above the pixel budget are reduced before resampling."""
+        buffer = BytesIO()
+        Image.new('RGB', (3000, 2000)).save(buffer, 'PNG')
+        img = open_image(buffer)
+        self.assertLessEqual(img.width * img.height, 1_000_000)
+
+    @override_settings(THUMBNAIL_MAX_SOURCE_PIXELS=1_000_000)
+    def test_source_pixel_cap(self):
+        """Test oversized sources are rejected before decoding."""
+        with self.assertRaises(ValidationError):
+            open_image(make_jpeg((2000, 1000)))
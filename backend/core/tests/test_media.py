@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from core.models import MediaBlob
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, Service
+from pets.models import Pet, VetRecord
+from pets.tasks import generate_pet_thumbnails
+from pets.tests.test_thumbnails import make_jpeg
+
+class ContentAddressedMediaTest(BaseAPITest):
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.clinic = VetClinic.objects.create(
+            name='Test Clinic',
+            description='Test Description',
+            address='Test Address',
+            phone='+74950000000',
+            email='clinic@example.com',
+            working_hours='Mo-Fr 9-18'
+        )
+        self.service = Service.objects.create(
+            name='Test Service',
+            description='Test Description',
+            category='Test'
+        )
+        self.pet = Pet.objects.create(owner=self.user, name='Test Pet', pet_type='dog')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def create_record(self, content):
+        record = VetRecord.objects.create(
+            pet=self.pet, clinic=self.clinic, service=self.service, date='2024-03-11T10:00:00Z'
+        )
+        record.document.save('vaccination.pdf', ContentFile(content))
+        return record
+
+    def stored_files(self):
+        return [
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.media_root) for name in names
+        ]
+
+    def test_duplicate_documents_are_stored_once(self):
+        """Test identical documents share one file and one reference-counted blob."""
+        first = self.create_record(b'%PDF-1.4 vaccination')
+        second = self.create_record(b'%PDF-1.4 vaccination')
+        self.assertEqual(first.document.name, second.document.name)
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(MediaBlob.objects.get(name=first.document.name).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(MediaBlob.objects.get(name=second.document.name).ref_count, 1)
+        self.assertTrue(second.document.storage.exists(second.document.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_file_saved_again_before_commit_is_kept(self):
+        """Test a blob re-referenced before the delete callback runs keeps its file."""
+        first = self.create_record(b'%PDF-1.4 vaccination')
+        name = first.document.name
+        with self.captureOnCommitCallbacks() as callbacks:
+            first.delete()
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 0)
+
+        second = self.create_record(b'%PDF-1.4 vaccination')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+        self.assertTrue(second.document.storage.exists(name))
+
+    def test_duplicate_photo_reuses_thumbnails(self):
+        """Test second upload of the same photo gets ready thumbnails without a job."""
+        self.authenticate()
+        jpeg = make_jpeg()
+        self.pet.photo.save('photo.jpg', ContentFile(jpeg))
+        generate_pet_thumbnails(self.pet.pk)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.thumbnail_status, Pet.THUMBNAIL_READY)
+        files_before = len(self.stored_files())
+
+        other = Pet.objects.create(owner=self.user, name='Other Pet', pet_type='cat')
+        photo = SimpleUploadedFile('other.jpg', jpeg, content_type='image/jpeg')
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                f'/api/pets/pets/{other.pk}/photos/', {'photo': photo}, format='multipart'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['thumbnail_status'], Pet.THUMBNAIL_READY)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(len(self.stored_files()), files_before)
+
+        other.refresh_from_db()
+        self.assertEqual(other.thumbnails, self.pet.thumbnails)
+        self.assertEqual(MediaBlob.objects.get(name=other.photo.name).ref_count, 2)
+        self.assertEqual(MediaBlob.objects.get(name=other.thumbnail.name).ref_count, 3)
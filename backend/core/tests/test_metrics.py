@@ -0,0 +1,100 @@
+import re
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from core.metrics import REGISTRY, Histogram
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic
+from pets.models import Pet, VetPassport
+
+METRICS_MIDDLEWARE = ['core.middleware.RequestMetricsMiddleware'] + settings.MIDDLEWARE
+
+
+class HistogramTest(SimpleTestCase):
+    def test_render_is_cumulative(self):
+        """Test buckets are cumulative and labels are escaped."""
+        histogram = Histogram('test_seconds', 'Test', ('view',), buckets=(0.1, 1))
+        histogram.observe(0.05, 'a"b')
+        histogram.observe(0.5, 'a"b')
+        histogram.observe(5, 'a"b')
+        text = histogram.render()
+        self.assertIn('test_seconds_bucket{view="a\\"b",le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{view="a\\"b",le="1.0"} 2', text)
+        self.assertIn('test_seconds_bucket{view="a\\"b",le="+Inf"} 3', text)
+        self.assertIn('test_seconds_count{view="a\\"b"} 3', text)
+
+
+@override_settings(MIDDLEWARE=METRICS_MIDDLEWARE, REQUEST_METRICS=True)
+class RequestMetricsMiddlewareTest(BaseAPITest):
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        REGISTRY.clear()
+        for i in range(3):
+            VetClinic.objects.create(
+                name=f'Clinic {i}',
+                description='Test Description',
+                address='Test Address',
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            )
+
+    def test_server_timing_header(self):
+        """Test response carries SQL, serializer and total timings."""
+        self.authenticate()
+        response = self.client.get('/api/clinics/')
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+        self.assertIsNotNone(match)
+        self.assertGreater(int(match[1]), 0)
+        match = re.search(r'serializer;dur=([\d.]+);desc="\d+ queries"', timing)
+        self.assertIsNotNone(match)
+        self.assertGreater(float(match[1]), 0)
+        self.assertRegex(timing, r'total;dur=[\d.]+')
+
+    def test_metrics_endpoint_aggregates_by_view(self):
+        """Test histograms are labelled by route name, not by path."""
+        clinic = VetClinic.objects.first()
+        self.client.get('/api/clinics/')
+        self.client.get(f'/api/clinics/{clinic.pk}/')
+        self.client.get(f'/api/clinics/{clinic.pk + 1000}/')
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('http_request_sql_queries_count{view="vetclinic-list",method="GET"} 1', text)
+        self.assertIn('http_request_sql_queries_count{view="vetclinic-detail",method="GET"} 2', text)
+        self.assertIn(
+            'http_request_duration_seconds_count{view="vetclinic-detail",method="GET",status="404"} 1',
+            text
+        )
+        self.assertIn('http_request_serializer_duration_seconds_sum', text)
+
+    def test_pet_list_serializer_runs_no_queries(self):
+        """Test owner name and passport do not trigger queries per pet."""
+        self.authenticate()
+        for i in range(3):
+            pet = Pet.objects.create(owner=self.user, name=f'Pet {i}', pet_type='dog')
+            VetPassport.objects.create(pet=pet, passport_number=f'P-{i}')
+        response = self.client.get('/api/pets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('serializer;dur=', response['Server-Timing'])
+        self.assertRegex(response['Server-Timing'], r'serializer;dur=[\d.]+;desc="0 queries"')
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'])
+    def test_metrics_endpoint_is_restricted(self):
+        """Test metrics are hidden from other addresses unless the user is staff."""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(REQUEST_METRICS=False)
+    def test_metrics_endpoint_disabled(self):
+        """Test endpoint is hidden when metrics are off."""
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
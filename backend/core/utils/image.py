@@ -1,4 +1,6 @@
-from PIL import Image
+import math
+from io import BytesIO
+from PIL import Image, ImageOps
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
@@ -18,17 +20,67 @@ def validate_file_type(file, allowed_types):
     if file.content_type not in allowed_types:
         raise ValidationError(_('Неподдерживаемый тип файла'))
 
-def create_thumbnail(image_path, size=settings.THUMBNAIL_SIZE):
-    """Создание миниатюры изображения"""
-    try:
-        with Image.open(image_path) as img:
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-            # Создаем путь для миниатюры
-            thumb_path = image_path.replace('.', '_thumb.')
-            img.save(thumb_path, quality=85)
-            return thumb_path
-    except Exception as e:
-        raise ValidationError(_(f'Ошибка при создании миниатюры: {str(e)}'))
+# Во сколько раз декодированное в режиме draft изображение должно быть
+# больше итоговой миниатюры, чтобы LANCZOS не терял в качестве
+DRAFT_OVERSAMPLING = 2
+
+def open_image(source, box=None):
+    """
+    Открытие изображения для уменьшения до box x box пикселей.
+
+    JPEG декодируется в режиме draft: масштабирование 1/2 - 1/8 выполняется
+    при декодировании, в DCT-области. Изображение больше THUMBNAIL_MAX_PIXELS
+    дополнительно уменьшается, ориентация по EXIF применяется один раз уже
+    к уменьшенному изображению. Возвращает загруженное изображение RGB.
+    """
+    with Image.open(source) as img:
+        if img.width * img.height > settings.THUMBNAIL_MAX_SOURCE_PIXELS:
+            raise ValidationError(_('Слишком большое разрешение изображения'))
+        if box and img.format == 'JPEG':
+            # draft выбирает масштаб, при котором обе стороны не меньше
+            # запрошенных, поэтому запрашиваем размер с пропорциями исходника
+            scale = box * DRAFT_OVERSAMPLING / max(img.size)
+            if scale < 1:
+                img.draft('RGB', (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+        img.load()
+
+        pixels = img.width * img.height
+        if pixels > settings.THUMBNAIL_MAX_PIXELS:
+            factor = math.ceil(math.sqrt(pixels / settings.THUMBNAIL_MAX_PIXELS))
+            reduced = img.reduce(factor)
+            reduced.info = img.info
+            img = reduced
+
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img
+
+RENDITION_FORMATS = {
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+def _encode(img, fmt):
+    pil_format, options = RENDITION_FORMATS[fmt]
+    buffer = BytesIO()
+    img.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+def create_renditions(source, sizes=settings.THUMBNAIL_RENDITIONS,
+                      formats=settings.THUMBNAIL_FORMATS):
+    """
+    Создание набора миниатюр за одно декодирование изображения.
+    Каждый размер получается из предыдущего, большего.
+    Возвращает словарь {размер: {формат: содержимое файла}}
+    """
+    renditions = {}
+    current = open_image(source, max(sizes))
+    for size in sorted(sizes, reverse=True):
+        current = current.copy()
+        current.thumbnail((size, size), Image.Resampling.LANCZOS)
+        renditions[size] = {fmt: _encode(current, fmt) for fmt in formats}
+    return renditions
 
 def get_file_path(instance, filename, folder):
     """Генерация пути для сохранения файла"""
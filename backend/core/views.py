@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from .metrics import REGISTRY
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics(request):
+    """
+    Гистограммы метрик запросов в текстовом формате Prometheus.
+    Доступны только при включённом REQUEST_METRICS, с адресов из
+    METRICS_ALLOWED_IPS или сотрудникам сервиса
+    """
+    if not settings.REQUEST_METRICS:
+        raise Http404
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS and not request.user.is_staff:
+        raise PermissionDenied
+    return HttpResponse(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PetsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pets'
+    verbose_name = 'Питомцы'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pets.uploads import clear_stale_uploads
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет незавершенные загрузки документов по частям, не получавшие данных '
+        f'дольше {settings.CHUNKED_UPLOAD_EXPIRY_HOURS} ч'
+    )
+
+    def handle(self, *args, **options):
+        count = clear_stale_uploads()
+        self.stdout.write(self.style.SUCCESS(f'Удалено загрузок: {count}'))
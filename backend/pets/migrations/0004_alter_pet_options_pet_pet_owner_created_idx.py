@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0003_pet_thumbnail_alter_pet_photo_vetrecord'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='pet',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Питомец', 'verbose_name_plural': 'Питомцы'},
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='pet_owner_created_idx'),
+        ),
+    ]
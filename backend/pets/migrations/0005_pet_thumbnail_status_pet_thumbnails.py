@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:51
+
+from django.db import migrations, models
+
+
+def mark_existing_thumbnails(apps, schema_editor):
+    Pet = apps.get_model('pets', 'Pet')
+    Pet.objects.exclude(thumbnail__isnull=True).exclude(thumbnail='').update(thumbnail_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0004_alter_pet_options_pet_pet_owner_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='thumbnail_status',
+            field=models.CharField(choices=[('none', 'Нет фото'), ('pending', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='none', max_length=10, verbose_name='Статус миниатюр'),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, help_text='Пути к миниатюрам: {размер: {формат: путь}}', verbose_name='Миниатюры'),
+        ),
+        migrations.RunPython(mark_existing_thumbnails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:54
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0005_pet_thumbnail_status_pet_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pet',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.content_addressed_storage, upload_to='pets/photos/', verbose_name='Фото питомца'),
+        ),
+        migrations.AlterField(
+            model_name='pet',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.content_addressed_storage, upload_to='pets/thumbnails/', verbose_name='Миниатюра'),
+        ),
+        migrations.AlterField(
+            model_name='vetrecord',
+            name='document',
+            field=models.FileField(blank=True, null=True, storage=core.storage.content_addressed_storage, upload_to='records/documents/', verbose_name='Документ'),
+        ),
+    ]
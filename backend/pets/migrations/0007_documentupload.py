@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:56
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0006_alter_pet_photo_alter_pet_thumbnail_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Тип файла')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер (байт)')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Принято байт')),
+                ('checksum', models.PositiveBigIntegerField(default=0, verbose_name='CRC32 принятых данных')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='pets.vetrecord', verbose_name='Запись')),
+            ],
+            options={
+                'verbose_name': 'Загрузка документа',
+                'verbose_name_plural': 'Загрузки документов',
+            },
+        ),
+    ]
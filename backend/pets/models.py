@@ -1,6 +1,13 @@
+import os
+import uuid
 from django.db import models
 from django.conf import settings
+from django_cleanup import cleanup
+from core.storage import content_addressed_storage
 
+# Файлы в хранилище по содержимому общие для нескольких записей,
+# их удаляет core.media по счетчику ссылок, а не django_cleanup
+@cleanup.ignore
 class Pet(models.Model):
     """
     Модель для хранения информации о питомцах
@@ -13,6 +20,17 @@ class Pet(models.Model):
         ('other', 'Другое'),
     ]
 
+    THUMBNAIL_NONE = 'none'
+    THUMBNAIL_PENDING = 'pending'
+    THUMBNAIL_READY = 'ready'
+    THUMBNAIL_FAILED = 'failed'
+    THUMBNAIL_STATUSES = [
+        (THUMBNAIL_NONE, 'Нет фото'),
+        (THUMBNAIL_PENDING, 'Обрабатывается'),
+        (THUMBNAIL_READY, 'Готово'),
+        (THUMBNAIL_FAILED, 'Ошибка обработки'),
+    ]
+
     GENDER_CHOICES = [
         ('male', 'Мужской'),
         ('female', 'Женский'),
@@ -60,16 +78,30 @@ class Pet(models.Model):
     )
     photo = models.ImageField(
         upload_to='pets/photos/',
+        storage=content_addressed_storage,
         null=True,
         blank=True,
         verbose_name='Фото питомца'
     )
     thumbnail = models.ImageField(
         upload_to='pets/thumbnails/',
+        storage=content_addressed_storage,
         null=True,
         blank=True,
         verbose_name='Миниатюра'
     )
+    thumbnail_status = models.CharField(
+        max_length=10,
+        choices=THUMBNAIL_STATUSES,
+        default=THUMBNAIL_NONE,
+        verbose_name='Статус миниатюр'
+    )
+    thumbnails = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Миниатюры',
+        help_text='Пути к миниатюрам: {размер: {формат: путь}}'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания'
@@ -82,7 +114,10 @@ class Pet(models.Model):
     class Meta:
         verbose_name = 'Питомец'
         verbose_name_plural = 'Питомцы'
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-id'], name='pet_owner_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} ({self.get_pet_type_display()})'
@@ -101,6 +136,7 @@ class VetPassport(models.Model):
     def __str__(self):
         return f"Паспорт {self.pet.name}"
 
+@cleanup.ignore
 class VetRecord(models.Model):
     pet = models.ForeignKey(
         Pet,
@@ -130,6 +166,7 @@ class VetRecord(models.Model):
     )
     document = models.FileField(
         upload_to='records/documents/',
+        storage=content_addressed_storage,
         null=True,
         blank=True,
         verbose_name='Документ'
@@ -149,4 +186,60 @@ class VetRecord(models.Model):
         ordering = ['-date']
 
     def __str__(self):
-        return f"Запись {self.pet.name} в {self.clinic.name} на {self.date}" 
\ No newline at end of file
+        return f"Запись {self.pet.name} в {self.clinic.name} на {self.date}" 
+
+
+class DocumentUpload(models.Model):
+    """
+    Незавершенная загрузка документа записи по частям
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    record = models.ForeignKey(
+        VetRecord,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+        verbose_name='Запись'
+    )
+    filename = models.CharField(
+        max_length=255,
+        verbose_name='Имя файла'
+    )
+    content_type = models.CharField(
+        max_length=100,
+        verbose_name='Тип файла'
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name='Размер (байт)'
+    )
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Принято байт'
+    )
+    checksum = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='CRC32 принятых данных'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления'
+    )
+
+    class Meta:
+        verbose_name = 'Загрузка документа'
+        verbose_name_plural = 'Загрузки документов'
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def path(self):
+        """Временный файл с принятыми данными"""
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{self.pk}.part')
@@ -0,0 +1,94 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+from core.jobs import run_in_background
+from core.media import replace_references
+from core.models import MediaBlob
+from core.utils.image import validate_image_size, validate_file_type, get_file_path
+from .models import Pet
+from .tasks import generate_pet_thumbnails, DEFAULT_RENDITION
+
+# Имя поля файла в запросе массовой загрузки: photo_<id питомца>
+BULK_PHOTO_FIELD_RE = re.compile(r'^photo_(\d+)$')
+
+PHOTO_UPDATE_FIELDS = ['photo', 'thumbnail', 'thumbnails', 'thumbnail_status', 'updated_at']
+
+
+def store_photo(pet, photo):
+    """
+    Проверяет фото и сохраняет его в хранилище. Выполняется в пуле потоков:
+    хэширование, запись на диск и разбор заголовка изображения не требуют БД.
+    """
+    validate_image_size(photo)
+    validate_file_type(photo, settings.ALLOWED_IMAGE_TYPES)
+    try:
+        with Image.open(photo) as img:
+            img.verify()
+    except Exception:
+        raise ValidationError('Файл не является изображением')
+    photo.seek(0)
+
+    storage = Pet._meta.get_field('photo').storage
+    return storage.save(get_file_path(pet, photo.name, 'pets/photos'), photo)
+
+
+def bulk_attach_photos(owner, photos):
+    """
+    Загружает фото сразу для многих питомцев владельца.
+    photos - словарь {id питомца: файл}. Возвращает список результатов
+    по каждому питомцу в порядке id.
+    """
+    pets = Pet.objects.filter(id__in=list(photos), owner=owner).in_bulk()
+    results = {
+        pet_id: {'pet_id': pet_id, 'status': 'error', 'error': 'Питомец не найден'}
+        for pet_id in photos if pet_id not in pets
+    }
+
+    with ThreadPoolExecutor(max_workers=settings.BULK_PHOTO_WORKERS) as executor:
+        futures = {
+            pet_id: executor.submit(store_photo, pet, photos[pet_id])
+            for pet_id, pet in pets.items()
+        }
+
+    stored = {}
+    for pet_id, future in futures.items():
+        try:
+            stored[pet_id] = future.result()
+        except ValidationError as e:
+            results[pet_id] = {'pet_id': pet_id, 'status': 'error', 'error': e.messages[0]}
+
+    renditions = dict(MediaBlob.objects.filter(
+        name__in=set(stored.values())
+    ).exclude(renditions={}).values_list('name', 'renditions'))
+
+    size, fmt = DEFAULT_RENDITION
+    now = timezone.now()
+    old_names, new_names, updated, pending = [], [], [], []
+    for pet_id, name in stored.items():
+        pet = pets[pet_id]
+        old_names += [pet.photo.name, pet.thumbnail.name]
+        pet.photo = name
+        pet.thumbnails = renditions.get(name, {})
+        if pet.thumbnails:
+            pet.thumbnail = pet.thumbnails[size][fmt]
+            pet.thumbnail_status = Pet.THUMBNAIL_READY
+        else:
+            pet.thumbnail = None
+            pet.thumbnail_status = Pet.THUMBNAIL_PENDING
+            pending.append(pet_id)
+        pet.updated_at = now
+        new_names += [pet.photo.name, pet.thumbnail.name]
+        updated.append(pet)
+        results[pet_id] = {'pet_id': pet_id, 'status': 'ok', 'thumbnail_status': pet.thumbnail_status}
+
+    with transaction.atomic():
+        Pet.objects.bulk_update(updated, PHOTO_UPDATE_FIELDS)
+        replace_references(old_names, new_names)
+        for pet_id in pending:
+            run_in_background(generate_pet_thumbnails, pet_id)
+
+    return [results[pet_id] for pet_id in sorted(results)]
@@ -1,5 +1,22 @@
+from urllib.parse import urlencode
 from rest_framework import serializers
-from .models import Pet, VetPassport, VetRecord
+from django.conf import settings
+from django.urls import reverse
+from core.sendfile import media_version
+from .models import Pet, VetPassport, VetRecord, DocumentUpload
+
+def media_url(request, view_name, args, name, **params):
+    """URL защищенного медиафайла с версией по содержимому"""
+    url = f"{reverse(view_name, args=args)}?{urlencode({**params, 'v': media_version(name)})}"
+    return request.build_absolute_uri(url) if request else url
+
+class PetPhotoField(serializers.ImageField):
+    """Фото питомца: при чтении - URL защищенного эндпоинта"""
+    def to_representation(self, value):
+        if not value:
+            return None
+        return media_url(self.context.get('request'), 'pet_media',
+                         [value.instance.pk, 'photo'], value.name)
 
 class VetPassportSerializer(serializers.ModelSerializer):
     class Meta:
@@ -10,6 +27,7 @@ class VetPassportSerializer(serializers.ModelSerializer):
 class PetSerializer(serializers.ModelSerializer):
     passport = VetPassportSerializer(read_only=True)
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
+    photo = PetPhotoField(required=False, allow_null=True)
 
     class Meta:
         model = Pet
@@ -32,21 +50,36 @@ class PetPhotoSerializer(serializers.ModelSerializer):
     """Сериализатор для фото питомца"""
     photo_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Pet
-        fields = ['id', 'photo_url', 'thumbnail_url']
+        fields = ['id', 'photo_url', 'thumbnail_url', 'thumbnail_status', 'thumbnails']
 
     def get_photo_url(self, obj):
         if obj.photo:
-            return self.context['request'].build_absolute_uri(obj.photo.url)
+            return media_url(self.context['request'], 'pet_media', [obj.pk, 'photo'], obj.photo.name)
         return None
 
     def get_thumbnail_url(self, obj):
         if obj.thumbnail:
-            return self.context['request'].build_absolute_uri(obj.thumbnail.url)
+            return media_url(self.context['request'], 'pet_media', [obj.pk, 'thumbnail'], obj.thumbnail.name)
         return None
 
+    def get_thumbnails(self, obj):
+        """
+        URL миниатюр по размерам и форматам. Формат передается параметром fmt:
+        параметр format занят в DRF под выбор рендерера
+        """
+        request = self.context['request']
+        return {
+            size: {
+                fmt: media_url(request, 'pet_media', [obj.pk, 'thumbnail'], name, size=size, fmt=fmt)
+                for fmt, name in formats.items()
+            }
+            for size, formats in obj.thumbnails.items()
+        }
+
 class DocumentSerializer(serializers.ModelSerializer):
     """Сериализатор для документов"""
     document_url = serializers.SerializerMethodField()
@@ -57,5 +90,30 @@ class DocumentSerializer(serializers.ModelSerializer):
 
     def get_document_url(self, obj):
         if obj.document:
-            return self.context['request'].build_absolute_uri(obj.document.url)
-        return None 
\ No newline at end of file
+            return media_url(self.context['request'], 'record_document_file',
+                             [obj.pet_id, obj.pk], obj.document.name)
+        return None
+
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    """Сериализатор загрузки документа по частям"""
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DocumentUpload
+        fields = ['id', 'filename', 'content_type', 'size', 'offset', 'chunk_size']
+        read_only_fields = ['id', 'offset']
+
+    def get_chunk_size(self, obj):
+        return settings.CHUNKED_UPLOAD_CHUNK_SIZE
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Размер файла должен быть положительным')
+        if value > settings.CHUNKED_DOCUMENT_MAX_SIZE:
+            raise serializers.ValidationError('Файл слишком большой')
+        return value
+
+    def validate_content_type(self, value):
+        if value not in settings.ALLOWED_DOCUMENT_TYPES:
+            raise serializers.ValidationError('Неподдерживаемый тип файла')
+        return value
@@ -0,0 +1,5 @@
+from core.media import track_references
+from .models import Pet, VetRecord
+
+track_references(Pet, ['photo', 'thumbnail'])
+track_references(VetRecord, ['document'])
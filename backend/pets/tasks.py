@@ -0,0 +1,89 @@
+import logging
+from celery import shared_task
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from core.media import acquire
+from core.models import MediaBlob
+from core.utils.image import create_renditions
+from .models import Pet
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+# Размер миниатюры, которая сохраняется в Pet.thumbnail
+DEFAULT_RENDITION = ('200', 'jpeg')
+
+
+def cached_renditions(photo_name):
+    """
+    Миниатюры, уже созданные для фото с тем же содержимым
+    """
+    blob = MediaBlob.objects.filter(name=photo_name).only('renditions').first()
+    return blob.renditions if blob is not None else {}
+
+
+def build_renditions(photo):
+    """
+    Создает миниатюры фото и закрепляет их за файлом фото,
+    чтобы повторные загрузки того же фото использовали их повторно
+    """
+    storage = Pet._meta.get_field('thumbnail').storage
+    with photo.open('rb') as source:
+        renditions = create_renditions(source)
+
+    thumbnails = {}
+    for size, formats in renditions.items():
+        for fmt, content in formats.items():
+            name = f'pets/thumbnails/{size}.{THUMBNAIL_EXTENSIONS[fmt]}'
+            thumbnails.setdefault(str(size), {})[fmt] = storage.save(name, ContentFile(content))
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=photo.name).first()
+        if blob is None:
+            return thumbnails
+        if not blob.renditions:
+            for formats in thumbnails.values():
+                for name in formats.values():
+                    acquire(name)
+            blob.renditions = thumbnails
+            blob.save(update_fields=['renditions'])
+        return blob.renditions
+
+
+def apply_renditions(pet_id, photo_name, renditions):
+    """
+    Сохраняет миниатюры в питомце, если его фото не заменили за время обработки
+    """
+    size, fmt = DEFAULT_RENDITION
+    with transaction.atomic():
+        pet = Pet.objects.select_for_update().filter(pk=pet_id, photo=photo_name).first()
+        if pet is None:
+            return None
+        pet.thumbnail = renditions[size][fmt]
+        pet.thumbnails = renditions
+        pet.thumbnail_status = Pet.THUMBNAIL_READY
+        pet.save(update_fields=['thumbnail', 'thumbnails', 'thumbnail_status', 'updated_at'])
+        return pet
+
+
+@shared_task
+def generate_pet_thumbnails(pet_id):
+    """
+    Создает миниатюры фото питомца всех размеров и форматов
+    """
+    pet = Pet.objects.filter(pk=pet_id).first()
+    if pet is None or not pet.photo:
+        return
+
+    photo_name = pet.photo.name
+    try:
+        renditions = cached_renditions(photo_name) or build_renditions(pet.photo)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для питомца %s', pet_id)
+        Pet.objects.filter(pk=pet_id, photo=photo_name).update(
+            thumbnail_status=Pet.THUMBNAIL_FAILED, updated_at=timezone.now()
+        )
+        return
+
+    apply_renditions(pet_id, photo_name, renditions)
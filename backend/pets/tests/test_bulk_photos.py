@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.jobs import wait_for_background_jobs
+from core.models import MediaBlob
+from pets.models import Pet
+from pets.tests.test_thumbnails import make_jpeg
+
+User = get_user_model()
+
+class BulkPhotoUploadTest(APITransactionTestCase):
+    url = '/api/pets/pets/photos/bulk/'
+
+    def setUp(self):
+        """Set up test data."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        self.other = User.objects.create_user(
+            username='other', email='other@example.com', password='testpass123'
+        )
+        self.pets = [
+            Pet.objects.create(owner=self.user, name=f'Pet {i}', pet_type='dog')
+            for i in range(3)
+        ]
+        self.foreign_pet = Pet.objects.create(owner=self.other, name='Foreign', pet_type='cat')
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def tearDown(self):
+        wait_for_background_jobs(timeout=30)
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def photo(self, size=(400, 300)):
+        return SimpleUploadedFile('photo.jpg', make_jpeg(size), content_type='image/jpeg')
+
+    def test_bulk_upload_reports_status_per_pet(self):
+        """Test photos are stored for owned pets and errors are reported per pet."""
+        data = {f'photo_{pet.pk}': self.photo((400 + i, 300)) for i, pet in enumerate(self.pets)}
+        data[f'photo_{self.foreign_pet.pk}'] = self.photo()
+        data[f'photo_{self.pets[0].pk}'] = SimpleUploadedFile(
+            'photo.jpg', b'not an image', content_type='image/jpeg'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='multipart')
+        self.assertEqual(response.status_code, 207)
+
+        statuses = {r['pet_id']: r['status'] for r in response.data['results']}
+        self.assertEqual(statuses, {
+            self.pets[0].pk: 'error',
+            self.pets[1].pk: 'ok',
+            self.pets[2].pk: 'ok',
+            self.foreign_pet.pk: 'error',
+        })
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "pets_pet"')]
+        self.assertEqual(len(updates), 1)
+
+        for pet in self.pets[1:]:
+            pet.refresh_from_db()
+            self.assertTrue(pet.photo.name.startswith('cas/'))
+            self.assertEqual(MediaBlob.objects.get(name=pet.photo.name).ref_count, 1)
+        self.assertFalse(Pet.objects.get(pk=self.pets[0].pk).photo)
+        self.assertFalse(Pet.objects.get(pk=self.foreign_pet.pk).photo)
+
+        wait_for_background_jobs(timeout=30)
+        self.pets[1].refresh_from_db()
+        self.assertEqual(self.pets[1].thumbnail_status, Pet.THUMBNAIL_READY)
+
+    def test_bulk_upload_replaces_previous_photo(self):
+        """Test references to the replaced photo are released."""
+        pet = self.pets[0]
+        self.client.post(self.url, {f'photo_{pet.pk}': self.photo((400, 300))}, format='multipart')
+        wait_for_background_jobs(timeout=30)
+        pet.refresh_from_db()
+        old_photo = pet.photo.name
+
+        response = self.client.post(
+            self.url, {f'photo_{pet.pk}': self.photo((500, 300))}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertFalse(MediaBlob.objects.filter(name=old_photo).exists())
+
+    def test_bulk_upload_validates_field_names(self):
+        """Test unknown fields and empty requests are rejected."""
+        response = self.client.post(self.url, {'photo': self.photo()}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(BULK_PHOTO_MAX_FILES=2)
+    def test_bulk_upload_limits_number_of_files(self):
+        """Test too many files in one request are rejected."""
+        data = {f'photo_{pet.pk}': self.photo() for pet in self.pets}
+        response = self.client.post(self.url, data, format='multipart')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import zlib
+from datetime import timedelta
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.models import MediaBlob
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, Service
+from pets.models import Pet, VetRecord, DocumentUpload
+from pets.uploads import clear_stale_uploads, write_chunk
+
+class ChunkedDocumentUploadTest(BaseAPITest):
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            CHUNKED_UPLOAD_DIR=f'{self.media_root}/uploads_tmp',
+        )
+        self.settings_override.enable()
+
+        clinic = VetClinic.objects.create(
+            name='Test Clinic',
+            description='Test Description',
+            address='Test Address',
+            phone='+74950000000',
+            email='clinic@example.com',
+            working_hours='Mo-Fr 9-18'
+        )
+        service = Service.objects.create(
+            name='Test Service',
+            description='Test Description',
+            category='Test'
+        )
+        pet = Pet.objects.create(owner=self.user, name='Test Pet', pet_type='dog')
+        self.record = VetRecord.objects.create(
+            pet=pet, clinic=clinic, service=service, date='2024-03-11T10:00:00Z'
+        )
+        self.url = f'/api/pets/pets/{pet.pk}/records/{self.record.pk}/documents/uploads/'
+        self.content = b'%PDF-1.4 ' + bytes(range(256)) * 40
+        self.authenticate()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def init_upload(self):
+        response = self.client.post(self.url, {
+            'filename': 'scan.pdf',
+            'content_type': 'application/pdf',
+            'size': len(self.content),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return f'{self.url}{response.data["id"]}/'
+
+    def put_chunk(self, url, offset, chunk, **headers):
+        return self.client.generic(
+            'PUT', url, chunk, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset), **headers
+        )
+
+    def test_resumable_upload(self):
+        """Test chunks are appended, a lost chunk is resumed and the file is assembled."""
+        url = self.init_upload()
+        first, second = self.content[:4000], self.content[4000:]
+
+        response = self.put_chunk(url, 0, first, HTTP_X_CHUNK_CRC32=f'{zlib.crc32(first):08x}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Upload-Offset'], '4000')
+
+        # Повтор с неверного смещения - клиент узнает, откуда продолжать
+        response = self.put_chunk(url, 0, first)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 4000)
+        self.assertEqual(self.client.get(url).data['offset'], 4000)
+
+        response = self.put_chunk(url, 4000, second)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(f'{url}complete/', {
+            'crc32': f'{zlib.crc32(self.content):08x}'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNotNone(response.data['document_url'])
+
+        self.record.refresh_from_db()
+        with self.record.document.open('rb') as document:
+            self.assertEqual(document.read(), self.content)
+        self.assertEqual(MediaBlob.objects.get(name=self.record.document.name).ref_count, 1)
+        self.assertFalse(DocumentUpload.objects.exists())
+        self.assertEqual(os.listdir(f'{self.media_root}/uploads_tmp'), [])
+
+    def test_corrupted_chunk_is_rejected(self):
+        """Test chunk with wrong checksum is discarded and offset stays."""
+        url = self.init_upload()
+        response = self.put_chunk(url, 0, self.content[:100], HTTP_X_CHUNK_CRC32='00000000')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(url).data['offset'], 0)
+
+    def test_chunk_is_received_before_row_lock(self):
+        """Test the request body is read before the upload row is locked."""
+        url = self.init_upload()
+        upload = DocumentUpload.objects.get()
+        chunk = self.content[:100]
+        locked_while_reading = []
+
+        class Stream:
+            def __init__(self):
+                self.data = chunk
+
+            def read(self, size):
+                locked_while_reading.append(
+                    any('FOR UPDATE' in q['sql'] for q in queries.captured_queries)
+                )
+                block, self.data = self.data[:size], self.data[size:]
+                return block
+
+        with CaptureQueriesContext(connection) as queries:
+            write_chunk(upload.pk, 0, Stream(), len(chunk))
+        self.assertEqual(set(locked_while_reading), {False})
+        self.assertTrue(any('FOR UPDATE' in q['sql'] for q in queries.captured_queries))
+        self.assertEqual(self.client.get(url).data['offset'], 100)
+        self.assertEqual(sorted(os.listdir(f'{self.media_root}/uploads_tmp')), [f'{upload.pk}.part'])
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        """Test complete requires the whole declared size and matching checksum."""
+        url = self.init_upload()
+        self.put_chunk(url, 0, self.content[:100])
+        response = self.client.post(f'{url}complete/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        self.put_chunk(url, 100, self.content[100:])
+        response = self.client.post(f'{url}complete/', {'crc32': '00000000'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_init_validates_size_and_type(self):
+        """Test declared size and content type are validated."""
+        with override_settings(CHUNKED_DOCUMENT_MAX_SIZE=10):
+            response = self.client.post(self.url, {
+                'filename': 'scan.pdf', 'content_type': 'application/pdf', 'size': 11,
+            }, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {
+            'filename': 'scan.exe', 'content_type': 'application/x-msdownload', 'size': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_stale_uploads_are_cleared(self):
+        """Test expired uploads are removed with their temporary files."""
+        self.init_upload()
+        DocumentUpload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(clear_stale_uploads(), 1)
+        self.assertFalse(DocumentUpload.objects.exists())
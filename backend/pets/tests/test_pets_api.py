@@ -3,7 +3,7 @@ from PIL import Image
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from core.tests.test_base import BaseAPITest
-from pets.models import Pet, VetRecord
+from pets.models import Pet, VetRecord, VetPassport
 
 class PetAPITest(BaseAPITest):
     def setUp(self):
@@ -79,4 +79,48 @@ class PetAPITest(BaseAPITest):
         self.assertTrue(VetRecord.objects.filter(
             pet=self.pet,
             title=record_data['title']
-        ).exists()) 
\ No newline at end of file
+        ).exists()) 
+
+class PetPaginationTest(BaseAPITest):
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        for i in range(12):
+            Pet.objects.create(owner=self.user, name=f'Pet {i:02d}', pet_type='dog')
+
+    def test_list_pets_cursor_pagination(self):
+        """Test pets are paged newest first by cursor without count."""
+        self.authenticate()
+        url, params, names = reverse('pet-list'), {'pagination': 'cursor'}, []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            names.extend(p['name'] for p in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(names, [f'Pet {i:02d}' for i in reversed(range(12))])
+
+    def test_pet_detail_conditional_get(self):
+        """Test pet detail honours ETag and changes when passport is added."""
+        self.authenticate()
+        pet = Pet.objects.get(name='Pet 00')
+        url = reverse('pet-detail', args=[pet.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        VetPassport.objects.create(pet=pet, passport_number='RU-0001')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['passport']['passport_number'], 'RU-0001')
+
+    def test_pet_etag_follows_owner_name(self):
+        """Test renaming the owner changes the pet ETag, as owner_name is serialized."""
+        self.authenticate()
+        url = reverse('pet-list')
+        etag = self.client.get(url)['ETag']
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['results'][0]['owner_name'].startswith('Renamed'))
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from core.tests.test_base import BaseAPITest
+from clinics.models import VetClinic, Service
+from pets.models import Pet, VetRecord
+
+User = get_user_model()
+
+class ProtectedMediaTest(BaseAPITest):
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_ACCEL_REDIRECT='')
+        self.settings_override.enable()
+
+        self.content = bytes(range(256)) * 8
+        self.pet = Pet.objects.create(owner=self.user, name='Test Pet', pet_type='dog')
+        self.pet.photo.save('photo.jpg', ContentFile(self.content))
+        self.url = f'/api/pets/pets/{self.pet.pk}/media/photo/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_owner_gets_file(self):
+        """Test owner downloads the photo through Django."""
+        self.authenticate()
+        response = self.client.get(self.url, HTTP_ACCEPT='image/jpeg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_other_users_cannot_read_media(self):
+        """Test media is checked against pet ownership."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        self.client.force_authenticate(other)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json; charset=utf-8')
+        self.assertEqual(response.json(), {'error': 'Файл не найден'})
+
+    def test_range_requests(self):
+        """Test single byte ranges, suffix ranges and unsatisfiable ranges."""
+        self.authenticate()
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(response.getvalue(), self.content[10:20])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.getvalue(), self.content[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_missing_file_is_not_found(self):
+        """Test a file missing on disk gives 404 instead of a server error."""
+        self.authenticate()
+        os.remove(self.pet.photo.path)
+        for headers in ({}, {'HTTP_RANGE': 'bytes=0-9'}):
+            response = self.client.get(self.url, **headers)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {'error': 'Файл не найден'})
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/')
+    def test_accel_redirect(self):
+        """Test transfer is handed to nginx when configured."""
+        self.authenticate()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.pet.photo.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_document_and_serialized_urls(self):
+        """Test documents are protected and serializers link to the endpoints."""
+        self.authenticate()
+        record = VetRecord.objects.create(
+            pet=self.pet,
+            clinic=VetClinic.objects.create(
+                name='Test Clinic',
+                description='Test Description',
+                address='Test Address',
+                phone='+74950000000',
+                email='clinic@example.com',
+                working_hours='Mo-Fr 9-18'
+            ),
+            service=Service.objects.create(name='Test Service', description='Test', category='Test'),
+            date='2024-03-11T10:00:00Z'
+        )
+        record.document.save('scan.pdf', ContentFile(b'%PDF-1.4'))
+        response = self.client.get(f'/api/pets/pets/{self.pet.pk}/records/{record.pk}/documents/file/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+        response = self.client.get(f'/api/pets/{self.pet.pk}/')
+        self.assertTrue(response.data['photo'].startswith(f'http://testserver{self.url}?v='))
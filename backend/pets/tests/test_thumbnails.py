@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+from io import BytesIO
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.jobs import wait_for_background_jobs
+from core.utils.image import create_renditions
+from pets.models import Pet
+
+User = get_user_model()
+
+def make_jpeg(size=(1200, 900)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color='red').save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+class RenditionsTest(SimpleTestCase):
+    def test_renditions_from_single_decode(self):
+        """Test every size is produced in every format."""
+        renditions = create_renditions(BytesIO(make_jpeg()), sizes=(64, 200, 800),
+                                       formats=('webp', 'jpeg'))
+        self.assertEqual(sorted(renditions), [64, 200, 800])
+        for size, formats in renditions.items():
+            self.assertEqual(sorted(formats), ['jpeg', 'webp'])
+            with Image.open(BytesIO(formats['webp'])) as img:
+                self.assertEqual(img.format, 'WEBP')
+                self.assertEqual(max(img.size), size)
+
+
+class PetThumbnailPipelineTest(APITransactionTestCase):
+    def setUp(self):
+        """Set up test data."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        )
+        self.pet = Pet.objects.create(owner=self.user, name='Test Pet', pet_type='dog')
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.url = f'/api/pets/pets/{self.pet.pk}/photos/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_returns_pending_and_builds_thumbnails(self):
+        """Test upload does not wait for thumbnails and polling shows them when ready."""
+        photo = SimpleUploadedFile('photo.jpg', make_jpeg(), content_type='image/jpeg')
+        response = self.client.post(self.url, {'photo': photo}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['thumbnail_status'], Pet.THUMBNAIL_PENDING)
+
+        wait_for_background_jobs(timeout=30)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['thumbnail_status'], Pet.THUMBNAIL_READY)
+        self.assertEqual(sorted(response.data['thumbnails'], key=int), ['64', '200', '800'])
+        self.assertIn('/media/thumbnail/?v=', response.data['thumbnail_url'])
+
+        # Каждая ссылка на вариант миниатюры отдает файл
+        for size, formats in response.data['thumbnails'].items():
+            self.assertEqual(sorted(formats), ['jpeg', 'webp'])
+            for fmt, url in formats.items():
+                media = self.client.get(url)
+                self.assertEqual(media.status_code, 200, url)
+                with Image.open(BytesIO(b''.join(media.streaming_content))) as img:
+                    self.assertEqual(img.format, fmt.upper())
+                    self.assertEqual(max(img.size), int(size))
+
+    def test_broken_photo_marks_thumbnails_failed(self):
+        """Test undecodable photo ends in failed state."""
+        photo = SimpleUploadedFile('photo.jpg', b'not an image', content_type='image/jpeg')
+        self.client.post(self.url, {'photo': photo}, format='multipart')
+        wait_for_background_jobs(timeout=30)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.thumbnail_status, Pet.THUMBNAIL_FAILED)
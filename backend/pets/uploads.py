@@ -0,0 +1,157 @@
+import os
+import tempfile
+import zlib
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from .models import DocumentUpload
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    """Часть прислана не с того смещения; клиент должен продолжить с offset"""
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.offset = offset
+
+
+class AssembledFile(File):
+    """Собранный на диске файл: хранилище перемещает его, а не копирует"""
+    def temporary_file_path(self):
+        return self.name
+
+
+def parse_crc32(value):
+    """Разбирает CRC32 в шестнадцатеричной записи"""
+    try:
+        checksum = int(value, 16)
+    except (TypeError, ValueError):
+        raise ValidationError('Некорректная контрольная сумма')
+    if not 0 <= checksum <= 0xFFFFFFFF:
+        raise ValidationError('Некорректная контрольная сумма')
+    return checksum
+
+
+def start_upload(record, filename, content_type, size):
+    """
+    Создает загрузку документа и пустой временный файл
+    """
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    upload = DocumentUpload.objects.create(
+        record=record, filename=filename, content_type=content_type, size=size
+    )
+    open(upload.path, 'wb').close()
+    return upload
+
+
+def write_chunk(upload_id, offset, stream, length, chunk_checksum=None):
+    """
+    Дописывает часть из потока запроса в файл, не держа её в памяти.
+
+    Часть сначала принимается во временный файл без транзакции и блокировок:
+    медленный клиент не держит строку загрузки и соединение с базой. Затем
+    под короткой блокировкой строки проверяется смещение, часть
+    переносится в файл загрузки и смещение сдвигается. CRC32 части
+    и всего файла считается на лету; при несовпадении контрольной суммы
+    часть отбрасывается.
+    """
+    if length <= 0:
+        raise ValidationError('Пустая часть')
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        raise ValidationError('Слишком большая часть')
+
+    # Предварительная проверка без блокировки: не принимаем заведомо
+    # лишнюю часть
+    upload = DocumentUpload.objects.get(pk=upload_id)
+    if offset != upload.offset:
+        raise UploadOffsetMismatch(upload.offset)
+    if offset + length > upload.size:
+        raise ValidationError('Часть выходит за объявленный размер файла')
+
+    with tempfile.NamedTemporaryFile(dir=settings.CHUNKED_UPLOAD_DIR, prefix=f'{upload.pk}-',
+                                     suffix='.chunk') as chunk:
+        chunk_crc = 0
+        received = 0
+        while received < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - received))
+            if not block:
+                break
+            chunk.write(block)
+            chunk_crc = zlib.crc32(block, chunk_crc)
+            received += len(block)
+        if received != length:
+            raise ValidationError('Часть получена не полностью')
+        if chunk_checksum is not None and chunk_checksum != chunk_crc:
+            raise ValidationError('Контрольная сумма части не совпадает')
+        chunk.flush()
+
+        with transaction.atomic():
+            # Блокировка не дает параллельно дописать части одной загрузки;
+            # под ней выполняется только копирование с локального диска
+            upload = DocumentUpload.objects.select_for_update().get(pk=upload_id)
+            if offset != upload.offset:
+                raise UploadOffsetMismatch(upload.offset)
+
+            file_crc = upload.checksum
+            chunk.seek(0)
+            with open(upload.path, 'r+b') as target:
+                target.seek(offset)
+                while block := chunk.read(READ_BLOCK_SIZE):
+                    target.write(block)
+                    file_crc = zlib.crc32(block, file_crc)
+
+            upload.offset += received
+            upload.checksum = file_crc
+            upload.save(update_fields=['offset', 'checksum', 'updated_at'])
+    return upload
+
+
+def complete_upload(upload_id, checksum=None):
+    """
+    Завершает загрузку: проверяет размер и CRC32 всего файла и сохраняет
+    его в документ записи перемещением, без повторного чтения в память
+    """
+    with transaction.atomic():
+        upload = DocumentUpload.objects.select_for_update().select_related('record').get(pk=upload_id)
+        if upload.offset != upload.size:
+            raise ValidationError('Файл загружен не полностью')
+        if checksum is not None and checksum != upload.checksum:
+            raise ValidationError('Контрольная сумма файла не совпадает')
+
+        record = upload.record
+        with AssembledFile(open(upload.path, 'rb'), name=upload.path) as assembled:
+            record.document.save(upload.filename, assembled)
+        upload.delete()
+    return record
+
+
+def abort_upload(upload):
+    """Отменяет загрузку и удаляет временный файл"""
+    upload.delete()
+    _remove(upload.path)
+
+
+def clear_stale_uploads(now=None):
+    """
+    Удаляет загрузки, не получавшие данных дольше CHUNKED_UPLOAD_EXPIRY_HOURS
+    """
+    now = now or timezone.now()
+    expired = DocumentUpload.objects.filter(
+        updated_at__lt=now - timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+    )
+    count = 0
+    for upload in expired:
+        abort_upload(upload)
+        count += 1
+    return count
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -5,7 +5,13 @@ urlpatterns = [
     # URL patterns будут добавлены позже
     
     # Media endpoints
+    path('pets/photos/bulk/', views_media.bulk_upload_pet_photos, name='bulk_upload_pet_photos'),
     path('pets/<int:pet_id>/photos/', views_media.upload_pet_photo, name='upload_pet_photo'),
+    path('pets/<int:pet_id>/media/<str:kind>/', views_media.pet_media, name='pet_media'),
     path('pets/<int:pet_id>/photos/delete/', views_media.delete_pet_photo, name='delete_pet_photo'),
     path('pets/<int:pet_id>/records/<int:record_id>/documents/', views_media.upload_record_document, name='upload_record_document'),
+    path('pets/<int:pet_id>/records/<int:record_id>/documents/file/', views_media.record_document_file, name='record_document_file'),
+    path('pets/<int:pet_id>/records/<int:record_id>/documents/uploads/', views_media.init_document_upload, name='init_document_upload'),
+    path('pets/<int:pet_id>/records/<int:record_id>/documents/uploads/<uuid:upload_id>/', views_media.document_upload_chunk, name='document_upload_chunk'),
+    path('pets/<int:pet_id>/records/<int:record_id>/documents/uploads/<uuid:upload_id>/complete/', views_media.complete_document_upload, name='complete_document_upload'),
 ] 
\ No newline at end of file
@@ -11,6 +11,9 @@ from drf_spectacular.utils import (
     OpenApiExample,
 )
 from drf_spectacular.types import OpenApiTypes
+from core.conditional import ConditionalGetMixin
+from core.metrics import SerializerMetricsMixin
+from core.pagination import CursorOrPageNumberPagination
 
 @extend_schema_view(
     list=extend_schema(
@@ -44,12 +47,18 @@ from drf_spectacular.types import OpenApiTypes
         tags=["pets"],
     ),
 )
-class PetViewSet(viewsets.ModelViewSet):
+class PetViewSet(SerializerMetricsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = PetSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-created_at', '-id')
+    conditional_related = ('passport',)
+    # owner_name берется из профиля владельца
+    conditional_timestamps = ('updated_at', 'owner__updated_at')
 
     def get_queryset(self):
-        return Pet.objects.filter(owner=self.request.user)
+        # owner_name и вложенный паспорт сериализуются без запроса на каждого питомца
+        return Pet.objects.filter(owner=self.request.user).select_related('owner', 'passport')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -91,7 +100,7 @@ class PetViewSet(viewsets.ModelViewSet):
         tags=["passports"],
     ),
 )
-class VetPassportViewSet(viewsets.ModelViewSet):
+class VetPassportViewSet(SerializerMetricsMixin, viewsets.ModelViewSet):
     serializer_class = VetPassportSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -1,25 +1,44 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
 from django.conf import settings
-from .models import Pet, VetRecord
-from .serializers import PetPhotoSerializer, DocumentSerializer
+from django.http import Http404
+from .models import Pet, VetRecord, DocumentUpload
+from .serializers import PetPhotoSerializer, DocumentSerializer, DocumentUploadSerializer
+from .uploads import (
+    UploadOffsetMismatch,
+    parse_crc32,
+    start_upload,
+    write_chunk,
+    complete_upload,
+    abort_upload,
+)
 from core.utils.image import (
     validate_image_size,
     validate_document_size,
     validate_file_type,
-    create_thumbnail,
     get_file_path
 )
+from core.jobs import run_in_background
+from core.sendfile import MediaRenderer, send_file
+from .tasks import generate_pet_thumbnails, cached_renditions, apply_renditions
+from .photos import BULK_PHOTO_FIELD_RE, bulk_attach_photos
 
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def upload_pet_photo(request, pet_id):
-    """Загрузка фото питомца"""
+    """
+    Загрузка фото питомца. Миниатюры создаются в фоне: ответ содержит
+    thumbnail_status=pending, готовность можно проверять GET-запросом
+    """
     try:
         pet = Pet.objects.get(id=pet_id, owner=request.user)
+        if request.method == 'GET':
+            serializer = PetPhotoSerializer(pet, context={'request': request})
+            return Response(serializer.data)
+
         photo = request.FILES.get('photo')
         
         if not photo:
@@ -32,16 +51,21 @@ def upload_pet_photo(request, pet_id):
         validate_image_size(photo)
         validate_file_type(photo, settings.ALLOWED_IMAGE_TYPES)
 
-        # Сохранение фото
+        # Сохранение фото; миниатюры будут созданы фоновой задачей,
+        # если для такого же фото их ещё нет
         photo_path = get_file_path(pet, photo.name, 'pets/photos')
+        pet.thumbnail = None
+        pet.thumbnails = {}
+        pet.thumbnail_status = Pet.THUMBNAIL_PENDING
         pet.photo.save(photo_path, photo)
 
-        # Создание миниатюры
-        thumbnail_path = create_thumbnail(pet.photo.path)
-        pet.thumbnail = thumbnail_path
-        pet.save()
+        renditions = cached_renditions(pet.photo.name)
+        if renditions:
+            pet = apply_renditions(pet.pk, pet.photo.name, renditions)
+        else:
+            run_in_background(generate_pet_thumbnails, pet.pk)
 
-        serializer = PetPhotoSerializer(pet)
+        serializer = PetPhotoSerializer(pet, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     except Pet.DoesNotExist:
@@ -55,6 +79,41 @@ def upload_pet_photo(request, pet_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_upload_pet_photos(request):
+    """
+    Массовая загрузка фото: один multipart-запрос с полями photo_<id питомца>.
+    Ответ содержит результат по каждому питомцу
+    """
+    photos = {}
+    for field, photo in request.FILES.items():
+        match = BULK_PHOTO_FIELD_RE.match(field)
+        if match is None:
+            return Response(
+                {'error': f'Неизвестное поле {field}, ожидается photo_<id питомца>'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        photos[int(match[1])] = photo
+
+    if not photos:
+        return Response(
+            {'error': 'Фото не предоставлены'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(photos) > settings.BULK_PHOTO_MAX_FILES:
+        return Response(
+            {'error': f'Не более {settings.BULK_PHOTO_MAX_FILES} фото за один запрос'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = bulk_attach_photos(request.user, photos)
+    ok = any(result['status'] == 'ok' for result in results)
+    return Response(
+        {'results': results},
+        status=status.HTTP_207_MULTI_STATUS if ok else status.HTTP_400_BAD_REQUEST
+    )
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def upload_record_document(request, pet_id, record_id):
@@ -77,7 +136,7 @@ def upload_record_document(request, pet_id, record_id):
         document_path = get_file_path(record, document.name, 'records/documents')
         record.document.save(document_path, document)
 
-        serializer = DocumentSerializer(record)
+        serializer = DocumentSerializer(record, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     except VetRecord.DoesNotExist:
@@ -99,9 +158,11 @@ def delete_pet_photo(request, pet_id):
         pet = Pet.objects.get(id=pet_id, owner=request.user)
         
         if pet.photo:
-            pet.photo.delete()
-            if pet.thumbnail:
-                pet.thumbnail.delete()
+            # Файлы удаляются по счетчику ссылок, когда ими никто не пользуется
+            pet.photo = None
+            pet.thumbnail = None
+            pet.thumbnails = {}
+            pet.thumbnail_status = Pet.THUMBNAIL_NONE
             pet.save()
             
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -110,4 +171,165 @@ def delete_pet_photo(request, pet_id):
         return Response(
             {'error': 'Питомец не найден'},
             status=status.HTTP_404_NOT_FOUND
-        ) 
\ No newline at end of file
+        ) 
+
+def _upload_response(upload, status_code=status.HTTP_200_OK):
+    serializer = DocumentUploadSerializer(upload)
+    return Response(serializer.data, status=status_code, headers={'Upload-Offset': str(upload.offset)})
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def init_document_upload(request, pet_id, record_id):
+    """
+    Начало загрузки документа по частям: принимает filename, content_type
+    и size, возвращает id загрузки и рекомендуемый размер части
+    """
+    try:
+        record = VetRecord.objects.get(id=record_id, pet_id=pet_id, pet__owner=request.user)
+    except VetRecord.DoesNotExist:
+        return Response(
+            {'error': 'Запись не найдена'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    serializer = DocumentUploadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    upload = start_upload(record, **serializer.validated_data)
+    return _upload_response(upload, status.HTTP_201_CREATED)
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def document_upload_chunk(request, pet_id, record_id, upload_id):
+    """
+    Загрузка части документа.
+    GET - текущее смещение для возобновления загрузки,
+    PUT - часть в теле запроса с заголовком Upload-Offset и, по желанию,
+    X-Chunk-CRC32; DELETE - отмена загрузки
+    """
+    try:
+        upload = DocumentUpload.objects.get(
+            id=upload_id,
+            record_id=record_id,
+            record__pet_id=pet_id,
+            record__pet__owner=request.user
+        )
+    except DocumentUpload.DoesNotExist:
+        return Response(
+            {'error': 'Загрузка не найдена'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    if request.method == 'GET':
+        return _upload_response(upload)
+    if request.method == 'DELETE':
+        abort_upload(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        length = int(request.headers.get('Content-Length', ''))
+        checksum = request.headers.get('X-Chunk-CRC32')
+        checksum = parse_crc32(checksum) if checksum is not None else None
+        upload = write_chunk(upload.pk, offset, request.stream, length, checksum)
+    except ValueError:
+        return Response(
+            {'error': 'Заголовки Upload-Offset и Content-Length обязательны'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except UploadOffsetMismatch as e:
+        return Response(
+            {'error': 'Неверное смещение части', 'offset': e.offset},
+            status=status.HTTP_409_CONFLICT,
+            headers={'Upload-Offset': str(e.offset)}
+        )
+    except ValidationError as e:
+        return Response(
+            {'error': e.messages[0]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return _upload_response(upload)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def complete_document_upload(request, pet_id, record_id, upload_id):
+    """
+    Завершение загрузки по частям: проверка размера и CRC32 всего файла
+    (поле crc32, необязательно) и сохранение документа записи
+    """
+    if not DocumentUpload.objects.filter(
+        id=upload_id,
+        record_id=record_id,
+        record__pet_id=pet_id,
+        record__pet__owner=request.user
+    ).exists():
+        return Response(
+            {'error': 'Загрузка не найдена'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        checksum = request.data.get('crc32')
+        checksum = parse_crc32(checksum) if checksum is not None else None
+        record = complete_upload(upload_id, checksum)
+    except ValidationError as e:
+        return Response(
+            {'error': e.messages[0]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = DocumentSerializer(record, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+def _media_not_found():
+    return Response(
+        {'error': 'Файл не найден'},
+        status=status.HTTP_404_NOT_FOUND
+    )
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([MediaRenderer])
+def pet_media(request, pet_id, kind):
+    """
+    Фото или миниатюра питомца владельцу. Для миниатюр параметры
+    size и fmt выбирают один из вариантов (см. thumbnails)
+    """
+    # Права и путь к файлу - одним запросом по первичному ключу
+    row = Pet.objects.filter(id=pet_id, owner_id=request.user.pk).values_list(
+        'photo', 'thumbnail', 'thumbnails'
+    ).first()
+    if row is None:
+        return _media_not_found()
+
+    photo, thumbnail, thumbnails = row
+    if kind == 'photo':
+        name = photo
+    elif kind == 'thumbnail':
+        size = request.query_params.get('size')
+        fmt = request.query_params.get('fmt')
+        name = thumbnails.get(size, {}).get(fmt) if size or fmt else thumbnail
+    else:
+        name = None
+    if not name:
+        return _media_not_found()
+    try:
+        return send_file(request, Pet._meta.get_field('photo').storage, name)
+    except Http404:
+        # Запись есть, а файл пропал с диска
+        return _media_not_found()
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([MediaRenderer])
+def record_document_file(request, pet_id, record_id):
+    """Документ записи владельцу питомца"""
+    name = VetRecord.objects.filter(
+        id=record_id, pet_id=pet_id, pet__owner_id=request.user.pk
+    ).values_list('document', flat=True).first()
+    if not name:
+        return _media_not_found()
+    try:
+        return send_file(request, VetRecord._meta.get_field('document').storage, name)
+    except Http404:
+        # Запись есть, а файл пропал с диска
+        return _media_not_found()
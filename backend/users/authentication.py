@@ -0,0 +1,42 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .models import CustomUser
+from .tokens import USER_CLAIMS
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к базе: request.user
+    собирается из утверждений подписанного токена (CustomUser.from_claims).
+
+    Проверка is_active выполняется при выпуске access-токена, а не на
+    каждом запросе: заблокированный пользователь теряет доступ по истечении
+    ACCESS_TOKEN_LIFETIME.
+
+    Существование пользователя проверяется при первом обращении к полям
+    вне токена и перед изменяющими запросами (через общий кэш
+    строк пользователей): удаленный пользователь получает 401, а не ошибку
+    внешнего ключа при записи.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None and request.method not in SAFE_METHODS:
+            result[0].load_row()
+        return result
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        values = {api_settings.USER_ID_FIELD: user_id}
+        # Токены, выпущенные до появления утверждений, догружают роли из базы
+        values.update(
+            (claim, validated_token[claim]) for claim in USER_CLAIMS if claim in validated_token
+        )
+        return CustomUser.from_claims(**values)
@@ -1,5 +1,31 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import cache
+from django.db import models, DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+from rest_framework.exceptions import AuthenticationFailed
+
+# Поля строки пользователя, которые пользователь из токена берет из общего
+# кэша. Пароль и другие секреты в кэш не попадают и при обращении
+# загружаются из базы
+USER_ROW_CACHE_FIELDS = (
+    'username', 'first_name', 'last_name', 'email', 'phone', 'address',
+    'is_active', 'is_staff', 'is_superuser', 'is_vet', 'is_clinic_admin',
+    'last_login', 'date_joined', 'created_at', 'updated_at',
+)
+
+
+def user_row_cache_key(pk):
+    return f'token_user:{pk}'
+
+
+def forget_user_row(pk):
+    """
+    Удаляет строку пользователя из общего кэша: запись одна на пользователя,
+    поэтому изменение видно всем процессам сразу
+    """
+    cache.delete(user_row_cache_key(pk))
+
 
 class CustomUser(AbstractUser):
     """
@@ -33,4 +59,49 @@ class CustomUser(AbstractUser):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f'{self.username} ({self.email})' 
\ No newline at end of file
+        return f'{self.username} ({self.email})'
+
+    @classmethod
+    def from_claims(cls, **values):
+        """
+        Пользователь, собранный из утверждений JWT без запроса к базе.
+
+        Поля, которых нет в токене, отложены: первое обращение к полю из
+        USER_ROW_CACHE_FIELDS загружает их все из общего кэша строк (или
+        из базы), остальные поля загружаются из базы как обычно. Это обычный
+        экземпляр CustomUser для ORM: его можно передавать в фильтры
+        и внешние ключи, сравнение - по pk.
+        """
+        fields = cls._meta.concrete_fields
+        user = cls.from_db(
+            DEFAULT_DB_ALIAS,
+            [field.attname for field in fields],
+            [values.get(field.attname, DEFERRED) for field in fields],
+        )
+        user._from_claims = True
+        return user
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields() & set(USER_ROW_CACHE_FIELDS)
+        if (not getattr(self, '_from_claims', False) or fields is None
+                or not deferred or not set(fields) <= deferred):
+            return super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+        row = self.load_row()
+        for attname in deferred:
+            self.__dict__[attname] = row[attname]
+
+    def load_row(self):
+        """
+        Поля USER_ROW_CACHE_FIELDS из общего кэша или базы. Если пользователь
+        удален после выпуска токена, запрос отклоняется с 401, как при
+        проверке пользователя в JWTAuthentication
+        """
+        key = user_row_cache_key(self.pk)
+        row = cache.get(key)
+        if row is None:
+            row = CustomUser.objects.filter(pk=self.pk).values(*USER_ROW_CACHE_FIELDS).first()
+            if row is None:
+                raise AuthenticationFailed('Пользователь не найден', code='user_not_found')
+            cache.set(key, row, settings.TOKEN_USER_CACHE_TIMEOUT)
+        return row
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .tokens import UserRefreshToken
 
 User = get_user_model()
 
@@ -31,4 +33,14 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ('phone', 'address') 
\ No newline at end of file
+        fields = ('phone', 'address')
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Выдача пары токенов с ролями пользователя в access-токене"""
+    token_class = UserRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Обновление access-токена с актуальными ролями пользователя"""
+    token_class = UserRefreshToken
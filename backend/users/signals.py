@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import CustomUser, forget_user_row
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def forget_cached_user(sender, instance, created=False, **kwargs):
+    # Новый пользователь еще не может быть в кэше
+    if created:
+        return
+    # Строка удаляется сразу и после фиксации транзакции, чтобы не
+    # закэшировать строку, прочитанную до коммита
+    pk = instance.pk
+    forget_user_row(pk)
+    transaction.on_commit(lambda: forget_user_row(pk))
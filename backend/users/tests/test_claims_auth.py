@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from core.tests.test_base import BaseAPITest
+from pets.models import Pet
+from django.core.cache import cache
+from users.models import CustomUser, forget_user_row, user_row_cache_key
+
+User = get_user_model()
+
+class ClaimsAuthenticationTest(BaseAPITest):
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        forget_user_row(self.user.pk)
+        self.user.is_vet = True
+        self.user.save()
+
+    def login(self):
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'username': self.user_data['username'],
+            'password': self.user_data['password']
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def user_queries(self, queries):
+        table = f'FROM "{User._meta.db_table}"'
+        return [q for q in queries.captured_queries if table in q['sql']]
+
+    def test_access_token_carries_roles(self):
+        """Test issued access token contains role claims."""
+        token = AccessToken(self.login()['access'])
+        self.assertEqual(token['user_id'], self.user.pk)
+        self.assertIs(token['is_vet'], True)
+        self.assertIs(token['is_clinic_admin'], False)
+
+    def test_request_does_not_load_user(self):
+        """Test authenticated list does not query the users table."""
+        Pet.objects.create(owner=self.user, name='Test Pet', pet_type='dog')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login()["access"]}')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/pets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(self.user_queries(queries), [])
+
+    def test_profile_loads_row_lazily(self):
+        """Test fields missing from the token are loaded once and cached."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login()["access"]}')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/me/')
+            self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['email'], self.user_data['email'])
+        self.assertEqual(len(self.user_queries(queries)), 1)
+
+        self.user.email = 'changed@example.com'
+        self.user.save()
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['email'], 'changed@example.com')
+
+    def test_claims_user_works_with_orm(self):
+        """Test claims user can be used in filters, relations and comparisons."""
+        user = CustomUser.from_claims(id=self.user.pk, is_vet=True)
+        pet = Pet.objects.create(owner=user, name='Test Pet', pet_type='dog')
+        self.assertEqual(list(Pet.objects.filter(owner=user)), [pet])
+        self.assertEqual(pet.owner, self.user)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.is_vet)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, self.user_data['username'])
+            self.assertEqual(user.first_name, self.user_data['first_name'])
+
+    def test_refresh_rejects_inactive_user(self):
+        """Test blocked users cannot get new access tokens."""
+        refresh = self.login()['refresh']
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh})
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        """Test a token of a deleted user gets 401 instead of a server error."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login()["access"]}')
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+        self.user.delete()
+
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'].code, 'user_not_found')
+        response = self.client.post('/api/pets/', {'name': 'Test Pet', 'pet_type': 'dog'})
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Pet.objects.exists())
+
+    def test_writes_use_cached_row(self):
+        """Test the existence check before writes reuses the cached row."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login()["access"]}')
+        self.client.get('/api/users/me/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/pets/', {'name': 'Test Pet', 'pet_type': 'dog'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.user_queries(queries), [])
+
+    def test_changes_reach_other_processes(self):
+        """Test a user change in another process drops the shared row."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login()["access"]}')
+        self.client.get('/api/users/me/')
+        # Другой процесс меняет строку и удаляет ее из общего кэша,
+        # а сигнал в этом процессе не срабатывает
+        User.objects.filter(pk=self.user.pk).update(email='other@example.com')
+        forget_user_row(self.user.pk)
+
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['email'], 'other@example.com')
+
+    def test_cached_row_has_no_secrets(self):
+        """Test the shared row cache does not store the password hash."""
+        user = CustomUser.from_claims(id=self.user.pk)
+        self.assertEqual(user.email, self.user_data['email'])
+        row = cache.get(user_row_cache_key(self.user.pk))
+        self.assertEqual(row['email'], self.user_data['email'])
+        self.assertNotIn('password', row)
+        self.assertTrue(user.check_password(self.user_data['password']))
+
+    def test_other_user_save_keeps_row(self):
+        """Test saving one user does not evict rows of other users."""
+        CustomUser.from_claims(id=self.user.pk).load_row()
+        other = User.objects.create_user(username='other', password='pass12345')
+        other.first_name = 'Other'
+        other.save()
+        self.assertIsNotNone(cache.get(user_row_cache_key(self.user.pk)))
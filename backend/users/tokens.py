@@ -0,0 +1,29 @@
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import CustomUser
+
+# Поля пользователя, которые передаются в access-токене как утверждения
+USER_CLAIMS = ('is_vet', 'is_clinic_admin')
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh-токен, который добавляет в выпускаемые access-токены роли
+    пользователя. Роли читаются из базы при каждом выпуске access-токена,
+    поэтому изменения ролей и блокировка вступают в силу не позже срока
+    жизни access-токена.
+    """
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        claims = (
+            CustomUser.objects.filter(pk=self[api_settings.USER_ID_CLAIM], is_active=True)
+            .values(*USER_CLAIMS).first()
+        )
+        if claims is None:
+            raise TokenError('Пользователь не найден или заблокирован')
+        for claim, value in claims.items():
+            access[claim] = value
+        return access
@@ -12,6 +12,7 @@ from drf_spectacular.utils import (
     OpenApiExample,
 )
 from drf_spectacular.types import OpenApiTypes
+from core.metrics import SerializerMetricsMixin
 
 User = get_user_model()
 
@@ -47,7 +48,7 @@ User = get_user_model()
         tags=["users"],
     ),
 )
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SerializerMetricsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
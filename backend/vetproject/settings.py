@@ -20,6 +20,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'core',
@@ -41,6 +42,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Метрики запросов (SQL, сериализация, время ответа): заголовок Server-Timing
+# и гистограммы Prometheus по /metrics
+REQUEST_METRICS = os.getenv('REQUEST_METRICS', 'False') == 'True'
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, 'core.middleware.RequestMetricsMiddleware')
+# Адреса, с которых доступен /metrics (сборщик Prometheus); сотрудникам
+# сервиса с сессией админки он доступен с любого адреса
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+]
+
 ROOT_URLCONF = 'vetproject.urls'
 
 TEMPLATES = [
@@ -98,13 +110,18 @@ STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Медиафайлы отдаются только через защищенные эндпоинты. Если задан префикс
+# внутреннего location nginx (например, /protected-media/), передачу файла
+# выполняет nginx по X-Accel-Redirect, иначе - Django потоково
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # request.user из утверждений токена, без запроса к базе
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -134,8 +151,13 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.ClaimsTokenRefreshSerializer',
 }
 
+# Строки пользователей в общем кэше, догружаемые для полей, которых нет в токене
+TOKEN_USER_CACHE_TIMEOUT = 30  # секунды
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # Только для разработки
 CORS_ALLOWED_ORIGINS = [
@@ -151,12 +173,72 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
 # Image processing settings
-THUMBNAIL_SIZE = (200, 200)
+THUMBNAIL_RENDITIONS = (64, 200, 800)  # размеры миниатюр фото питомцев, px
+THUMBNAIL_FORMATS = ('webp', 'jpeg')
+THUMBNAIL_MAX_PIXELS = 16_000_000  # больше - уменьшаем перед ресемплингом
+THUMBNAIL_MAX_SOURCE_PIXELS = 60_000_000  # больше - отклоняем, не декодируя
 ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png']
 ALLOWED_DOCUMENT_TYPES = ['application/pdf']
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
 MAX_DOCUMENT_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Массовая загрузка фото питомцев
+BULK_PHOTO_MAX_FILES = 100  # файлов в одном запросе
+BULK_PHOTO_WORKERS = 4  # потоков обработки изображений
+DATA_UPLOAD_MAX_NUMBER_FILES = BULK_PHOTO_MAX_FILES
+
+# Массовое обновление услуг клиник: строк после разворота по clinic_ids
+CLINIC_SERVICE_BULK_MAX_ROWS = 10000
+# Границы ценовых диапазонов в счетчиках фасетного поиска клиник, руб.
+CLINIC_PRICE_FACET_BOUNDS = (500, 1000, 2000, 5000)
+# Выгрузка каталога клиник: строк, читаемых из серверного курсора за раз
+CLINIC_EXPORT_CHUNK_SIZE = 2000
+
+# Загрузка документов по частям
+CHUNKED_UPLOAD_DIR = os.path.join(BASE_DIR, 'uploads_tmp')
+CHUNKED_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024  # рекомендуемый размер части
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_DOCUMENT_MAX_SIZE = 100 * 1024 * 1024  # 100MB
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
+# Cache settings
+# Общий кэш - Redis; без REDIS_URL (разработка, тесты) - локальная замена в памяти
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Celery: без брокера фоновые задачи выполняются в пуле потоков процесса
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
+CELERY_TASK_IGNORE_RESULT = True
+BACKGROUND_WORKERS = 2
+
+# Кэш ответов каталога клиник и услуг для анонимных запросов
+CATALOGUE_CACHE_TIMEOUT = 300  # время жизни ответа, секунды
+CATALOGUE_CACHE_LOCAL_SIZE = 512  # число ответов в памяти процесса
+CATALOGUE_CACHE_GENERATION_TTL = 1  # как долго процесс доверяет своему номеру поколения
+# Как часто процесс сверяет поколение счетчиков клиник (избранное, записи):
+# на столько секунд анонимный список может отставать от счетчиков
+CATALOGUE_STATS_GENERATION_TTL = 60
+
+# Матрица расстояний до клиник: как долго процесс доверяет номеру поколения,
+# прежде чем сверить его с общим кэшем, секунды
+GEO_MATRIX_GENERATION_TTL = 1
+# Журнал изменений матрицы в общем кэше: сколько изменений процесс применяет
+# к своей матрице, прежде чем загрузить её заново, и срок хранения записей
+GEO_MATRIX_MAX_CHANGES = 1000
+GEO_MATRIX_CHANGE_TIMEOUT = 3600  # секунды
+
 # Spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Vet Clinic Aggregator API',
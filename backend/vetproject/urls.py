@@ -1,13 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 from users.views import UserViewSet
+from core.views import metrics
 from clinics.views import VetClinicViewSet, ServiceViewSet, FavoriteClinicViewSet
 from pets.views import PetViewSet, VetPassportViewSet
 from drf_spectacular.views import (
@@ -33,8 +32,10 @@ urlpatterns = [
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/pets/<int:pet_pk>/passport/', VetPassportViewSet.as_view({'get': 'retrieve', 'post': 'create', 'put': 'update'}), name='pet-passport'),
     
+    path('metrics', metrics, name='metrics'),
+
     # Документация API
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) 
\ No newline at end of file
+] 
\ No newline at end of file